@@ -0,0 +1,198 @@
+"""
+Vectorized Batch Data Generators for IoTConnect Gateway
+Generate telemetry for N devices of one model in a single NumPy pass.
+
+Each batch function returns a list of N payload dicts with exactly the same
+keys, nesting and Python value types as the matching scalar function in
+data_generators.py. Random fields are drawn as arrays (one column per
+VOLATILE field, in skeleton order) and each row fills the model's skeleton.
+As with the scalar generators, payloads share their static sub-dicts and
+must be treated as read-only.
+"""
+
+import numpy as np
+
+from data_generators import (
+    PAYLOAD_SKELETONS,
+    generate_pct504e_data,
+    generate_tbh300_data,
+    generate_gesysense_receiver_data,
+    generate_gesysense_temperature_data,
+    generate_energy_data,
+    generate_lighting_data,
+    generate_refrigeration_data,
+)
+
+_default_rng = np.random.default_rng()
+
+_PCT504E = PAYLOAD_SKELETONS[generate_pct504e_data][0]
+_TBH300 = PAYLOAD_SKELETONS[generate_tbh300_data][0]
+_GESYSENSE_RECEIVER = PAYLOAD_SKELETONS[generate_gesysense_receiver_data][0]
+_GESYSENSE_TEMPERATURE = PAYLOAD_SKELETONS[generate_gesysense_temperature_data][0]
+_ENERGY = PAYLOAD_SKELETONS[generate_energy_data][0]
+_LIGHTING = PAYLOAD_SKELETONS[generate_lighting_data][0]
+_REFRIGERATION = PAYLOAD_SKELETONS[generate_refrigeration_data][0]
+
+
+def _fill_rows(skeleton, columns):
+    fill = skeleton.fill
+    return [fill(row) for row in zip(*columns)]
+
+
+def _uniform(rng, low, high, n, ndigits=None):
+    values = rng.uniform(low, high, n)
+    if ndigits is not None:
+        values = np.round(values, ndigits)
+    return values
+
+
+def _randint(rng, low, high, n):
+    """Inclusive bounds, like random.randint"""
+    return rng.integers(low, high + 1, n).tolist()
+
+
+def _choice(rng, options, n):
+    return [options[i] for i in rng.integers(0, len(options), n).tolist()]
+
+
+def _bools(rng, n):
+    return (rng.random(n) < 0.5).tolist()
+
+
+def generate_pct504e_batch(n, rng=None):
+    """Batch variant of generate_pct504e_data"""
+    rng = rng or _default_rng
+    return _fill_rows(_PCT504E, (
+        _choice(rng, ("auto", "on"), n),  # fanMode
+        _uniform(rng, 72.0, 78.0, n, 1).tolist(),  # localTemperature
+        _bools(rng, n),  # occupancy
+        _choice(rng, ("cool", "heat", "auto"), n),  # runningMode
+        _bools(rng, n),  # runningState_coolStateOn
+        _bools(rng, n),  # runningState_fan3rdStageStateOn
+        _choice(rng, ("cool", "heat", "auto", "off"), n),  # systemMode
+        _choice(rng, ("temperature in Celsius", "temperature in Fahrenheit"), n),  # tempDisplayMode
+        _randint(rng, 150, 255, n),  # linkquality
+        _uniform(rng, 25.0, 45.0, n, 1).tolist(),  # measuredValue
+        _bools(rng, n),  # occupancy
+    ))
+
+
+def generate_tbh300_batch(n, rng=None):
+    """Batch variant of generate_tbh300_data"""
+    rng = rng or _default_rng
+    base_temp = _uniform(rng, 75.0, 82.0, n, 1).tolist()
+    return _fill_rows(_TBH300, (
+        _choice(rng, ("on", "auto"), n),  # fanMode
+        base_temp,  # localTemperature
+        _bools(rng, n),  # occupancy
+        _choice(rng, ("cool", "heat", "auto"), n),  # runningMode
+        _bools(rng, n),  # runningState_cool2ndStageStateOn
+        _bools(rng, n),  # runningState_coolStateOn
+        _bools(rng, n),  # runningState_fanStateOn
+        _choice(rng, ("auto", "cool", "heat"), n),  # systemMode
+        _randint(rng, 150, 200, n),  # linkquality
+        _uniform(rng, 25.0, 40.0, n, 2).tolist(),  # measuredValue
+        _bools(rng, n),  # occupancy
+        base_temp,  # temperature
+        _bools(rng, n),  # systemState_autoModeOn
+        _bools(rng, n),  # systemState_coolModeOn
+        _bools(rng, n),  # systemState_fanModeOn
+        _bools(rng, n),  # systemState_occupied
+    ))
+
+
+def generate_gesysense_receiver_batch(n, rng=None):
+    """Batch variant of generate_gesysense_receiver_data (no random fields)"""
+    return [_GESYSENSE_RECEIVER.fill(()) for _ in range(n)]
+
+
+def generate_gesysense_temperature_batch(n, rng=None):
+    """Batch variant of generate_gesysense_temperature_data"""
+    rng = rng or _default_rng
+    is_cooler = _bools(rng, n)
+    return _fill_rows(_GESYSENSE_TEMPERATURE, (
+        ["0.000.019.728" if cooler else "0.000.022.602" for cooler in is_cooler],  # serial_number
+        ["19728" if cooler else "22602" for cooler in is_cooler],  # label_id
+        _randint(rng, 80, 95, n),  # signal_quality
+        _uniform(rng, 40.0, 45.0, n, 3).tolist(),  # temperature
+    ))
+
+
+def generate_energy_batch(n, rng=None):
+    """Batch variant of generate_energy_data"""
+    rng = rng or _default_rng
+    base_voltage = _uniform(rng, 208, 240, n)
+    total_power = _uniform(rng, 5000, 15000, n)
+    real_power_ab = np.round(total_power * 0.33, 1).tolist()
+    voltage = np.round(base_voltage + rng.uniform(-5, 5, (3, n)), 1).tolist()
+    return _fill_rows(_ENERGY, (
+        _uniform(rng, 1000, 5000, n, 2).tolist(),  # total_energy_sum
+        np.round(total_power, 1).tolist(),  # power_sum
+        _randint(rng, 100, 400, n),  # ct_amps
+        _randint(rng, 100, 150, n),  # ct_amps_a
+        _randint(rng, 100, 150, n),  # ct_amps_b
+        _randint(rng, 100, 150, n),  # ct_amps_c
+        real_power_ab,  # real_power_a
+        real_power_ab,  # real_power_b
+        np.round(total_power * 0.34, 1).tolist(),  # real_power_c
+        voltage[0],  # voltage_a
+        voltage[1],  # voltage_b
+        voltage[2],  # voltage_c
+        np.round(base_voltage, 1).tolist(),  # voltage_avg
+    ))
+
+
+def generate_lighting_batch(n, rng=None):
+    """Batch variant of generate_lighting_data"""
+    rng = rng or _default_rng
+    # Columns alternate relay_value, schedule_active for each of the 8 zones
+    draws = (rng.random((n, 16)) < 0.5).tolist()
+    fill = _LIGHTING.fill
+    payloads = []
+    for row in draws:
+        row[0::2] = ["on" if relay else "off" for relay in row[0::2]]
+        payloads.append(fill(row))
+    return payloads
+
+
+def generate_refrigeration_batch(n, rng=None):
+    """Batch variant of generate_refrigeration_data"""
+    rng = rng or _default_rng
+    room_temp = _uniform(rng, 32, 40, n)
+    coil_temp = _uniform(rng, 25, 35, n)
+    setpoint = _uniform(rng, 35, 38, n)
+    return _fill_rows(_REFRIGERATION, (
+        np.round(setpoint, 1).tolist(),  # temperature_setpoint
+        np.round(setpoint + 2, 1).tolist(),  # second_room_temperature_set_point
+        _uniform(rng, 0, 24, n, 1).tolist(),  # time_of_day
+        np.round(room_temp - 5, 1).tolist(),  # fan_delay_temperature
+        _choice(rng, ("none", "high_temp", "low_temp"), n),  # alarms
+        np.round(coil_temp, 1).tolist(),  # coil_temperature_1
+        np.round(coil_temp + rng.uniform(-2, 2, n), 1).tolist(),  # coil_temperature_2
+        np.round(room_temp, 1).tolist(),  # current_temperature
+        _choice(rng, ("on", "off"), n),  # compressor_relay
+        _choice(rng, ("on", "off"), n),  # fan_relay
+        _choice(rng, ("cooling", "idle", "defrost"), n),  # system_status
+        room_temp.astype(np.int64).tolist(),  # room_temp
+        coil_temp.astype(np.int64).tolist(),  # coil_temp
+        rng.uniform(30, 40, n).astype(np.int64).tolist(),  # temp_3_temp
+        rng.uniform(30, 40, n).astype(np.int64).tolist(),  # temp_4_temp
+    ))
+
+
+def generate_temperature_zigbee_batch(n, rng=None):
+    """Batch variant of generate_temperature_zigbee_data"""
+    rng = rng or _default_rng
+    link_quality = _randint(rng, 85, 100, n)
+    battery_percentage = _randint(rng, 90, 100, n)
+    battery_voltage = _uniform(rng, 9.5, 11.0, n, 1).tolist()
+    temperature = _uniform(rng, 68.0, 80.0, n, 1).tolist()
+    return [
+        {
+            "link_quality": link_quality[i],
+            "battery_percentage_remaining": battery_percentage[i],
+            "battery_voltage": battery_voltage[i],
+            "measure_temperature_value": temperature[i],
+        }
+        for i in range(n)
+    ]
@@ -0,0 +1,56 @@
+"""
+Benchmark: scalar vs NumPy batch data generators
+
+Generates N payloads per device model with the scalar functions in
+data_generators.py and with the batch functions in batch_generators.py,
+and reports payloads/s for each.
+
+Usage:
+    python benchmarks/bench_batch_generators.py [N]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_generators
+import data_generators
+
+MODELS = [
+    ("PCT504-E", "generate_pct504e_data", "generate_pct504e_batch"),
+    ("TBH300", "generate_tbh300_data", "generate_tbh300_batch"),
+    ("ZigBee temperature", "generate_temperature_zigbee_data", "generate_temperature_zigbee_batch"),
+    ("gesySense temperature", "generate_gesysense_temperature_data", "generate_gesysense_temperature_batch"),
+    ("WattNode energy", "generate_energy_data", "generate_energy_batch"),
+    ("KE2 refrigeration", "generate_refrigeration_data", "generate_refrigeration_batch"),
+    ("Lighting controller", "generate_lighting_data", "generate_lighting_batch"),
+]
+REPEATS = 3
+
+
+def best_of(fn):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"{n} payloads per model")
+    print(f"{'model':>22} | {'scalar /s':>12} | {'batch /s':>12} | {'speedup':>7}")
+    print("-" * 62)
+    for label, scalar_name, batch_name in MODELS:
+        scalar = getattr(data_generators, scalar_name)
+        batch = getattr(batch_generators, batch_name)
+        scalar_time = best_of(lambda: [scalar() for _ in range(n)])
+        batch_time = best_of(lambda: batch(n))
+        print(f"{label:>22} | {n / scalar_time:>12,.0f} | {n / batch_time:>12,.0f} | {scalar_time / batch_time:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: per-tick cost of child device dispatch
+
+Compares the original if/elif chain on deviceType/model against the
+precomputed TelemetryPlan from src.gateway.device_registry for fleets of
+25, 1k and 10k children. Each approach is timed twice: with the real data
+generators (full tick cost) and with a no-op generator (dispatch overhead only).
+
+Usage:
+    python benchmarks/bench_device_dispatch.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_generators
+from src.gateway.device_registry import DeviceRegistry, default_registry
+
+FLEET_SIZES = [25, 1000, 10000]
+REPEATS = 5
+
+# (deviceType, model, count) mix of the 25-child gateway in gateway_app.py
+MODEL_MIX = [
+    ("thermostat", "PCT504-E", 10),
+    ("temperature_zigbee", "", 10),
+    ("thermostat", "TBH300", 1),
+    ("gesysense", "P.W01211", 1),
+    ("energy", "WNC-3Y-208-MB", 1),
+    ("refrigeration", "21263", 1),
+    ("lighting", "CONMOD1.0-ZG", 1),
+]
+
+
+def make_fleet(size):
+    """Build a CHILD_DEVICES-style list of `size` devices following MODEL_MIX"""
+    pattern = [(device_type, model) for device_type, model, count in MODEL_MIX for _ in range(count)]
+    return [
+        {
+            "uniqueId": f"BENCH-{i:06d}",
+            "name": f"Bench-{i}",
+            "model": pattern[i % len(pattern)][1],
+            "deviceType": pattern[i % len(pattern)][0],
+        }
+        for i in range(size)
+    ]
+
+
+def legacy_tick(devices, timestamp, gen):
+    """The original send_telemetry child loop; gen is the generator module"""
+    data_array = []
+    for device in devices:
+        device_type = device.get("deviceType", "")
+        model = device.get("model", "")
+        if device_type == "thermostat":
+            if model == "PCT504-E":
+                device_data = gen.generate_pct504e_data()
+            elif model == "TBH300":
+                device_data = gen.generate_tbh300_data()
+            else:
+                continue
+        elif device_type == "temperature_zigbee":
+            device_data = gen.generate_temperature_zigbee_data()
+        elif device_type == "gesysense":
+            if model == "P.W01211":
+                device_data = gen.generate_gesysense_receiver_data()
+            elif model == "P.W01101-2":
+                device_data = gen.generate_gesysense_temperature_data()
+            else:
+                continue
+        elif device_type == "energy":
+            device_data = gen.generate_energy_data()
+        elif device_type == "refrigeration":
+            device_data = gen.generate_refrigeration_data()
+        elif device_type == "lighting":
+            device_data = gen.generate_lighting_data()
+        else:
+            continue
+        data_array.append({"uniqueId": device["uniqueId"], "time": timestamp, "data": device_data})
+    return data_array
+
+
+class _NoopGenerators:
+    """Stand-in for data_generators where every generator returns an empty dict"""
+
+    _payload = {}
+
+    def __getattr__(self, name):
+        return self._payload.copy
+
+
+def noop_registry():
+    registry = DeviceRegistry()
+    for device_type, model, _ in MODEL_MIX:
+        registry.register(device_type, model, _NoopGenerators._payload.copy)
+    return registry
+
+
+def best_of(fn):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    timestamp = "2024-01-01T00:00:00.000Z"
+    noop = _NoopGenerators()
+    print(f"{'children':>9} | {'mode':>8} | {'if/elif ms':>11} | {'plan ms':>9} | {'speedup':>7}")
+    print("-" * 58)
+    for size in FLEET_SIZES:
+        devices = make_fleet(size)
+        for mode, gen, registry in (
+            ("dispatch", noop, noop_registry()),
+            ("full", data_generators, default_registry()),
+        ):
+            plan = registry.build_plan(devices)
+            legacy = best_of(lambda: legacy_tick(devices, timestamp, gen))
+            planned = best_of(lambda: plan.generate(timestamp))
+            print(f"{size:>9} | {mode:>8} | {legacy * 1000:>11.3f} | {planned * 1000:>9.3f} | {legacy / planned:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: loading and querying a large device inventory
+
+Writes a synthetic import file shaped like data/GatewayDeviceImport.json
+with DEVICES children over a handful of tags, then times load_import() (JSON
+parsing included), measures the memory the inventory keeps and times
+lookups by uniqueId and by tag. The target is a 100k-device load in well
+under a second.
+
+Usage:
+    python benchmarks/bench_inventory.py [devices]
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.gateway.inventory import load_import
+
+DEVICES = 100000
+LOOKUPS = 200000
+TAGS = ("thermostat", "temperature_zigbee", "energy", "lighting", "refrigeration", "gesysense")
+
+
+def write_import(path, count):
+    items = [
+        {"name": f"Device-{index}", "uniqueId": f"DEV-{index:08d}", "tag": TAGS[index % len(TAGS)]}
+        for index in range(count)
+    ]
+    document = {"_meta": {"at": 3, "v": 2.1},
+                "gateway": {"items": [{"name": "Gateway-v3", "uniqueId": "GW-20001448", "items": items}]}}
+    with open(path, "w") as file:
+        json.dump(document, file, indent=4)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEVICES
+    devices = {f"DEV-{index:08d}": {"model": "PCT504-E", "deviceType": "thermostat"}
+               for index in range(0, count, len(TAGS))}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "GatewayDeviceImport.json")
+        write_import(path, count)
+        size = os.path.getsize(path)
+
+        gc.collect()
+        start = time.perf_counter()
+        inventory = load_import(path, devices=devices)
+        elapsed = time.perf_counter() - start
+
+        del inventory
+        gc.collect()
+        tracemalloc.start()
+        inventory = load_import(path, devices=devices)
+        kept, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    ids = [f"DEV-{index:08d}" for index in range(0, count, max(1, count // 1000))]
+    start = time.perf_counter()
+    for index in range(LOOKUPS):
+        inventory.get(ids[index % len(ids)])
+    by_id = (time.perf_counter() - start) / LOOKUPS
+    start = time.perf_counter()
+    for index in range(LOOKUPS):
+        inventory.with_tag(TAGS[index % len(TAGS)])
+    by_tag = (time.perf_counter() - start) / LOOKUPS
+
+    print(f"{'measure':>24} | {'value':>14}")
+    print("-" * 42)
+    print(f"{'devices':>24} | {len(inventory):>14}")
+    print(f"{'import file':>24} | {size / 1e6:>11.1f} MB")
+    print(f"{'load (parse + index)':>24} | {elapsed * 1000:>11.0f} ms")
+    print(f"{'per device':>24} | {elapsed / count * 1e6:>11.2f} us")
+    print(f"{'memory kept':>24} | {kept / 1e6:>11.1f} MB")
+    print(f"{'memory per device':>24} | {kept / count:>11.0f} B")
+    print(f"{'peak while loading':>24} | {peak / 1e6:>11.1f} MB")
+    print(f"{'get(uniqueId)':>24} | {by_id * 1e9:>11.0f} ns")
+    print(f"{'with_tag(tag)':>24} | {by_tag * 1e9:>11.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
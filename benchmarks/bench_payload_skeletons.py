@@ -0,0 +1,181 @@
+"""
+Benchmark: payload skeletons vs rebuilding payloads from literals
+
+For the gateway heartbeat and the PCT504-E thermostat, compares the original
+generators (full dict literal built on every call, then json.dumps) with the
+skeleton-based generators in data_generators.py (fill only the volatile
+fields; encode by joining pre-serialized static fragments).
+
+Reports time per payload and bytes allocated per payload (tracemalloc,
+payloads kept alive as they would be inside one SendData batch).
+
+Usage:
+    python benchmarks/bench_payload_skeletons.py [N]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_generators import encode_device_data, generate_gateway_data, generate_pct504e_data
+
+REPEATS = 3
+
+
+def legacy_gateway_data():
+    """generate_gateway_data before skeletons"""
+    return {
+        "hb": {
+            "net_address_ip_v4": "192.168.68.123",
+            "net_address_ip_v6": "fe80::3868:668e:93b4:9c1f",
+            "hostname": "raspberrypi",
+            "gateway_version": "3.2.40",
+            "ota_version": "3.2.13",
+            "configured": True,
+            "fixed_id": "2941008C7954",
+            "serial_id": "20002330",
+            "mac_address": "b8:27:eb:3f:f0:11",
+            "download_config_success": True,
+            "download_firmware_success": True,
+            "ota_success": True,
+            "reason": "periodic",
+            "ota_firmware_timestamp": "2024-09-06T15:57:02.070944Z",
+            "gateway_firmware_timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            "gateway_start_timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            "gateway_stop_timestamp": "",
+            "config_file_timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            "gateway_reboot_success": True
+        },
+        "zigbee_network": {
+            "channel": 11,
+            "extended_pan_id": "0x00124b0024cbee5f",
+            "pan_id": 55363
+        }
+    }
+
+
+def legacy_pct504e_data():
+    """generate_pct504e_data before skeletons"""
+    base_temp = random.uniform(72.0, 78.0)
+    
+    return {
+        "genBasic": {
+            "appVersion": 1,
+            "dateCode": "20200513",
+            "hwVersion": 4,
+            "manufacturerName": "OWON Technology Inc.",
+            "modelId": "PCT504-E",
+            "powerSource_primary": "dc source",
+            "powerSource_secondary": False,
+            "stackVersion": 0,
+            "zclVersion": 3
+        },
+        "hvacFanCtrl": {
+            "fanMode": random.choice(["auto", "on"]),
+            "fanModeSequence": "low/med/high/auto"
+        },
+        "hvacThermostat": {
+            "absMaxCoolSetpointLimit": 95.0,
+            "absMaxHeatSetpointLimit": 86.0,
+            "absMinCoolSetpointLimit": 44.6,
+            "absMinHeatSetpointLimit": 41.0,
+            "controlSequenceOfOperation": "cooling with heating 4-pipes",
+            "localTemperature": round(base_temp, 1),
+            "maxCoolSetpointLimit": 95.0,
+            "maxHeatSetpointLimit": 86.0,
+            "minCoolSetpointLimit": 44.6,
+            "minHeatSetpointLimit": 41.0,
+            "minSetpointDeadBand": 2.7,
+            "occupancy": random.choice([True, False]),
+            "occupiedCoolingSetpoint": 69.8,
+            "occupiedHeatingSetpoint": 62.6,
+            "runningMode": random.choice(["cool", "heat", "auto"]),
+            "runningState_cool2ndStageStateOn": False,
+            "runningState_coolStateOn": random.choice([True, False]),
+            "runningState_fan2ndStageStateOn": False,
+            "runningState_fan3rdStageStateOn": random.choice([True, False]),
+            "runningState_fanStateOn": False,
+            "runningState_heat2ndStageStateOn": False,
+            "runningState_heatStateOn": False,
+            "systemMode": random.choice(["cool", "heat", "auto", "off"]),
+            "unoccupiedCoolingSetpoint": 69.8,
+            "unoccupiedHeatingSetpoint": 62.6,
+            "programingOperMode_auto_recovery_mode": "off",
+            "programingOperMode_economy_energy_star_mode": "off",
+            "programingOperMode_mode": "simple/setpoint mode",
+            "systemTypeConfig_coolingSystemStage": "cool stage 1",
+            "systemTypeConfig_heatingFuelSource": "electric / B",
+            "systemTypeConfig_heatingSystemStage": "heat stage 1",
+            "systemTypeConfig_heatingSystemType": "conventional"
+        },
+        "occupied_heating_setphvacUserInterfaceCfgoint": {
+            "keypadLockout": "no lockout",
+            "tempDisplayMode": random.choice(["temperature in Celsius", "temperature in Fahrenheit"])
+        },
+        "linkquality": random.randint(150, 255),
+        "relative_humidity": {
+            "maxMeasuredValue": 100.0,
+            "measuredValue": round(random.uniform(25.0, 45.0), 1),
+            "minMeasuredValue": 0.0
+        },
+        "msOccupancySensing": {
+            "occupancy": random.choice([True, False]),
+            "occupancySensorType": "ultrasonic",
+            "pirOToUDelay": 60
+        },
+        "schedule_active": False
+    }
+
+
+def best_of(fn, n):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / n
+
+
+def allocated_per_payload(fn, n):
+    tracemalloc.start()
+    kept = [fn() for _ in range(n)]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return peak / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    cases = [
+        ("gateway", legacy_gateway_data, generate_gateway_data),
+        ("PCT504-E", legacy_pct504e_data, generate_pct504e_data),
+    ]
+    print(f"{n} payloads per case (times in microseconds per payload)")
+    print(f"{'model':>9} | {'stage':>15} | {'literal':>9} | {'skeleton':>9} | {'speedup':>7}")
+    print("-" * 63)
+    for label, legacy, generator in cases:
+        rows = [
+            ("build dict", legacy, generator),
+            ("build + encode",
+             lambda: json.dumps(legacy(), separators=(",", ":")).encode(),
+             lambda: encode_device_data(generator)),
+        ]
+        for stage, old, new in rows:
+            old_time = best_of(old, n)
+            new_time = best_of(new, n)
+            print(f"{label:>9} | {stage:>15} | {old_time * 1e6:>9.2f} | {new_time * 1e6:>9.2f} | {old_time / new_time:>6.2f}x")
+        old_bytes = allocated_per_payload(legacy, n)
+        new_bytes = allocated_per_payload(generator, n)
+        print(f"{label:>9} | {'bytes allocated':>15} | {old_bytes:>9.0f} | {new_bytes:>9.0f} | {old_bytes / new_bytes:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: encoding send_telemetry batches with each serializer
+
+Builds realistic data_array batches of 25, 500 and 5,000 device payloads
+(copies of gateway_app.CHILD_DEVICES) and encodes them with the SDK-style
+json.dumps(...).encode() and with every serializer in src.utils.serializer
+that is installed. Reports the best encode time and the peak memory traced
+during one encode.
+
+Usage:
+    python benchmarks/bench_serializer.py
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gateway_app import CHILD_DEVICES
+from src.gateway.device_registry import default_registry
+from src.gateway.fleet import fleet_children
+from src.utils.serializer import SERIALIZERS, get_serializer
+
+BATCH_SIZES = [25, 500, 5000]
+REPEATS = 5
+
+
+def build_batch(size):
+    devices = []
+    gateway = 0
+    while len(devices) < size:
+        devices.extend(fleet_children(f"GW-{gateway}", CHILD_DEVICES))
+        gateway += 1
+    plan = default_registry().build_plan(devices[:size])
+    return plan.generate("2024-01-01T00:00:00.000Z")
+
+
+def best_of(function, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def encoders():
+    yield "json.dumps (SDK)", lambda batch: json.dumps(batch).encode()
+    for name in SERIALIZERS:
+        try:
+            serializer = get_serializer(name)
+        except ImportError:
+            print(f"({name} not installed, skipped)")
+            continue
+        yield name, serializer.dumps
+
+
+def main():
+    print(f"{'devices':>7} | {'encoder':>16} | {'ms':>8} | {'MB/s':>7} | {'bytes':>10} | {'peak KiB':>9}")
+    print("-" * 72)
+    for size in BATCH_SIZES:
+        batch = build_batch(size)
+        for name, encode in encoders():
+            output = encode(batch)
+            elapsed = best_of(lambda: encode(batch))
+            peak = peak_memory(lambda: encode(batch))
+            print(f"{size:>7} | {name:>16} | {elapsed * 1000:>8.2f} | {len(output) / elapsed / 1e6:>7.1f} | "
+                  f"{len(output):>10} | {peak / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: append throughput of the telemetry spool
+
+Appends real device payloads (the 25 children of gateway_app.py, 25 per
+tick) to a TelemetrySpool in a temporary directory and reports sustained
+device-records/s with group commit versus one commit per tick. The target is
+at least 10k records/s with fsync on every commit.
+
+Usage:
+    python benchmarks/bench_spool.py [directory]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.gateway.device_registry import default_registry
+from src.gateway.spool import TelemetrySpool
+from gateway_app import CHILD_DEVICES
+
+RECORDS = 50000
+
+
+def run(directory, name, commit_records):
+    plan = default_registry().build_plan(CHILD_DEVICES)
+    ticks = [plan.generate("2024-01-01T00:00:00.000Z") for _ in range(20)]
+    path = os.path.join(directory, f"{name}.db")
+    spool = TelemetrySpool(path, commit_records=commit_records, commit_interval=0.5)
+    appended = 0
+    start = time.perf_counter()
+    while appended < RECORDS:
+        data_array = ticks[appended // len(CHILD_DEVICES) % len(ticks)]
+        spool.append(data_array)
+        appended += len(data_array)
+    spool.close()
+    elapsed = time.perf_counter() - start
+    print(f"{name:>16} | {appended:>8} | {spool.stats.commits:>7} | {elapsed:>7.2f} | {appended / elapsed:>10,.0f}")
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else None
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        print(f"{'mode':>16} | {'records':>8} | {'commits':>7} | {'seconds':>7} | {'records/s':>10}")
+        print("-" * 62)
+        run(tmp, "per-tick commit", len(CHILD_DEVICES))
+        run(tmp, "group commit", 5000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: cost of validating outgoing payloads against the device template
+
+Times the compiled template checkers (src/gateway/validation.py) per
+device payload for every device type of gateway_app.CHILD_DEVICES plus the
+gateway heartbeat, then the cost per tick of checking all payloads and of
+sampling 1 in N. When jsonschema is installed, the same payloads are also
+checked with a generic JSON Schema built from the template for comparison.
+
+Usage:
+    python benchmarks/bench_validation.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_generators import generate_gateway_data
+from gateway_app import DEVICE_TYPES, TELEMETRY_PLAN, TEMPLATE_PATH, UNIQUE_ID
+from src.gateway.validation import TemplateValidator, compile_template
+
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+REPEATS = 2000
+SAMPLE_RATES = (1, 10, 100)
+SCHEMA_TYPES = {"string": "string", "decimal": "number", "integer": "integer", "boolean": "boolean", "object": "object"}
+
+
+def schema_for(attributes):
+    """Generic JSON Schema equivalent of one level of template attributes"""
+    properties = {}
+    for attribute in attributes:
+        if attribute.get("childs") or attribute["type"] == "object":
+            properties[attribute["name"]] = schema_for(attribute.get("childs", ()))
+        else:
+            properties[attribute["name"]] = {"type": SCHEMA_TYPES[attribute["type"]]}
+    return {"type": "object", "properties": properties, "additionalProperties": False}
+
+
+def tick_payloads():
+    timestamp = "2024-01-01T00:00:00.000Z"
+    return [{"uniqueId": UNIQUE_ID, "time": timestamp, "data": generate_gateway_data(timestamp)}] + \
+        TELEMETRY_PLAN.generate(timestamp)
+
+
+def per_call(function, items):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for item in items:
+            function(item)
+    return (time.perf_counter() - start) / (REPEATS * len(items))
+
+
+def main():
+    start = time.perf_counter()
+    checkers = compile_template(TEMPLATE_PATH)
+    compile_time = time.perf_counter() - start
+    validator = TemplateValidator(checkers, DEVICE_TYPES)
+    payloads = tick_payloads()
+
+    schemas = None
+    if jsonschema is not None:
+        import json
+        with open(TEMPLATE_PATH) as file:
+            template = json.load(file)
+        by_tag = {}
+        for attribute in template["attributes"]:
+            by_tag.setdefault(attribute.get("tag", template["tag"]), []).append(attribute)
+        schemas = {tag: jsonschema.Draft7Validator(schema_for(attributes)) for tag, attributes in by_tag.items()}
+
+    print(f"Compiled {len(checkers)} tag checkers in {compile_time * 1000:.1f} ms")
+    print(f"{'device type':>22} | {'attrs':>5} | {'compiled us':>11} | {'jsonschema us':>13}")
+    print("-" * 62)
+    by_type = {}
+    for item in payloads:
+        by_type.setdefault(DEVICE_TYPES[item["uniqueId"]], []).append(item)
+    for device_type, items in sorted(by_type.items()):
+        attributes = sum(len(value) if isinstance(value, dict) else 1 for value in items[0]["data"].values())
+        compiled = per_call(validator.validate, items)
+        generic = "n/a"
+        if schemas is not None:
+            schema = schemas[device_type]
+            generic = f"{per_call(lambda item: list(schema.iter_errors(item['data'])), items) * 1e6:.1f}"
+        print(f"{device_type:>22} | {attributes:>5} | {compiled * 1e6:>11.1f} | {generic:>13}")
+
+    print()
+    print(f"{'tick of ' + str(len(payloads)) + ' payloads':>22} | {'us/tick':>8} | {'us/payload':>10}")
+    print("-" * 48)
+    for every in SAMPLE_RATES:
+        sampled = TemplateValidator(checkers, DEVICE_TYPES, sample_every=every)
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            sampled.check(payloads)
+        elapsed = (time.perf_counter() - start) / REPEATS
+        print(f"{'1 in ' + str(every):>22} | {elapsed * 1e6:>8.1f} | {elapsed / len(payloads) * 1e6:>10.2f}")
+    if jsonschema is None:
+        print("\njsonschema is not installed; generic validation not measured")
+
+
+if __name__ == "__main__":
+    main()
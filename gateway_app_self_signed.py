@@ -3,14 +3,34 @@ IoTConnect Gateway Application
 Sends simulated thermostat data for gateway and 11 child devices
 """
 
-import json
+import asyncio
+import logging
 import time
 import random
-from iotconnect import IoTConnectSDK
-from datetime import datetime
+import signal
 import sys
 import os
-from data_generators import generate_gateway_data, generate_pct504e_data, generate_tbh300_data, generate_gesysense_receiver_data, generate_gesysense_temperature_data, generate_energy_data, generate_lighting_data, generate_refrigeration_data, generate_temperature_zigbee_data
+from collections import deque
+from data_generators import generate_gateway_data
+from src.gateway.ack_cache import AckCache
+from src.gateway.batcher import ChunkPublisher, PayloadBatcher
+from src.gateway.commands import OrderedCommandRouter
+from src.gateway.config import DEVICE_CONFIG_PATH, IOTCONNECT_CONFIG_PATH, ConfigService
+from src.gateway.delta import DeltaEncoder, load_deadbands
+from src.gateway.device_registry import default_registry
+from src.gateway.inventory import load_inventory
+from src.gateway.ota import FirmwareDownloader, OtaManager
+from src.gateway.replay import BacklogReplayer
+from src.gateway.rollup import ChunkedUploader, RollupShipper, RollupWriter
+from src.gateway.sampling import load_template_frequency, reschedule_plan, schedule_plan
+from src.gateway.scheduler import TelemetryScheduler
+from src.gateway.spool import TelemetrySpool
+from src.gateway.twin import TwinCache
+from src.gateway.validation import TemplateValidator, compile_template
+from src.utils.clock import TickClock
+from src.utils.logger import LazyJson, setup_logger
+from src.utils.metrics import BYTE_BUCKETS, REGISTRY, MetricsServer, timed
+from src.utils.tracing import TickProfiler, Tracer
 
 # ============================================================================
 # CONFIGURATION
@@ -18,7 +38,89 @@ from data_generators import generate_gateway_data, generate_pct504e_data, genera
 
 # Gateway Configuration
 UNIQUE_ID = "GW-20001448"  # Your gateway device unique ID
-INTERVAL = 60  # Send data every 60 seconds
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "GatewayTemplateAllDeviceTypes.json")
+# IoTConnect device import files describing the fleet (uniqueId, name, tag); later files update earlier ones
+DEVICE_IMPORT_PATHS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "GatewayDeviceImport.json"),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "Gateway-ThermostatDeviceImport.json"),
+]
+INTERVAL = load_template_frequency(TEMPLATE_PATH)  # Template dataFrequency: default seconds between sends
+
+# Sampling interval overrides in seconds, by model or deviceType
+# (a CHILD_DEVICES entry may also set its own "dataFrequency")
+DATA_FREQUENCIES = {
+    "energy": 5,
+    "thermostat": 60,
+    "temperature_zigbee": 300,
+}
+NTP_SERVER = None  # e.g. "pool.ntp.org" to correct timestamps with a cached NTP offset
+MAX_PAYLOAD_BYTES = 128 * 1024  # Broker message size limit; larger ticks are split into chunks
+MAX_IN_FLIGHT = 4  # Chunks published concurrently
+COMMAND_WORKERS = 4  # Devices whose commands run at once (each device in order), off the SDK thread
+COMMAND_MAX_PENDING = 1000  # Queued commands before new ones are refused
+ACK_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spool", "acks.jsonl")
+ACK_CACHE_SIZE = 10000  # Acked commands remembered, so cloud retries are not executed twice
+ACK_CACHE_TTL = 24 * 3600  # Seconds a command result is replayed for a retried ack id
+
+# Durable spool for telemetry that could not be published (replaces the SDK offlineStorage)
+SPOOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spool", "telemetry.db")
+SPOOL_MAX_MB = 64  # oldest records are evicted beyond this
+
+# Backlog replay after an outage: oldest first, interleaved with live ticks
+REPLAY_RATE = 100  # most spooled records per second
+REPLAY_BURST = 500  # records replayable at once
+REPLAY_RATIO = 1.0  # most spooled records per live record in the same tick...
+REPLAY_MIN_PER_TICK = 25  # ...but at least this many, for ticks with little live data
+
+# Bulk file rollup (template fileSupport): these device types are written to
+# compressed NDJSON files and uploaded to ROLLUP_UPLOAD_URL instead of sent per tick
+ROLLUP_DEVICE_TYPES = set()  # e.g. {"energy"}
+ROLLUP_UPLOAD_URL = None  # e.g. "https://files.example.com/telemetry"
+ROLLUP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rollup")
+ROLLUP_MAX_MB = 8  # compressed size per file
+ROLLUP_MAX_AGE = 300  # seconds before a file is closed and uploaded
+
+# OTA firmware downloads, stored by SHA-256 (identical images are kept once)
+OTA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "firmware")
+OTA_WORKERS = 2  # distinct firmware URLs downloaded at once
+
+# Prometheus metrics at http://METRICS_HOST:METRICS_PORT/metrics (None disables)
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+
+# Tick tracing and on-demand profiling, served next to the metrics at /traces and
+# /profile?ticks=K; SIGUSR1 also profiles the next PROFILE_TICKS ticks
+TRACE_TICKS = False  # record per-stage spans of every tick and SDK callback
+TRACE_BUFFER = 100  # traces kept per tick/callback name
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+PROFILE_TICKS = 10
+
+# Logging: records are written by a background thread to LOG_FILE (rotated, gzip-compressed)
+LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "iotconnect_gateway.log")
+LOG_LEVEL = logging.INFO  # logging.DEBUG also logs every callback payload
+LOG_LIMITS = {"iotconnect_gateway.tick": (2, 10)}  # logger -> (records per second, burst)
+LOG_SAMPLES = {}  # logger -> N to keep 1 in N records, e.g. {"iotconnect_gateway.tick": 10}
+
+# Check outgoing payloads against the template attributes (TEMPLATE_PATH); each distinct
+# problem is logged once and all are counted in gateway_invalid_payloads
+VALIDATE_EVERY = 100  # check 1 in N payloads (1 checks every payload, None disables)
+
+# Child devices come from config/device_config.json and the cpid/env/pf SDK options from
+# config/iotconnect_config.json; device edits are applied between ticks without a restart
+CONFIG_POLL_INTERVAL = 2.0  # seconds between checks of the config files for changes
+
+# Local stand-in SDK (no cloud, no certificates) for offline load tests;
+# also enabled by the environment variable IOTCONNECT_FAKE_SDK=1
+FAKE_SDK = os.environ.get("IOTCONNECT_FAKE_SDK") == "1"
+FAKE_SDK_LATENCY = 0.05  # seconds each simulated publish takes
+
+# Report-by-exception: send only attributes that changed beyond their deadband
+# (defaults by unit from the template), with a full snapshot every KEYFRAME_INTERVAL
+DELTA_MODE = False
+KEYFRAME_INTERVAL = 3600  # seconds
+DEADBAND_OVERRIDES = {
+    # "thermostat": {"hvacThermostat.localTemperature": 0.2},
+}
 
 # Certificate Paths (relative to this script) - Back to CA-Signed
 CERT_DIR = os.path.abspath("./certs")
@@ -26,15 +128,18 @@ SSL_KEY_PATH = os.path.join(CERT_DIR, "pk_Gateway-v3.pem")
 SSL_CERT_PATH = os.path.join(CERT_DIR, "cert_Gateway-v3.crt")
 SSL_CA_PATH = os.path.join(CERT_DIR, "AmazonRootCA1.pem")
 
-# SDK Options
-SDK_OPTIONS = {
+# Parsed once; CONFIG.snapshot is replaced whenever a file changes
+CONFIG = ConfigService(DEVICE_CONFIG_PATH, IOTCONNECT_CONFIG_PATH, CONFIG_POLL_INTERVAL)
+
+# SDK Options (cpid, env and pf as set in iotconnect_config.json)
+SDK_OPTIONS = CONFIG.snapshot.sdk_options({
     "certificate": {
         "SSLKeyPath": SSL_KEY_PATH,
         "SSLCertPath": SSL_CERT_PATH,
         "SSLCaPath": SSL_CA_PATH
     },
     "offlineStorage": {
-        "disabled": False,
+        "disabled": True,  # Replaced by the gateway spool (SPOOL_PATH)
         "availSpaceInMb": 0.01,
         "fileCount": 5,
         "keepalive": 60
@@ -46,36 +151,65 @@ SDK_OPTIONS = {
     "env": "poc",
     "pf": "aws",
     "forceAuthType": 3  # Force CA_SELF_SIGNED authentication type
-}
+})
 
-# Child Device IDs
-CHILD_DEVICES = [
-    {"uniqueId": "Thermostat-504112112200301", "name": "Stat-1", "model": "PCT504-E", "deviceType": "thermostat"},
-    {"uniqueId": "Thermostat-504112112200204", "name": "Stat-2", "model": "PCT504-E", "deviceType": "thermostat"},
-    {"uniqueId": "Thermostat-504112302130096", "name": "Stat-3", "model": "PCT504-E", "deviceType": "thermostat"},
-    {"uniqueId": "Thermostat-504112302130105", "name": "Stat-4", "model": "PCT504-E", "deviceType": "thermostat"},
-    {"uniqueId": "Thermostat-504112302130456", "name": "Stat-5", "model": "PCT504-E", "deviceType": "thermostat"},
-    {"uniqueId": "Thermostat-504112302130127", "name": "Stat-6", "model": "PCT504-E", "deviceType": "thermostat"},
-    {"uniqueId": "Thermostat-504112302130232", "name": "Stat-7", "model": "PCT504-E", "deviceType": "thermostat"},
-    {"uniqueId": "Thermostat-504112302130372", "name": "Stat-8", "model": "PCT504-E", "deviceType": "thermostat"},
-    {"uniqueId": "Thermostat-504112302130017", "name": "Stat-9", "model": "PCT504-E", "deviceType": "thermostat"},
-    {"uniqueId": "Thermostat-504112302130369", "name": "Stat-10", "model": "PCT504-E", "deviceType": "thermostat"},
-    {"uniqueId": "Temperature-ZigBee-317M12303210501", "name": "ZigBee-1", "model": "", "deviceType": "temperature_zigbee"},
-    {"uniqueId": "Temperature-ZigBee-317M12303210685", "name": "ZigBee-2", "model": "", "deviceType": "temperature_zigbee"},
-    {"uniqueId": "Temperature-ZigBee-317M12303210764", "name": "ZigBee-3", "model": "", "deviceType": "temperature_zigbee"},
-    {"uniqueId": "Temperature-ZigBee-317M12303210702", "name": "ZigBee-4", "model": "", "deviceType": "temperature_zigbee"},
-    {"uniqueId": "Temperature-ZigBee-317M12303210597", "name": "ZigBee-5", "model": "", "deviceType": "temperature_zigbee"},
-    {"uniqueId": "Temperature-ZigBee-317M12303210419", "name": "Zigbee-6", "model": "", "deviceType": "temperature_zigbee"},
-    {"uniqueId": "Temperature-ZigBee-317M12303210749", "name": "Zigbee-7", "model": "", "deviceType": "temperature_zigbee"},
-    {"uniqueId": "Temperature-ZigBee-317M12211280468", "name": "Zigbee-8", "model": "", "deviceType": "temperature_zigbee"},
-    {"uniqueId": "Temperature-ZigBee-317M12303210548", "name": "Zigbee-9", "model": "", "deviceType": "temperature_zigbee"},
-    {"uniqueId": "Temperature-ZigBee-317M12303210380", "name": "Zigbee-10", "model": "", "deviceType": "temperature_zigbee"},
-    {"uniqueId": "ENG-300-707-003", "name": "UEI", "model": "TBH300", "deviceType": "thermostat"},
-    {"uniqueId": "8000020280", "name": "gesysense-receiver", "model": "P.W01211", "deviceType": "gesysense"},
-    {"uniqueId": "ENG-300-707-004", "name": "WattNode", "model": "WNC-3Y-208-MB", "deviceType": "energy"},
-    {"uniqueId": "ENG-300-707-001", "name": "Ke2", "model": "21263", "deviceType": "refrigeration"},
-    {"uniqueId": "ENG-300-707-005-20001448", "name": "LightingController", "model": "CONMOD1.0-ZG", "deviceType": "lighting"},
-]
+# Child devices, in device_config.json order (kept current by apply_config_changes)
+CHILD_DEVICES = list(CONFIG.snapshot.devices)
+
+# The fleet from the import files, indexed by uniqueId, tag, model and deviceType
+INVENTORY = load_inventory(DEVICE_IMPORT_PATHS, CONFIG.snapshot.by_id)
+
+# Generator for every child, resolved once from the device registry
+DEVICE_REGISTRY = default_registry()
+TELEMETRY_PLAN = DEVICE_REGISTRY.build_plan(CHILD_DEVICES)
+
+# (snapshot, DeviceChanges) from the config watcher, applied by the tick thread
+CONFIG_CHANGES = deque()
+
+# When each device is next due; the gateway heartbeat follows the template dataFrequency
+GATEWAY_KEY = "gateway"
+SAMPLING = schedule_plan(TELEMETRY_PLAN, DATA_FREQUENCIES, INTERVAL, time.monotonic())
+SAMPLING.add(GATEWAY_KEY, INTERVAL, time.monotonic())
+TICK_INTERVAL = SAMPLING.base_interval()  # wake-up period that lands on every device's due time
+
+# Splits each tick into SendData chunks under MAX_PAYLOAD_BYTES and publishes them concurrently
+BATCHER = PayloadBatcher(MAX_PAYLOAD_BYTES)
+PUBLISHER = ChunkPublisher(lambda chunk: sdk.SendData(chunk), MAX_IN_FLIGHT)
+
+# Formats each tick's timestamp once for every payload and log line
+CLOCK = TickClock(ntp_server=NTP_SERVER)
+
+# deviceType of every device sent, for per-type handling
+DEVICE_TYPES = dict({UNIQUE_ID: "gateway"}, **{device["uniqueId"]: device["deviceType"] for device in CHILD_DEVICES})
+
+# Last-sent attribute values per device for DELTA_MODE
+DELTA = DeltaEncoder(
+    load_deadbands(TEMPLATE_PATH, overrides=DEADBAND_OVERRIDES),
+    DEVICE_TYPES,
+    KEYFRAME_INTERVAL
+) if DELTA_MODE else None
+
+# Template checkers compiled once at startup
+VALIDATOR = TemplateValidator(compile_template(TEMPLATE_PATH), DEVICE_TYPES, VALIDATE_EVERY) if VALIDATE_EVERY else None
+
+# Hot-path metrics; series are looked up once here so each observation is a single call
+GENERATE_SECONDS = REGISTRY.histogram("gateway_generate_seconds", "Payload generation time per device", ["device_type"])
+GENERATE_TIMERS = [GENERATE_SECONDS.labels(device["deviceType"]) for device in TELEMETRY_PLAN.devices]
+GATEWAY_GENERATE_SECONDS = GENERATE_SECONDS.labels("gateway")
+SERIALIZE_SECONDS = REGISTRY.histogram("gateway_serialize_seconds", "Time serializing and splitting a tick into chunks")
+SEND_SECONDS = REGISTRY.histogram("gateway_send_seconds", "SendData latency per chunk")
+TICK_BYTES = REGISTRY.histogram("gateway_tick_bytes", "Serialized payload bytes sent per tick", buckets=BYTE_BUCKETS)
+SENT_BYTES = REGISTRY.counter("gateway_sent_bytes", "Serialized payload bytes sent")
+SEND_FAILURES = REGISTRY.counter("gateway_send_failures", "Chunks not accepted by SendData")
+TICK_LATENESS = REGISTRY.histogram("gateway_tick_lateness_seconds", "Delay from a tick's deadline to its start")
+CALLBACK_SECONDS = REGISTRY.histogram("gateway_callback_seconds", "Time spent in SDK callbacks", ["callback"])
+DELTA_SAVED_BYTES = REGISTRY.counter("gateway_delta_saved_bytes", "Payload bytes report-by-exception left out of ticks")
+REPLAYED_RECORDS = REGISTRY.counter("gateway_replayed_records", "Spooled records replayed after an outage")
+INVALID_PAYLOADS = REGISTRY.counter("gateway_invalid_payloads", "Sampled payloads that do not match the device template")
+
+# Last TRACE_BUFFER tick/callback traces (when TRACE_TICKS), and the cProfile switch
+TRACER = Tracer(TRACE_BUFFER, TRACE_TICKS)
+PROFILER = TickProfiler(PROFILE_DIR)
 
 # ============================================================================
 # DATA SIMULATION FUNCTIONS (imported from data_generators.py)
@@ -92,12 +226,15 @@ CHILD_DEVICES = [
  * Output  : Receive device command, firmware command and other device initialize error response 
 """
 
+@timed(CALLBACK_SECONDS.labels("command"))
+@TRACER.traced("callback.command")
 def DeviceCallback(msg):
     """
     Handle device commands from IoTConnect cloud platform
     
-    This callback processes incoming device commands and manages acknowledgments.
-    Called automatically by the SDK when commands are received from the cloud.
+    Called by the SDK on its network thread, so it only parses the message and
+    queues it on COMMANDS; the registered handler runs on a worker and the
+    acknowledgment is sent when it finishes.
     
     Command Types Handled:
         - Type 0: Device commands (control, configuration, etc.)
@@ -117,22 +254,24 @@ def DeviceCallback(msg):
         - 5: Executed
         - 6: Executed acknowledgment
     """
-    print("\n--- Command Message Received ---")
-    print(json.dumps(msg, indent=2))
-    
-    if msg and "ct" in msg:
-        cmd_type = msg["ct"]
-        
-        # Device Command
-        if cmd_type == 0:
-            data = msg
-            if "id" in data:
-                if "ack" in data and data["ack"]:
-                    sdk.sendAckCmd(data["ack"], 7, "sucessfull", data["id"])
-            else:
-                if "ack" in data and data["ack"]:
-                    sdk.sendAckCmd(data["ack"], 7, "sucessfull")
+    COMMANDS.submit(msg)
+
+def send_command_ack(ack, status, message, device_id):
+    """Acknowledge a device command for a child device, or for the gateway when device_id is None"""
+    if device_id:
+        sdk.sendAckCmd(ack, status, message, device_id)
+    else:
+        sdk.sendAckCmd(ack, status, message)
+
+def default_command_handler(command):
+    """Commands without a registered handler are reported as executed"""
+    return "sucessfull"
 
+# Device command handlers by command name: COMMANDS.register("name", handler)
+COMMANDS = OrderedCommandRouter(send_command_ack, COMMAND_WORKERS, COMMAND_MAX_PENDING, default_command_handler)
+
+@timed(CALLBACK_SECONDS.labels("ota"))
+@TRACER.traced("callback.ota")
 def DeviceFirmwareCallback(msg):
     """
     Handle Over-The-Air (OTA) firmware update commands
@@ -142,9 +281,9 @@ def DeviceFirmwareCallback(msg):
     
     Firmware Update Process:
         1. Receives firmware URLs from cloud
-        2. Matches URLs to device tags (gateway vs thermostat)
-        3. Initiates download/update process
-        4. Sends acknowledgment with update status
+        2. Matches URLs to device tags using the tag index (INVENTORY, then Getdevice())
+        3. Queues one download per distinct URL on the OTA worker pool
+        4. Sends progress acknowledgments (2, then 3 or 4) to every targeted device
     
     Args:
         msg (dict): Firmware command message containing:
@@ -160,25 +299,22 @@ def DeviceFirmwareCallback(msg):
         - 3: Download completed
         - 4: Download failed
     """
-    print("\n--- Firmware Command Received ---")
-    print(json.dumps(msg, indent=2))
+    CALLBACK_LOG.info("Firmware command received (ack %s)", msg.get("ack") if msg else None)
+    CALLBACK_LOG.debug("Firmware command: %s", LazyJson(msg))
     
-    if msg and "ct" in msg:
-        cmd_type = msg["ct"]
-        
-        # Firmware OTA Command
-        if cmd_type == 1:
-            data = msg
-            if "urls" in data and data["urls"]:
-                for url_list in data["urls"]:
-                    if "tg" in url_list:
-                        device_list = sdk.Getdevice()
-                        for device in device_list:
-                            if "tg" in device and device["tg"] == url_list["tg"]:
-                                sdk.sendOTAAckCmd(data["ack"], 0, "sucessfull", device["id"])
-                    else:
-                        sdk.sendOTAAckCmd(data["ack"], 0, "sucessfull")
+    plan = ota.submit(msg)
+    for url, devices in plan.items():
+        CALLBACK_LOG.info("OTA: %s for %s", url, ", ".join(device or "gateway" for device in devices))
+
+def send_ota_ack(ack, status, message, device_id):
+    """Acknowledge an OTA command for a child device, or for the gateway when device_id is None"""
+    if device_id:
+        sdk.sendOTAAckCmd(ack, status, message, device_id)
+    else:
+        sdk.sendOTAAckCmd(ack, status, message)
 
+@timed(CALLBACK_SECONDS.labels("connection"))
+@TRACER.traced("callback.connection")
 def DeviceConnectionCallback(msg):
     """
     Handle device connection status updates
@@ -199,16 +335,19 @@ def DeviceConnectionCallback(msg):
             - Device identification information
             - Timestamp and status details
     """
-    print("\n--- Connection Status ---")
-    print(json.dumps(msg, indent=2))
+    CALLBACK_LOG.debug("Connection status: %s", LazyJson(msg))
     
     if msg and "ct" in msg:
         cmd_type = msg["ct"]
         
         # Connection status
         if cmd_type == 116:
-            print(f"Device connection status: {msg.get('command', 'unknown')}")
+            global cloud_connected
+            cloud_connected = bool(msg.get('command'))
+            CALLBACK_LOG.info("Device connection status: %s", msg.get('command', 'unknown'))
 
+@timed(CALLBACK_SECONDS.labels("twin"))
+@TRACER.traced("callback.twin")
 def TwinUpdateCallback(msg):
     """
     Handle device twin (digital shadow) property updates
@@ -235,18 +374,23 @@ def TwinUpdateCallback(msg):
             - System properties (version, uniqueId) - ignored
     
     Filtering:
-        - Processes only desired properties without reported counterparts
+        - Drops updates whose version is not newer than the last one applied
         - Skips system properties (version, uniqueId)
-        - Updates each property individually for granular control
+        - Reports only properties that differ from TWIN, in one batch
     """
-    print("\n--- Twin Update Received ---")
-    print(json.dumps(msg, indent=2))
+    CALLBACK_LOG.debug("Twin update: %s", LazyJson(msg))
     
-    if msg:
-        if "desired" in msg and "reported" not in msg:
-            for key in msg["desired"]:
-                if key not in ["version", "uniqueId"]:
-                    sdk.UpdateTwin(key, msg["desired"][key])
+    changes = TWIN.apply(msg)
+    if changes:
+        CALLBACK_LOG.info("Twin update: reporting %d changed properties", len(changes))
+        report_twin(changes)
+
+def report_twin(properties):
+    """Report changed twin properties in one message where the SDK supports it, else one per key"""
+    return TWIN.report(sdk, properties)
+
+# Local twin: TWIN.get("key") reads the current value without a cloud round trip
+TWIN = TwinCache()
 
 def InitCallback(response):
     """
@@ -270,25 +414,45 @@ def InitCallback(response):
         - Handle initialization errors gracefully
         - Configure device behavior based on cloud settings
     """
-    print("\n--- Initialization Response ---")
-    print(json.dumps(response, indent=2))
+    CALLBACK_LOG.debug("Initialization response: %s", LazyJson(response))
 
 # ============================================================================
 # MAIN APPLICATION FUNCTIONS
 # ============================================================================
 
+# Per-tick and SDK-callback messages; configured (LOG_LIMITS, LOG_SAMPLES) in main()
+TICK_LOG = logging.getLogger("iotconnect_gateway.tick")
+CALLBACK_LOG = logging.getLogger("iotconnect_gateway.callback")
+VALIDATION_LOG = logging.getLogger("iotconnect_gateway.validation")
+CONFIG_LOG = logging.getLogger("iotconnect_gateway.config")
+REPORTED_PROBLEMS = set()  # (tag, problem) already logged
+
 sdk = None
+spool = None
+replayer = None
+rollup = None
+ota = None
+cloud_connected = True
+
+def create_sdk():
+    """IoTConnect SDK for the gateway, or the local stand-in when FAKE_SDK is set"""
+    if FAKE_SDK:
+        from src.gateway.fake_sdk import FakeIoTConnectSDK
+        return FakeIoTConnectSDK(UNIQUE_ID, SDK_OPTIONS, DeviceConnectionCallback,
+                                 devices=INVENTORY.device_list(UNIQUE_ID), latency=FAKE_SDK_LATENCY)
+    from iotconnect import IoTConnectSDK
+    return IoTConnectSDK(UNIQUE_ID, SDK_OPTIONS, DeviceConnectionCallback)
 
 def send_telemetry():
     """
     Send telemetry data for gateway and all child devices
     
     This function orchestrates the complete telemetry transmission process:
-    1. Generates current timestamp in ISO 8601 format with milliseconds
+    1. Captures the tick timestamp from CLOCK (ISO 8601 with milliseconds, formatted once)
     2. Creates gateway heartbeat and status data
-    3. Generates data for each child device based on model type
-    4. Batches all device data into a single transmission
-    5. Sends data to IoTConnect cloud via SDK
+    3. Generates data for each child device that SAMPLING reports as due
+    4. Splits the device data into chunks under MAX_PAYLOAD_BYTES
+    5. Sends the chunks to IoTConnect cloud via SDK, MAX_IN_FLIGHT at a time
     
     Data Volume Per Transmission:
         - 1 Gateway device (heartbeat, network status)
@@ -302,68 +466,197 @@ def send_telemetry():
         - data: Device-specific telemetry payload
     
     Error Handling:
-        - Logs transmission status
+        - Logs transmission status per chunk; a failed chunk does not stop the others
         - Does not throw exceptions (handled by caller)
-        - Continues operation on individual device data generation errors
+        - Devices with unknown deviceType/model are reported once at startup
+    
+    The scheduler runs the two halves separately (build_telemetry, then
+    publish_telemetry) so one tick's generation can overlap the previous
+    tick's publish.
+    """
+    publish_telemetry(build_telemetry())
+
+def build_telemetry():
     """
-    timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    Generate payloads for every device due this tick (coalesced into one batch);
+    returns (tick, data_array, trace) for publish_telemetry
+    """
+    if CONFIG_CHANGES:
+        apply_config_changes()
+    trace = TRACER.begin("tick")
+    with TRACER.span("schedule"):
+        tick = CLOCK.tick()
+        timestamp = tick.iso
+        due = SAMPLING.due(time.monotonic())
+        positions = [key for key in due if key != GATEWAY_KEY]
     
     # Prepare data array
     data_array = []
     
     # 1. Gateway data
-    gateway_data = {
-        "uniqueId": UNIQUE_ID,
-        "time": timestamp,
-        "data": generate_gateway_data()
-    }
-    data_array.append(gateway_data)
-    
-    # 2. Child device data
-    for device in CHILD_DEVICES:
-        device_type = device.get("deviceType", "")
-        model = device.get("model", "")
-        
-        # Generate data based on deviceType first, then model for differentiation
-        if device_type == "thermostat":
-            if model == "PCT504-E":
-                device_data = generate_pct504e_data()
-            elif model == "TBH300":
-                device_data = generate_tbh300_data()
-            else:
-                print(f"Warning: Unknown thermostat model {model} for device {device['uniqueId']}")
-                continue
-        elif device_type == "temperature_zigbee":
-            device_data = generate_temperature_zigbee_data()
-        elif device_type == "gesysense":
-            if model == "P.W01211":  # gesySense receiver
-                device_data = generate_gesysense_receiver_data()
-            elif model == "P.W01101-2":  # gesySense temperature module
-                device_data = generate_gesysense_temperature_data()
-            else:
-                print(f"Warning: Unknown gesysense model {model} for device {device['uniqueId']}")
-                continue
-        elif device_type == "energy":
-            device_data = generate_energy_data()
-        elif device_type == "refrigeration":
-            device_data = generate_refrigeration_data()
-        elif device_type == "lighting":
-            device_data = generate_lighting_data()
-        else:
-            print(f"Warning: Unknown device type {device_type} for device {device['uniqueId']}")
+    if len(positions) != len(due):
+        with TRACER.span("gateway"):
+            start = time.perf_counter()
+            gateway_data = {
+                "uniqueId": UNIQUE_ID,
+                "time": timestamp,
+                "data": generate_gateway_data(timestamp)
+            }
+            GATEWAY_GENERATE_SECONDS.observe(time.perf_counter() - start)
+            data_array.append(gateway_data)
+    
+    # 2. Child device data (one precomputed generator per due device); the
+    # generators alone are in gateway_generate_seconds, the rest is dict building
+    if positions:
+        with TRACER.span("generate"):
+            data_array.extend(TELEMETRY_PLAN.generate(timestamp, positions, GENERATE_TIMERS))
+
+    # 3. Template check of the sampled payloads (they are sent either way)
+    if VALIDATOR is not None and data_array:
+        with TRACER.span("validate"):
+            invalid = VALIDATOR.check(data_array)
+        if invalid:
+            report_invalid(invalid)
+
+    # 4. Report-by-exception: keep only changed attributes
+    if DELTA is not None and data_array:
+        with TRACER.span("delta"):
+            data_array, delta_stats = DELTA.apply(data_array, time.monotonic())
+        DELTA_SAVED_BYTES.inc(delta_stats.saved_bytes)
+        TICK_LOG.debug("Report-by-exception: %r", delta_stats)
+    TRACER.activate(None)
+    return tick, data_array, trace
+
+def report_invalid(invalid):
+    """Count payloads that failed template validation; each distinct problem is logged once"""
+    INVALID_PAYLOADS.inc(len(invalid))
+    for unique_id, problems in invalid:
+        tag = DEVICE_TYPES.get(unique_id)
+        for problem in problems:
+            if (tag, problem) not in REPORTED_PROBLEMS:
+                REPORTED_PROBLEMS.add((tag, problem))
+                VALIDATION_LOG.warning("Payload of %s (%s) does not match the template: %s", unique_id, tag, problem)
+
+def queue_config_changes(snapshot, changes):
+    """ConfigService listener: hand a reloaded configuration to the tick thread"""
+    CONFIG_CHANGES.append((snapshot, changes))
+
+def apply_config_changes():
+    """
+    Apply reloaded configurations between two ticks, on the tick thread.
+
+    Only added, removed and changed devices are resolved and (re)scheduled;
+    every other device keeps its plan generator and its due time.
+    """
+    global TELEMETRY_PLAN, GENERATE_TIMERS
+    while CONFIG_CHANGES:
+        snapshot, changes = CONFIG_CHANGES.popleft()
+        if snapshot.sdk_options(SDK_OPTIONS) != SDK_OPTIONS:
+            CONFIG_LOG.warning("Config v%d: SDK settings in iotconnect_config.json changed, restart to apply them",
+                               snapshot.version)
+        if not changes:
             continue
-        
-        child_payload = {
-            "uniqueId": device["uniqueId"],
-            "time": timestamp,
-            "data": device_data
-        }
-        data_array.append(child_payload)
-    
-    # Send data
-    print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Sending telemetry for {len(data_array)} devices...")
-    sdk.SendData(data_array)
-    print("Data sent successfully")
+        updated = changes.added + changes.changed
+        gone = [device["uniqueId"] for device in changes.removed + changes.changed]
+        plan, moved = DEVICE_REGISTRY.update_plan(TELEMETRY_PLAN, updated, gone)
+        reschedule_plan(SAMPLING, plan, moved, DATA_FREQUENCIES, INTERVAL, time.monotonic())
+        for unique_id in gone:
+            DEVICE_TYPES.pop(unique_id, None)
+            if DELTA is not None:
+                DELTA.reset(unique_id)
+        for device in updated:
+            DEVICE_TYPES[device["uniqueId"]] = device["deviceType"]
+        GENERATE_TIMERS = [GENERATE_SECONDS.labels(device["deviceType"]) for device in plan.devices]
+        TELEMETRY_PLAN = plan
+        CHILD_DEVICES[:] = snapshot.devices
+        CONFIG_LOG.info("Config v%d: devices %r, %d planned", snapshot.version, changes, len(plan))
+        unplanned = len(updated) - (len(plan) - len(moved))  # devices without a generator, last in skipped
+        for device in plan.skipped[len(plan.skipped) - unplanned:]:
+            CONFIG_LOG.warning("No generator for deviceType '%s' model '%s' (device %s)",
+                               device["deviceType"], device["model"], device["uniqueId"])
+        base_interval = SAMPLING.base_interval()
+        if base_interval % TICK_INTERVAL:
+            CONFIG_LOG.warning("Config v%d: a sampling interval is not a multiple of the %ss tick, restart to tick every %ss",
+                               snapshot.version, TICK_INTERVAL, base_interval)
+
+def publish_telemetry(batch):
+    """Send one tick's payloads built by build_telemetry, then its share of the spooled backlog"""
+    tick, data_array, trace = batch
+    TRACER.activate(trace)
+    try:
+        if data_array and rollup is not None:
+            with TRACER.span("rollup"):
+                data_array = roll_up(data_array)
+        if data_array:
+            send_live(tick, data_array)
+        if cloud_connected and replayer is not None:
+            with TRACER.span("replay"):
+                replayed = replayer.replay(len(data_array))
+            if replayed:
+                REPLAYED_RECORDS.inc(replayed)
+                TICK_LOG.info("Replayed %d spooled records: %r", replayed, replayer.stats)
+    finally:
+        TRACER.finish(trace)
+
+def replay_eta():
+    """Seconds until the replayer drains the spool at its current rate; inf if it is not draining"""
+    eta = replayer.stats.eta_seconds
+    return float("inf") if eta is None else eta
+
+def roll_up(data_array):
+    """Write ROLLUP_DEVICE_TYPES payloads to the rollup file; returns the rest for MQTT"""
+    rolled = [item for item in data_array if DEVICE_TYPES.get(item["uniqueId"]) in ROLLUP_DEVICE_TYPES]
+    if not rolled:
+        return data_array
+    rollup.writer.write(rolled)
+    return [item for item in data_array if DEVICE_TYPES.get(item["uniqueId"]) not in ROLLUP_DEVICE_TYPES]
+
+def send_live(tick, data_array):
+    """Publish one tick's payloads, spooling whatever the cloud does not take"""
+    if not cloud_connected and spool is not None:
+        with TRACER.span("spool"):
+            spool.append(data_array)
+        TICK_LOG.warning("[%s] Cloud disconnected: spooled %d devices (%d in spool)", tick.local, len(data_array), len(spool))
+        return
+    with TRACER.span("serialize"):
+        start = time.perf_counter()
+        chunks = BATCHER.split(data_array)
+        SERIALIZE_SECONDS.observe(time.perf_counter() - start)
+    TICK_LOG.info("[%s] Sending telemetry for %d devices in %d chunk(s)...", tick.local, len(data_array), len(chunks))
+    with TRACER.span("publish"):
+        results = PUBLISHER.publish(chunks)
+    sent_bytes = 0
+    for result in results:
+        if result.ok:
+            SEND_SECONDS.observe(result.elapsed)
+            sent_bytes += result.size
+    TICK_BYTES.observe(sent_bytes)
+    SENT_BYTES.inc(sent_bytes)
+    failed = [result for result in results if not result.ok]
+    for result in failed:
+        TICK_LOG.error("Failed to send %r", result)
+    if failed:
+        SEND_FAILURES.inc(len(failed))
+    if failed and DELTA is not None:
+        for chunk, result in zip(chunks, results):
+            if not result.ok:
+                DELTA.undelivered(chunk.items)
+    if failed and spool is not None:
+        # Keep what the broker did not take; an oversized payload would never fit
+        for chunk, result in zip(chunks, results):
+            if not result.ok and not chunk.oversized:
+                with TRACER.span("spool"):
+                    spool.append(chunk.items)
+    if failed and len(failed) == len(results):
+        raise RuntimeError(f"all {len(results)} chunks failed")
+    TICK_LOG.info("Data sent successfully (%d/%d chunks)", len(results) - len(failed), len(results))
+
+def start_profile(ticks):
+    """Profile the next ticks ticks into PROFILE_DIR; returns a status line"""
+    path = PROFILER.request(ticks)
+    if path is not None:
+        return f"profiling the next {ticks} tick(s) into {path}\n"
+    return "a profiling session is already running\n"
 
 def main():
     """
@@ -379,8 +672,8 @@ def main():
         5. Retrieve and validate device list from cloud
     
     Main Operation Loop:
-        1. Continuously send telemetry data every 60 seconds
-        2. Handle transmission errors with retry logic
+        1. Send each device on its own sampling interval (SAMPLING, TelemetryScheduler)
+        2. Report late and missed ticks; transmission errors do not shift the cadence
         3. Maintain connection health and status monitoring
         4. Process incoming commands and callbacks asynchronously
     
@@ -403,29 +696,84 @@ def main():
         - Final status reporting
         - Clean process termination
     """
-    global sdk
+    global sdk, spool, replayer, rollup, ota
+    
+    setup_logger("iotconnect_gateway", LOG_FILE, LOG_LEVEL, limits=LOG_LIMITS, samples=LOG_SAMPLES)
     
     print("=" * 70)
     print("IoTConnect Gateway Application")
     print("=" * 70)
     print(f"Gateway ID: {UNIQUE_ID}")
     print(f"Child Devices: {len(CHILD_DEVICES)}")
-    print(f"Data Interval: {INTERVAL} seconds")
+    print(f"Inventory: {len(INVENTORY)} devices with tags {', '.join(sorted(INVENTORY.tags()))}")
+    for device in CHILD_DEVICES:
+        if device["uniqueId"] not in INVENTORY:
+            print(f"Warning: Device {device['uniqueId']} is not in the device import files")
+    for device in TELEMETRY_PLAN.skipped:
+        print(f"Warning: No generator for deviceType '{device.get('deviceType', '')}' model '{device.get('model', '')}' (device {device['uniqueId']})")
+    print(f"Data Interval: {INTERVAL} seconds (template default), tick every {TICK_INTERVAL} seconds")
+    for key, interval in sorted(DATA_FREQUENCIES.items()):
+        print(f"    {key}: every {interval} seconds")
+    print(f"NTP Server: {NTP_SERVER or 'disabled (local clock)'}")
+    if VALIDATOR is not None:
+        print(f"Validation: 1 in {VALIDATE_EVERY} payloads against {os.path.basename(TEMPLATE_PATH)}")
+    if FAKE_SDK:
+        print(f"SDK: local stand-in, {FAKE_SDK_LATENCY}s simulated latency")
     print("=" * 70)
     
-    # Verify certificate files exist
-    print("\nVerifying certificate files...")
-    for cert_file in [SSL_KEY_PATH, SSL_CERT_PATH, SSL_CA_PATH]:
-        if os.path.isfile(cert_file):
-            print(f"Found: {cert_file}")
-        else:
-            print(f"Missing: {cert_file}")
-            print("Please ensure all certificate files are in the ./certs directory")
-            sys.exit(1)
+    # Verify certificate files exist (the local stand-in SDK needs none)
+    if not FAKE_SDK:
+        print("\nVerifying certificate files...")
+        for cert_file in [SSL_KEY_PATH, SSL_CERT_PATH, SSL_CA_PATH]:
+            if os.path.isfile(cert_file):
+                print(f"Found: {cert_file}")
+            else:
+                print(f"Missing: {cert_file}")
+                print("Please ensure all certificate files are in the ./certs directory")
+                sys.exit(1)
+    
+    # Measure the NTP offset in the background; ticks only read the cached value
+    CLOCK.start()
+    
+    spool = TelemetrySpool(SPOOL_PATH, SPOOL_MAX_MB * 1024 * 1024)
+    COMMANDS.ack_cache = AckCache(ACK_CACHE_PATH, ACK_CACHE_SIZE, ACK_CACHE_TTL)
+    print(f"Ack cache: {len(COMMANDS.ack_cache)} acked commands remembered")
+    if ROLLUP_DEVICE_TYPES and ROLLUP_UPLOAD_URL:
+        writer = RollupWriter(ROLLUP_DIR, ROLLUP_MAX_MB * 1024 * 1024, ROLLUP_MAX_AGE)
+        rollup = RollupShipper(writer, ChunkedUploader(ROLLUP_UPLOAD_URL))
+        rollup.start()
+        print(f"Rollup: {', '.join(sorted(ROLLUP_DEVICE_TYPES))} to {ROLLUP_UPLOAD_URL}")
+    replayer = BacklogReplayer(spool, BATCHER, PUBLISHER, REPLAY_RATE, REPLAY_BURST, REPLAY_RATIO, REPLAY_MIN_PER_TICK)
+    print(f"Spool: {len(spool)} records waiting in {SPOOL_PATH}, replay at {REPLAY_RATE} records/s")
+    # Tags resolve from the inventory until Getdevice() reports the cloud's list
+    ota = OtaManager(send_ota_ack, FirmwareDownloader(OTA_DIR), INVENTORY.device_list(UNIQUE_ID), max_workers=OTA_WORKERS)
+    
+    # Queue depths are read when /metrics is scraped
+    REGISTRY.gauge("gateway_backlog_records", "Telemetry records waiting in the offline spool", function=lambda: len(spool))
+    REGISTRY.gauge("gateway_backlog_bytes", "Payload bytes waiting in the offline spool", function=lambda: spool.size_bytes)
+    REGISTRY.gauge("gateway_replay_backlog_records", "Spooled records left after the last replay", function=lambda: replayer.stats.remaining)
+    REGISTRY.gauge("gateway_replay_rate", "Smoothed spooled records replayed per second", function=lambda: replayer.stats.rate)
+    REGISTRY.gauge("gateway_replay_eta_seconds", "Estimated seconds to drain the spool (+Inf while stalled)", function=replay_eta)
+    REGISTRY.gauge("gateway_commands_pending", "Device commands queued or running", function=lambda: COMMANDS.stats.pending)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: start_profile(PROFILE_TICKS))
+    CONFIG.subscribe(queue_config_changes)
+    CONFIG.start()
+    print(f"Config: watching {DEVICE_CONFIG_PATH} every {CONFIG_POLL_INTERVAL}s")
+    metrics_server = None
+    if METRICS_PORT is not None:
+        try:
+            metrics_server = MetricsServer(REGISTRY, METRICS_HOST, METRICS_PORT, {
+                "/traces": lambda query: TRACER.format(query.get("name")),
+                "/profile": lambda query: start_profile(int(query.get("ticks", PROFILE_TICKS))),
+            }).start()
+            print(f"Metrics: http://{METRICS_HOST}:{metrics_server.port}/metrics")
+        except OSError as e:
+            print(f"Metrics endpoint disabled, cannot listen on {METRICS_HOST}:{METRICS_PORT}: {e}")
     
     try:
         print("\nInitializing IoTConnect SDK...")
-        with IoTConnectSDK(UNIQUE_ID, SDK_OPTIONS, DeviceConnectionCallback) as sdk:
+        with create_sdk() as sdk:
             print("SDK initialized successfully")
             
             # Register callbacks
@@ -436,19 +784,45 @@ def main():
             # Get device list
             device_list = sdk.Getdevice()
             print(f"Retrieved device list: {len(device_list)} devices")
+            ota.update_devices(device_list)
             
             print("\n" + "=" * 70)
             print("Starting telemetry loop... (Press Ctrl+C to stop)")
             print("=" * 70)
             
-            # Main telemetry loop
-            while True:
-                try:
-                    send_telemetry()
-                    time.sleep(INTERVAL)
-                except Exception as e:
-                    print(f"Error sending telemetry: {e}")
-                    time.sleep(5)  # Wait before retry
+            # Main telemetry loop: ticks land on absolute deadlines every TICK_INTERVAL
+            # seconds and send whichever devices are due; errors are reported per
+            # tick without shifting the cadence
+            scheduler = TelemetryScheduler(TICK_INTERVAL, [build_telemetry, publish_telemetry],
+                                           on_lateness=TICK_LATENESS.observe, profiler=PROFILER)
+            try:
+                asyncio.run(scheduler.run())
+            finally:
+                print(f"Scheduler: {scheduler.stats}")
+                COMMANDS.close()
+                print(f"Commands: {COMMANDS.stats!r}")
+                print(f"Command-to-ack latency: {COMMANDS.stats.ack_latency!r}")
+                COMMANDS.ack_cache.close()
+                ota.close(wait=False)
+                print(f"OTA: {ota.stats!r}")
+                print(f"Twin: {TWIN.stats!r}")
+                if VALIDATOR is not None:
+                    print(f"Validation: {VALIDATOR.stats!r}")
+                for trace in TRACER.slowest("tick", 3):
+                    print(f"Slow tick: {trace}")
+                CONFIG.stop()
+                print(f"Config: {CONFIG.stats!r}")
+                if metrics_server is not None:
+                    metrics_server.stop()
+                spool.close()
+                print(f"Spool: {spool.stats}")
+                print(f"Replay: {replayer.stats!r}")
+                if rollup is not None:
+                    rollup.stop()
+                    print(f"Rollup: {rollup.writer.records} records in {rollup.writer.rotated} files, "
+                          f"{rollup.uploader.uploaded_files} uploaded")
+                if FAKE_SDK:
+                    print(f"Fake SDK: {sdk.messages} messages, {sdk.bytes} bytes published")
                     
     except KeyboardInterrupt:
         print("\n\nShutting down gracefully...")
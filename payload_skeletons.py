@@ -0,0 +1,138 @@
+"""
+Payload Skeletons for IoTConnect Gateway
+Build the constant part of a device payload once and patch only the
+volatile fields on each tick.
+
+A skeleton is declared as an ordinary payload dict literal in which every
+field that changes per tick is set to VOLATILE. Values for those fields are
+passed to fill()/encode() as a sequence in document order (the order the
+VOLATILE markers appear in the literal, depth first).
+
+fill() shares every fully static sub-dict with the skeleton instead of
+copying it. Those sub-dicts are FrozenDicts, so code that tries to change
+one gets a TypeError instead of altering every later payload.
+encode() produces compact JSON bytes by joining pre-serialized static
+fragments with the encoded volatile values. The gateway itself sends
+fill() dicts, because sdk.SendData takes payload dicts and serializes them
+itself; encode() is for callers that write the bytes themselves.
+"""
+
+import json
+import math
+import re
+
+from src.utils.frozen import FrozenDict
+
+
+class _Volatile:
+    def __repr__(self):
+        return "VOLATILE"
+
+
+VOLATILE = _Volatile()
+
+_SEPARATORS = (",", ":")
+_SLOT_MARKER = re.compile(r'"\\u0000(\d+)\\u0000"')
+
+
+def encode_value(value):
+    """Compact JSON bytes for one leaf value, with fast paths for scalars"""
+    value_type = type(value)
+    if value_type is bool:
+        return b"true" if value else b"false"
+    if value_type is int:
+        return str(value).encode()
+    if value_type is float and math.isfinite(value):
+        return repr(value).encode()
+    if value is None:
+        return b"null"
+    return json.dumps(value, separators=_SEPARATORS).encode()
+
+
+class PayloadSkeleton:
+    """Immutable payload template with VOLATILE slots filled per tick"""
+
+    def __init__(self, template):
+        self.template = template
+        slots = []
+        self._fill = _compile(template, slots)
+        self.slot_count = len(slots)
+        self.static_fragments = _fragments(template, self.slot_count)
+
+    def fill(self, values):
+        """Return a payload dict with the VOLATILE fields set from values"""
+        if len(values) != self.slot_count:
+            raise ValueError(f"Expected {self.slot_count} volatile values, got {len(values)}")
+        return self._fill(values)
+
+    def encode(self, values):
+        """Return the payload as compact JSON bytes without building a dict"""
+        if len(values) != self.slot_count:
+            raise ValueError(f"Expected {self.slot_count} volatile values, got {len(values)}")
+        fragments = self.static_fragments
+        parts = [fragments[0]]
+        for index, value in enumerate(values):
+            parts.append(encode_value(value))
+            parts.append(fragments[index + 1])
+        return b"".join(parts)
+
+
+def _compile(template, slots):
+    """Build a fill function for template; slots collects VOLATILE positions in order"""
+    leaf_slots = []
+    nested = []
+    base = {}
+    for key, value in template.items():
+        if value is VOLATILE:
+            leaf_slots.append((key, len(slots)))
+            slots.append(key)
+            base[key] = None
+        elif isinstance(value, dict) and _has_volatile(value):
+            nested.append((key, _compile(value, slots)))
+            base[key] = None
+        else:
+            base[key] = _freeze(value)
+
+    if not leaf_slots and not nested:
+        base = FrozenDict(base)
+        return lambda values: base
+
+    def fill(values):
+        payload = base.copy()
+        for key, index in leaf_slots:
+            payload[key] = values[index]
+        for key, fill_nested in nested:
+            payload[key] = fill_nested(values)
+        return payload
+
+    return fill
+
+
+def _freeze(value):
+    """value with every dict in it made a FrozenDict"""
+    if isinstance(value, dict):
+        return FrozenDict({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+def _has_volatile(template):
+    return any(
+        value is VOLATILE or (isinstance(value, dict) and _has_volatile(value))
+        for value in template.values()
+    )
+
+
+def _fragments(template, slot_count):
+    """Serialize template once and split it into static byte fragments around each slot"""
+    counter = iter(range(slot_count))
+
+    def mark(node):
+        return {
+            key: f"\0{next(counter)}\0" if value is VOLATILE else mark(value) if isinstance(value, dict) else value
+            for key, value in node.items()
+        }
+
+    text = json.dumps(mark(template), separators=_SEPARATORS)
+    pieces = _SLOT_MARKER.split(text)
+    # split() alternates static text with captured slot numbers
+    return tuple(piece.encode() for piece in pieces[0::2])
@@ -0,0 +1,119 @@
+"""
+Ack Cache for IoTConnect Gateway
+Remembers the result of every acknowledged command by (ack id, device id),
+so a command the cloud retries is acked again with the stored result instead
+of being executed twice.
+
+Entries live in an LRU dict capped at capacity entries and expire after ttl
+seconds. With a path, every stored result is also appended to a small
+on-disk index (one JSON line per entry) that is reloaded on start, so a
+crash and restart does not re-run commands. The index is rewritten from the
+live entries when it holds twice as many lines as the cache.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.utils.serializer import default_serializer
+
+
+class AckCache:
+    """
+    Bounded LRU+TTL map of (ack, device_id) -> (status, message).
+
+    Args:
+        path: On-disk index file, or None to keep entries in memory only
+        capacity: Most entries kept; the least recently used go first
+        ttl: Seconds an entry is valid (wall clock, so it spans restarts)
+    """
+
+    def __init__(self, path=None, capacity=10000, ttl=24 * 3600, clock=time.time, serializer=None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.path = path
+        self.capacity = capacity
+        self.ttl = ttl
+        self.serializer = serializer or default_serializer
+        self._clock = clock
+        self._entries = OrderedDict()  # (ack, device_id) -> (status, message, stored_at)
+        self._lock = threading.Lock()
+        self._file = None
+        self._lines = 0
+        if path is not None:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+            self._file = open(path, "ab")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, ack, device_id=None):
+        """(status, message) stored for this ack, or None"""
+        key = (ack, device_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._clock() - entry[2] >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def put(self, ack, device_id, status, message):
+        """
+        Store a command result. The line is written and flushed before returning,
+        so it survives a process crash; it is not fsynced, so a power loss may
+        lose the most recent results.
+        """
+        stored_at = self._clock()
+        with self._lock:
+            self._insert((ack, device_id), (status, message, stored_at))
+            if self._file is not None:
+                self._file.write(self.serializer.dumps([ack, device_id, status, message, stored_at]) + b"\n")
+                self._file.flush()
+                self._lines += 1
+                if self._lines >= 2 * self.capacity:
+                    self._compact()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _insert(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        now = self._clock()
+        with open(self.path, "rb") as file:
+            for line in file:
+                self._lines += 1
+                try:
+                    ack, device_id, status, message, stored_at = self.serializer.loads(line)
+                except (ValueError, TypeError):
+                    continue  # torn last line from a crash
+                if now - stored_at < self.ttl:
+                    self._insert((ack, device_id), (status, message, stored_at))
+
+    def _compact(self):
+        """Rewrite the index with only the live entries (lock held)"""
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as file:
+            for (ack, device_id), (status, message, stored_at) in self._entries.items():
+                file.write(self.serializer.dumps([ack, device_id, status, message, stored_at]) + b"\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self._file.close()
+        os.replace(temporary, self.path)
+        self._file = open(self.path, "ab")
+        self._lines = len(self._entries)
@@ -0,0 +1,144 @@
+"""
+Payload Batching for IoTConnect Gateway
+Splits a tick's data_array into SendData chunks that stay under the broker's
+message size limit (128 KB on AWS IoT) and publishes the chunks concurrently.
+
+Sizes are measured per device payload as the batch is built, so splitting
+is a single pass. A device payload that is too large on its own is reported
+as a failed chunk instead of being sent, and the rest of the tick still goes
+out. Every chunk gets its own ChunkResult.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_BYTES = 128 * 1024
+# Room for the SDK's message envelope around data_array (cpid, dt, mt, ...)
+DEFAULT_ENVELOPE_BYTES = 1024
+
+
+def measure_json(item):
+    """
+    Serialized size of one payload as sdk.SendData writes it: json.dumps with
+    its default ", " and ": " separators (ASCII output, so characters are bytes)
+    """
+    return len(json.dumps(item))
+
+
+class Chunk:
+    """Device payloads that fit in one SendData call"""
+
+    __slots__ = ("index", "items", "size", "oversized")
+
+    def __init__(self, index, items, size, oversized=False):
+        self.index = index
+        self.items = items
+        self.size = size
+        self.oversized = oversized
+
+
+class ChunkResult:
+    """Outcome of publishing one chunk"""
+
+    __slots__ = ("index", "devices", "size", "ok", "error", "elapsed")
+
+    def __init__(self, index, devices, size, ok, error=None, elapsed=0.0):
+        self.index = index
+        self.devices = devices
+        self.size = size
+        self.ok = ok
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"failed: {self.error}"
+        return f"chunk {self.index}: {self.devices} devices, {self.size} bytes, {status}"
+
+
+class PayloadBatcher:
+    """
+    Split device payloads into chunks of at most max_bytes serialized.
+
+    Args:
+        max_bytes: Message size limit of the broker
+        envelope_bytes: Bytes reserved per message for the SDK envelope
+        measure: Function returning the serialized size of one device payload
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, envelope_bytes=DEFAULT_ENVELOPE_BYTES, measure=measure_json):
+        if max_bytes <= envelope_bytes:
+            raise ValueError("max_bytes must be larger than envelope_bytes")
+        self.max_bytes = max_bytes
+        self.envelope_bytes = envelope_bytes
+        self.measure = measure
+
+    def split(self, data_array):
+        """Return the chunks for data_array, keeping device order"""
+        budget = self.max_bytes - self.envelope_bytes
+        chunks = []
+        items = []
+        size = 2  # "[]"
+        for item in data_array:
+            item_size = self.measure(item)
+            if item_size + 2 > budget:
+                if items:
+                    chunks.append(Chunk(len(chunks), items, size + self.envelope_bytes))
+                    items = []
+                    size = 2
+                chunks.append(Chunk(len(chunks), [item], item_size + 2 + self.envelope_bytes, oversized=True))
+                continue
+            added = item_size + 2 if items else item_size  # ", " json.dumps puts between list items
+            if size + added > budget:
+                chunks.append(Chunk(len(chunks), items, size + self.envelope_bytes))
+                items = []
+                size = 2
+                added = item_size
+            items.append(item)
+            size += added
+        if items:
+            chunks.append(Chunk(len(chunks), items, size + self.envelope_bytes))
+        return chunks
+
+
+class ChunkPublisher:
+    """
+    Publish chunks concurrently with at most max_in_flight SendData calls at once.
+
+    Args:
+        send: Callable taking one chunk's list of device payloads (sdk.SendData)
+        max_in_flight: Size of the publish window
+    """
+
+    def __init__(self, send, max_in_flight=4):
+        self.send = send
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="publish")
+
+    def publish(self, chunks):
+        """Send every chunk; returns a ChunkResult per chunk, in chunk order"""
+        futures = [
+            None if chunk.oversized else self._executor.submit(self._send, chunk)
+            for chunk in chunks
+        ]
+        results = []
+        for chunk, future in zip(chunks, futures):
+            if future is None:
+                results.append(ChunkResult(
+                    chunk.index, len(chunk.items), chunk.size, False,
+                    f"device {chunk.items[0].get('uniqueId')} payload exceeds message size limit"
+                ))
+            else:
+                results.append(future.result())
+        return results
+
+    def _send(self, chunk):
+        start = time.perf_counter()
+        try:
+            self.send(chunk.items)
+        except Exception as e:
+            return ChunkResult(chunk.index, len(chunk.items), chunk.size, False, e, time.perf_counter() - start)
+        return ChunkResult(chunk.index, len(chunk.items), chunk.size, True, None, time.perf_counter() - start)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,282 @@
+"""
+Command Router for IoTConnect Gateway
+Takes device commands (ct 0) off the SDK's network thread and runs them on a
+bounded worker pool, so a slow handler never blocks MQTT processing.
+
+Each message is parsed once into a Command. Handlers are registered by
+command name (the first word of "cmd"); the ack is sent when the handler
+finishes, from the worker thread. A handler returns None/True for success,
+False for failure, or a string used as the success message; an exception
+fails the command with its message. When more than max_pending commands are
+waiting, new ones are refused and acked as failed straight away.
+
+With an ack_cache (src.gateway.ack_cache.AckCache), a command the cloud
+retries with the same ack id is not executed again: a finished one is acked
+with its stored result, and one still running is ignored.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.stats import LatencySamples
+
+LOG = logging.getLogger("iotconnect_gateway.commands")
+
+CT_DEVICE_COMMAND = 0
+
+# Acknowledgment status codes for device commands
+ACK_SUCCESS = 7
+ACK_FAILED = 4
+
+
+class Command:
+    """One parsed device command"""
+
+    __slots__ = ("name", "params", "device_id", "ack", "msg", "received")
+
+    def __init__(self, name, params, device_id, ack, msg, received):
+        self.name = name
+        self.params = params
+        self.device_id = device_id
+        self.ack = ack
+        self.msg = msg
+        self.received = received
+
+    def __repr__(self):
+        return f"Command({self.name!r}, {self.params}, device={self.device_id or 'gateway'})"
+
+
+def parse_command(msg, received=None):
+    """Command for a ct 0 message ("name" is "" for an empty cmd), or None for other messages"""
+    if not msg or msg.get("ct") != CT_DEVICE_COMMAND:
+        return None
+    parts = (msg.get("cmd") or "").split()
+    return Command(
+        parts[0] if parts else "",
+        parts[1:],
+        msg.get("id") or None,
+        msg.get("ack") or None,
+        msg,
+        time.monotonic() if received is None else received,
+    )
+
+
+class CommandStats:
+    """Queue depth and per-command latency (receipt to ack)"""
+
+    def __init__(self):
+        self.received = 0
+        self.duplicates = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.pending = 0
+        self.max_pending = 0
+        self.queue_wait = LatencySamples()
+        self.ack_latency = LatencySamples()  # every command, receipt to ack
+        self.latency = {}  # command name -> LatencySamples
+        self._lock = threading.Lock()
+
+    def samples(self, name):
+        with self._lock:
+            samples = self.latency.get(name)
+            if samples is None:
+                samples = self.latency[name] = LatencySamples()
+            return samples
+
+    def __repr__(self):
+        return (
+            f"received={self.received} duplicates={self.duplicates} completed={self.completed} failed={self.failed} "
+            f"rejected={self.rejected} pending={self.pending} max_pending={self.max_pending}"
+        )
+
+
+class CommandRouter:
+    """
+    Dispatch device commands to registered handlers on a worker pool.
+
+    Args:
+        send_ack: Callable(ack, status, message, device_id) sending the ack
+        max_workers: Handlers running at once
+        max_pending: Commands queued or running before new ones are refused
+        default_handler: Handler for names without a registered handler;
+            without one, unknown commands fail
+        ack_cache: AckCache of finished commands, for idempotent retries
+    """
+
+    def __init__(self, send_ack, max_workers=4, max_pending=1000, default_handler=None, ack_cache=None):
+        self.send_ack = send_ack
+        self.ack_cache = ack_cache
+        self._in_flight = set()  # (ack, device_id) of commands accepted and not yet acked
+        self.max_pending = max_pending
+        self.default_handler = default_handler
+        self.stats = CommandStats()
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="command")
+
+    def register(self, name, handler):
+        self._handlers[name] = handler
+
+    def handler(self, name):
+        """Decorator form of register()"""
+        def decorator(function):
+            self.register(name, function)
+            return function
+        return decorator
+
+    def submit(self, msg):
+        """Parse and queue a message from the SDK callback; returns the Command or None"""
+        command = parse_command(msg)
+        if command is None:
+            return None
+        stats = self.stats
+        key = (command.ack, command.device_id)
+        cached = None
+        with self._lock:
+            stats.received += 1
+            # Cache and in-flight set are checked under one lock: _run stores the
+            # result before it leaves _in_flight, so a retry always finds one of them
+            if command.ack and self.ack_cache is not None:
+                cached = self.ack_cache.get(*key)
+            duplicate = cached is not None or (command.ack and key in self._in_flight)
+            if duplicate:
+                stats.duplicates += 1
+                refused = False
+            elif stats.pending >= self.max_pending:
+                stats.rejected += 1
+                refused = True
+            else:
+                stats.pending += 1
+                stats.max_pending = max(stats.max_pending, stats.pending)
+                if command.ack:
+                    self._in_flight.add(key)
+                refused = False
+        if cached is not None:
+            self._ack(command, *cached)
+            return command
+        if duplicate:
+            return command
+        if refused:
+            self._ack(command, ACK_FAILED, "gateway busy, command refused")
+            return command
+        self._dispatch(command)
+        return command
+
+    def close(self, wait=True, timeout=5.0):
+        """Stop the pool; with wait, first finish accepted commands (up to timeout seconds)"""
+        if wait:
+            deadline = time.monotonic() + timeout
+            while self.stats.pending and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self._executor.shutdown(wait=wait)
+
+    def _dispatch(self, command):
+        """Run command on the pool; a subclass may change how commands are scheduled"""
+        self._executor.submit(self._run, command)
+
+    def _run(self, command):
+        started = time.monotonic()
+        self.stats.queue_wait.add(started - command.received)
+        status, message = self._execute(command)
+        if command.ack and self.ack_cache is not None:
+            try:
+                self.ack_cache.put(command.ack, command.device_id, status, message)
+            except Exception as e:
+                LOG.error("Failed to store ack for command '%s' (%s): %s", command.name, command.ack, e)
+        self._ack(command, status, message)
+        with self._lock:
+            self.stats.pending -= 1
+            self._in_flight.discard((command.ack, command.device_id))
+            if status == ACK_SUCCESS:
+                self.stats.completed += 1
+            else:
+                self.stats.failed += 1
+        latency = time.monotonic() - command.received
+        self.stats.ack_latency.add(latency)
+        self.stats.samples(command.name).add(latency)
+        LOG.debug("Command '%s' for %s: ack %s (%s) in %.1f ms",
+                  command.name, command.device_id or "gateway", status, message, latency * 1000)
+
+    def _execute(self, command):
+        if not command.name:
+            return ACK_FAILED, "no command provided"
+        handler = self._handlers.get(command.name, self.default_handler)
+        if handler is None:
+            return ACK_FAILED, f"unknown command '{command.name}'"
+        try:
+            result = handler(command)
+        except Exception as e:
+            return ACK_FAILED, f"command execution failed: {e}"
+        if result is False:
+            return ACK_FAILED, "command execution failed"
+        if isinstance(result, str):
+            return ACK_SUCCESS, result
+        return ACK_SUCCESS, "command executed successfully"
+
+    def _ack(self, command, status, message):
+        if not command.ack:
+            return
+        try:
+            self.send_ack(command.ack, status, message, command.device_id)
+        except Exception as e:
+            LOG.error("Failed to ack command '%s' (%s): %s", command.name, command.ack, e)
+
+
+class OrderedCommandRouter(CommandRouter):
+    """
+    CommandRouter that keeps commands for the same device in order.
+
+    Each device (id, or the gateway itself) has a mailbox; at most one of its
+    commands runs at a time, in arrival order, while different devices run in
+    parallel up to max_workers. After each command a device with more mail
+    goes to the back of the pool's queue, so one busy or slow device never
+    holds more than one worker. Commands still waiting in a mailbox when
+    close() gives up are acked as failed.
+    """
+
+    def __init__(self, send_ack, max_workers=4, max_pending=1000, default_handler=None, ack_cache=None):
+        super().__init__(send_ack, max_workers, max_pending, default_handler, ack_cache)
+        self._mailboxes = {}  # device id -> deque of Command; present while the device is scheduled
+        self._mailbox_lock = threading.Lock()
+
+    def _dispatch(self, command):
+        with self._mailbox_lock:
+            mailbox = self._mailboxes.get(command.device_id)
+            if mailbox is not None:
+                mailbox.append(command)
+                return
+            self._mailboxes[command.device_id] = deque((command,))
+        self._executor.submit(self._drain_one, command.device_id)
+
+    def _drain_one(self, device_id):
+        with self._mailbox_lock:
+            command = self._mailboxes[device_id].popleft()
+        try:
+            self._run(command)
+        finally:
+            with self._mailbox_lock:
+                more = bool(self._mailboxes[device_id])
+                if not more:
+                    del self._mailboxes[device_id]
+            if more:
+                try:
+                    self._executor.submit(self._drain_one, device_id)
+                except RuntimeError:
+                    pass  # pool shut down: close() acks what is left in the mailbox
+
+    def close(self, wait=True, timeout=5.0):
+        super().close(wait, timeout)
+        with self._mailbox_lock:
+            waiting = [command for mailbox in self._mailboxes.values() for command in mailbox]
+            for mailbox in self._mailboxes.values():
+                mailbox.clear()
+        for command in waiting:
+            self._ack(command, ACK_FAILED, "gateway shutting down")
+            with self._lock:
+                self.stats.pending -= 1
+                self.stats.failed += 1
+                self._in_flight.discard((command.ack, command.device_id))
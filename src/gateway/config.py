@@ -1,17 +1,342 @@
+"""
+Gateway Configuration
+Parses config/device_config.json and config/iotconnect_config.json once into
+an immutable, indexed ConfigSnapshot (devices by uniqueId and by deviceType,
+the SDK settings), and watches both files for changes.
+
+ConfigService checks the files' modification stamps every poll_interval
+seconds on a daemon thread and re-parses only a file that changed. The new
+snapshot replaces the old one in a single attribute assignment, so readers
+always see one complete version without taking a lock. A file that fails to
+parse is logged and the previous snapshot stays in force. Listeners get
+the snapshot and the DeviceChanges (added, removed and changed devices) so
+they can update their own state incrementally.
+
+device_config.json lists devices one by one or in groups that share a type
+and model:
+
+    {"devices": [
+        {"type": "gateway", "name": "Gateway-v3", "uniqueId": "GW-20001448"},
+        {"type": "thermostat", "model": "PCT504-E", "devices": [
+            {"uniqueId": "Thermostat-504112112200301", "name": "Stat-1"}
+        ]}
+    ]}
+
+Each device becomes {"uniqueId", "name", "model", "deviceType"} plus any
+other plain value it sets (e.g. "dataFrequency"); "attributes" blocks
+describe the payload and are not part of the snapshot.
+"""
+
 import json
+import logging
 import os
+import threading
+from types import MappingProxyType
+
+from src.utils.frozen import FrozenDict
+
+LOG = logging.getLogger("iotconnect_gateway.config")
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "config")
+DEVICE_CONFIG_PATH = os.path.normpath(os.path.join(CONFIG_DIR, "device_config.json"))
+IOTCONNECT_CONFIG_PATH = os.path.normpath(os.path.join(CONFIG_DIR, "iotconnect_config.json"))
+
+GATEWAY_TYPE = "gateway"
+
+# Group fields that are not handed down to the group's devices
+_NOT_INHERITED = frozenset(("devices", "attributes", "uniqueId", "name"))
+
+
+class ConfigError(Exception):
+    """A configuration file is missing, is not valid JSON or is inconsistent"""
+
+
+class FrozenRecord(FrozenDict):
+    """
+    Read-only dict for configuration records. Unlike a mappingproxy it can
+    be pickled (e.g. handed to worker processes) and serialized as JSON.
+    """
+
+    __slots__ = ()
+
+
+def _freeze(value):
+    """Read-only copy of parsed JSON: dicts become FrozenRecords, lists tuples"""
+    if isinstance(value, dict):
+        return FrozenRecord({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _device(fields):
+    device = {
+        "uniqueId": fields["uniqueId"],
+        "name": fields.get("name", fields["uniqueId"]),
+        "model": fields.get("model", ""),
+        "deviceType": fields.get("type", fields.get("deviceType", "")),
+    }
+    for key, value in fields.items():
+        if key not in device and key not in ("type", "attributes", "devices") and not isinstance(value, (dict, list)):
+            device[key] = value
+    return FrozenRecord(device)
+
+
+def parse_devices(document):
+    """
+    Flatten a device_config.json document into (gateway, devices).
+
+    gateway is the entry of type "gateway" (or None); devices are the
+    children in file order. Raises ConfigError for a device without a
+    uniqueId or a uniqueId listed twice.
+    """
+    gateway = None
+    devices = []
+    seen = set()
+    for entry in document.get("devices", ()):
+        if "devices" in entry:
+            shared = {key: value for key, value in entry.items() if key not in _NOT_INHERITED}
+            members = [dict(shared, **member) for member in entry["devices"]]
+        else:
+            members = [entry]
+        for fields in members:
+            if not fields.get("uniqueId"):
+                raise ConfigError(f"Device without a uniqueId: {fields.get('name', fields)!r}")
+            device = _device(fields)
+            if device["uniqueId"] in seen:
+                raise ConfigError(f"Device {device['uniqueId']!r} is listed more than once")
+            seen.add(device["uniqueId"])
+            if device["deviceType"] == GATEWAY_TYPE and gateway is None:
+                gateway = device
+            else:
+                devices.append(device)
+    return gateway, devices
+
+
+class ConfigSnapshot:
+    """
+    One immutable version of the gateway configuration.
+
+    Attributes:
+        version: Increments with every snapshot a ConfigService publishes
+        gateway: The gateway's own device entry, or None
+        devices: Child devices in file order (FrozenRecords)
+        by_id: uniqueId -> device
+        by_type: deviceType -> tuple of devices
+        iotconnect: iotconnect_config.json, read-only
+    """
+
+    __slots__ = ("version", "gateway", "devices", "by_id", "by_type", "iotconnect")
+
+    def __init__(self, gateway, devices, iotconnect=None, version=1):
+        by_type = {}
+        for device in devices:
+            by_type.setdefault(device["deviceType"], []).append(device)
+        self.version = version
+        self.gateway = gateway
+        self.devices = tuple(devices)
+        self.by_id = MappingProxyType({device["uniqueId"]: device for device in self.devices})
+        self.by_type = MappingProxyType({key: tuple(group) for key, group in by_type.items()})
+        self.iotconnect = _freeze(iotconnect or {})
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __contains__(self, unique_id):
+        return unique_id in self.by_id
+
+    def device(self, unique_id):
+        """Device entry for unique_id, or None"""
+        return self.by_id.get(unique_id)
+
+    def sdk_options(self, base):
+        """
+        Copy of the SDK options base with cpid, env and pf taken from
+        iotconnect_config.json where it sets them.
+        """
+        options = dict(base)
+        for option, key in (("cpid", "CPID"), ("env", "Environment"), ("pf", "Platform")):
+            if self.iotconnect.get(key):
+                options[option] = self.iotconnect[key]
+        return options
+
+    def __repr__(self):
+        return f"ConfigSnapshot(version={self.version}, devices={len(self.devices)}, types={len(self.by_type)})"
+
+
+class DeviceChanges:
+    """Devices added, removed and changed (same uniqueId, new fields) between two snapshots"""
+
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(self, added=(), removed=(), changed=()):
+        self.added = tuple(added)
+        self.removed = tuple(removed)
+        self.changed = tuple(changed)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return f"added={len(self.added)} removed={len(self.removed)} changed={len(self.changed)}"
+
+
+def diff_devices(old, new):
+    """DeviceChanges from snapshot old to snapshot new; changed holds the new entries"""
+    added = [device for device in new.devices if device["uniqueId"] not in old.by_id]
+    removed = [device for device in old.devices if device["uniqueId"] not in new.by_id]
+    changed = [
+        device for device in new.devices
+        if device["uniqueId"] in old.by_id and old.by_id[device["uniqueId"]] != device
+    ]
+    return DeviceChanges(added, removed, changed)
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Cannot read {path}: {e}") from e
+
+
+def _stamp(path):
+    """What identifies one version of a file: (mtime_ns, size, inode), None if missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class ConfigStats:
+    """Checks made and snapshots published"""
 
-class Config:
     def __init__(self):
-        self.device_config = self.load_device_config()
-        self.iotconnect_config = self.load_iotconnect_config()
+        self.checks = 0
+        self.reloads = 0
+        self.errors = 0
+
+    def __repr__(self):
+        return f"checks={self.checks} reloads={self.reloads} errors={self.errors}"
+
+
+class ConfigService:
+    """
+    Current ConfigSnapshot, reloaded when the files change.
+
+    The first load happens in the constructor and raises ConfigError;
+    later failed reloads are logged and keep the previous snapshot.
+
+    Args:
+        device_path: device_config.json
+        iotconnect_path: iotconnect_config.json, optional (None skips it)
+        poll_interval: Seconds between checks of the files once started
+    """
+
+    def __init__(self, device_path=DEVICE_CONFIG_PATH, iotconnect_path=IOTCONNECT_CONFIG_PATH, poll_interval=2.0):
+        self.device_path = device_path
+        self.iotconnect_path = iotconnect_path
+        self.poll_interval = poll_interval
+        self.stats = ConfigStats()
+        self._stamps = {}
+        self._rejected = None  # stamps of the last set of files that failed to load
+        self._documents = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        for path in self._paths():
+            self._stamps[path] = _stamp(path)
+            self._documents[path] = _read_json(path)
+        self.snapshot = self._build(1)
+
+    def _paths(self):
+        return [path for path in (self.device_path, self.iotconnect_path) if path]
+
+    def _build(self, version):
+        gateway, devices = parse_devices(self._documents[self.device_path])
+        iotconnect = self._documents.get(self.iotconnect_path) if self.iotconnect_path else None
+        return ConfigSnapshot(gateway, devices, iotconnect, version)
+
+    def subscribe(self, listener):
+        """Call listener(snapshot, changes) after every reload; changes may be empty"""
+        self._listeners.append(listener)
+
+    def check(self):
+        """
+        Re-parse whichever file changed since the last check and publish a new
+        snapshot; returns its DeviceChanges, or None if nothing was reloaded.
+        """
+        with self._lock:
+            self.stats.checks += 1
+            stamps = {path: _stamp(path) for path in self._paths()}
+            if stamps == self._stamps or stamps == self._rejected:
+                return None  # unchanged, or the same files already failed to load
+            documents = dict(self._documents)
+            try:
+                for path, stamp in stamps.items():
+                    if stamp != self._stamps.get(path):
+                        documents[path] = _read_json(path)
+            except ConfigError as e:
+                self._rejected = stamps
+                self.stats.errors += 1
+                LOG.error("Config: keeping the current configuration, %s", e)
+                return None
+            previous = self.snapshot
+            saved, self._documents = self._documents, documents
+            try:
+                snapshot = self._build(previous.version + 1)
+            except (ConfigError, KeyError, TypeError, AttributeError) as e:
+                self._documents = saved
+                self._rejected = stamps
+                self.stats.errors += 1
+                LOG.error("Config: keeping the current configuration, invalid %s: %r", self.device_path, e)
+                return None
+            # Stamps are recorded only together with the documents they belong to,
+            # so a file that changed alongside a broken one is applied once it is fixed
+            self._stamps = stamps
+            self.snapshot = snapshot
+            self.stats.reloads += 1
+        changes = diff_devices(previous, snapshot)
+        for listener in self._listeners:
+            try:
+                listener(snapshot, changes)
+            except Exception as e:
+                LOG.error("Config listener failed: %s", e)
+        return changes
+
+    def start(self):
+        """Check the files every poll_interval seconds on a daemon thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="config-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+
+def load_config(device_path=DEVICE_CONFIG_PATH, iotconnect_path=IOTCONNECT_CONFIG_PATH):
+    """Both files as parsed JSON: (device_config, iotconnect_config)"""
+    return _read_json(device_path), _read_json(iotconnect_path)
+
+
+class Config:
+    """Both configuration files as parsed JSON (see ConfigService for the indexed, reloadable form)"""
+
+    def __init__(self, device_path=DEVICE_CONFIG_PATH, iotconnect_path=IOTCONNECT_CONFIG_PATH):
+        self.device_config, self.iotconnect_config = load_config(device_path, iotconnect_path)
 
     def load_device_config(self):
-        config_path = os.path.join(os.path.dirname(__file__), '../../config/device_config.json')
-        with open(config_path, 'r') as file:
-            return json.load(file)
+        return _read_json(DEVICE_CONFIG_PATH)
 
     def load_iotconnect_config(self):
-        config_path = os.path.join(os.path.dirname(__file__), '../../config/iotconnect_config.json')
-        with open(config_path, 'r') as file:
-            return json.load(file)
\ No newline at end of file
+        return _read_json(IOTCONNECT_CONFIG_PATH)
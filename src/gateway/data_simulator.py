@@ -1,15 +1,16 @@
 import json
 import time
 import random
-from datetime import datetime
 from src.devices.gateway_device import GatewayDevice
 from src.devices.thermostat_device import ThermostatDevice
+from src.utils.clock import TickClock
 
 class DataSimulator:
-    def __init__(self, gateway_device, thermostat_devices, frequency=60):
+    def __init__(self, gateway_device, thermostat_devices, frequency=60, clock=None):
         self.gateway_device = gateway_device
         self.thermostat_devices = thermostat_devices
         self.frequency = frequency
+        self.clock = clock or TickClock()
 
     def generate_gateway_data(self):
         return {
@@ -29,10 +30,11 @@ class DataSimulator:
         return data
 
     def get_current_time(self):
-        return datetime.utcnow().isoformat() + 'Z'
+        return self.clock.current.iso
 
     def run(self):
         while True:
+            self.clock.tick()
             gateway_data = self.generate_gateway_data()
             thermostat_data = self.generate_thermostat_data()
 
@@ -0,0 +1,186 @@
+"""
+Report-by-Exception for IoTConnect Gateway
+Sends only the attributes whose value changed beyond a deadband since they
+were last sent, instead of every attribute of every device on every tick.
+
+Deadbands are looked up per device tag (the template attribute "tag",
+which matches a child's deviceType) and derived from the attribute
+definitions in the device template: numeric attributes get a deadband by
+unit (e.g. 0.5 for Fahrenheit), everything else is sent on any change.
+Each device periodically sends a full snapshot (keyframe) so the cloud
+resyncs even if a delta was lost.
+"""
+
+import json
+
+from src.gateway.batcher import measure_json
+
+# Default deadband per template unit for decimal/integer attributes
+DEFAULT_UNIT_DEADBANDS = {
+    "Fahrenheit": 0.5,
+    "V": 1.0,
+    "W": 50.0,
+    "kWh": 0.1,
+    "%": 1.0,
+}
+
+
+def load_deadbands(template_path, unit_deadbands=None, overrides=None):
+    """
+    Build {tag: deadband tree} from a device template.
+
+    A deadband tree mirrors the payload nesting: {"hvacThermostat":
+    {"localTemperature": 0.5}}. Attributes without a deadband are omitted
+    and are sent whenever their value changes.
+
+    overrides maps "tag" to {"dotted.attribute.path": deadband} and takes
+    precedence over the unit defaults.
+    """
+    if unit_deadbands is None:
+        unit_deadbands = DEFAULT_UNIT_DEADBANDS
+    with open(template_path, 'r') as file:
+        template = json.load(file)
+
+    def build(attributes):
+        tree = {}
+        for attribute in attributes:
+            if attribute.get("childs"):
+                subtree = build(attribute["childs"])
+                if subtree:
+                    tree[attribute["name"]] = subtree
+            elif attribute["type"] in ("decimal", "integer") and attribute.get("unit") in unit_deadbands:
+                tree[attribute["name"]] = unit_deadbands[attribute["unit"]]
+        return tree
+
+    deadbands = {}
+    for attribute in template["attributes"]:
+        tree = deadbands.setdefault(attribute.get("tag", template.get("tag")), {})
+        tree.update(build([attribute]))
+
+    for tag, paths in (overrides or {}).items():
+        for path, deadband in paths.items():
+            node = deadbands.setdefault(tag, {})
+            *parents, leaf = path.split(".")
+            for name in parents:
+                node = node.setdefault(name, {})
+            node[leaf] = deadband
+    return deadbands
+
+
+class DeltaStats:
+    """Bytes a tick would have sent in full versus what delta mode sent"""
+
+    __slots__ = ("devices", "keyframes", "full_bytes", "sent_bytes")
+
+    def __init__(self):
+        self.devices = 0
+        self.keyframes = 0
+        self.full_bytes = 0
+        self.sent_bytes = 0
+
+    @property
+    def saved_bytes(self):
+        return self.full_bytes - self.sent_bytes
+
+    def __repr__(self):
+        percent = 100.0 * self.saved_bytes / self.full_bytes if self.full_bytes else 0.0
+        return (
+            f"{self.devices} devices ({self.keyframes} keyframes), "
+            f"{self.sent_bytes}/{self.full_bytes} bytes, saved {self.saved_bytes} ({percent:.1f}%)"
+        )
+
+
+class DeltaEncoder:
+    """
+    Tracks the last-sent value of every attribute per device.
+
+    Args:
+        deadbands: {tag: deadband tree} from load_deadbands
+        device_tags: {uniqueId: tag} for every device that may be sent
+        keyframe_interval: Seconds between full snapshots of each device
+        measure: Serialized size of one data_array item, for DeltaStats
+    """
+
+    def __init__(self, deadbands, device_tags, keyframe_interval=3600, measure=measure_json):
+        self.deadbands = deadbands
+        self.device_tags = device_tags
+        self.keyframe_interval = keyframe_interval
+        self.measure = measure
+        self._last_sent = {}
+        self._last_keyframe = {}
+
+    def reset(self, unique_id=None):
+        """Force a keyframe for one device, or all devices, on their next send"""
+        if unique_id is None:
+            self._last_keyframe.clear()
+        else:
+            self._last_keyframe.pop(unique_id, None)
+
+    def undelivered(self, data_array):
+        """
+        Key-frame the devices of payloads apply() returned that never reached
+        the cloud: their last-sent values already count them as sent.
+        """
+        for item in data_array:
+            self.reset(item["uniqueId"])
+
+    def apply(self, data_array, now):
+        """
+        Return (delta data_array, DeltaStats) for one tick.
+
+        Devices with nothing to report are left out of the returned array.
+        """
+        stats = DeltaStats()
+        result = []
+        for item in data_array:
+            unique_id = item["uniqueId"]
+            stats.devices += 1
+            full_size = self.measure(item)
+            stats.full_bytes += full_size
+
+            last_keyframe = self._last_keyframe.get(unique_id)
+            if last_keyframe is None or now - last_keyframe >= self.keyframe_interval:
+                self._last_keyframe[unique_id] = now
+                self._last_sent[unique_id] = {}
+                stats.keyframes += 1
+
+            deadbands = self.deadbands.get(self.device_tags.get(unique_id), {})
+            delta = _diff(item["data"], self._last_sent.setdefault(unique_id, {}), deadbands)
+            if not delta:
+                continue
+            if len(delta) == len(item["data"]) and delta == item["data"]:
+                sent = item
+                stats.sent_bytes += full_size
+            else:
+                sent = {"uniqueId": unique_id, "time": item["time"], "data": delta}
+                stats.sent_bytes += self.measure(sent)
+            result.append(sent)
+        return result, stats
+
+
+def _diff(data, last, deadbands):
+    """Changed part of data versus last (updated in place to what is sent)"""
+    delta = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            last_node = last.get(key)
+            if not isinstance(last_node, dict):
+                last_node = last[key] = {}
+            nested = _diff(value, last_node, deadbands.get(key) or {})
+            if nested:
+                delta[key] = nested
+            continue
+        if key in last:
+            previous = last[key]
+            deadband = deadbands.get(key)
+            if (
+                deadband
+                and type(value) in (int, float) and type(previous) in (int, float)
+            ):
+                if abs(value - previous) < deadband:
+                    continue
+            elif value == previous and type(value) is type(previous):
+                continue
+        last[key] = value
+        delta[key] = value
+    return delta
@@ -0,0 +1,215 @@
+"""
+Device Registry for IoTConnect Gateway
+Maps (deviceType, model) pairs to data generators once at startup and builds
+a precomputed telemetry plan so each tick costs one call per device.
+"""
+
+import time
+
+from data_generators import (
+    generate_pct504e_data,
+    generate_tbh300_data,
+    generate_gesysense_receiver_data,
+    generate_gesysense_temperature_data,
+    generate_energy_data,
+    generate_lighting_data,
+    generate_refrigeration_data,
+    generate_temperature_zigbee_data,
+)
+
+# Registering a generator under ANY_MODEL makes it the fallback for every
+# model of that deviceType (ZigBee sensors, for example, have an empty model).
+ANY_MODEL = None
+
+
+class DeviceRegistry:
+    """Lookup table from (deviceType, model) to a generator function"""
+
+    def __init__(self):
+        self._generators = {}
+        self._batch_generators = {}
+
+    def register(self, device_type, model, generator, batch_generator=None):
+        """
+        Register generator for device_type/model; model=ANY_MODEL matches all models.
+
+        batch_generator, if given, takes a device count and returns that many
+        payloads in one call (see batch_generators.py). Plans built from this
+        registry use it for every group of devices sharing the generator.
+        """
+        self._generators[(device_type, model)] = generator
+        if batch_generator is not None:
+            self._batch_generators[generator] = batch_generator
+
+    def resolve(self, device_type, model):
+        """Return the generator for device_type/model, or None if unknown"""
+        generator = self._generators.get((device_type, model))
+        if generator is None:
+            generator = self._generators.get((device_type, ANY_MODEL))
+        return generator
+
+    def build_plan(self, devices):
+        """
+        Resolve every device once and return a TelemetryPlan.
+
+        Devices without a registered generator are left out of the plan and
+        listed in plan.skipped so the caller can report them a single time.
+        """
+        entries = []
+        planned = []
+        skipped = []
+        for device in devices:
+            generator = self.resolve(device.get("deviceType", ""), device.get("model", ""))
+            if generator is None:
+                skipped.append(device)
+                continue
+            entries.append((device["uniqueId"], generator))
+            planned.append(device)
+        return TelemetryPlan(entries, skipped, self._batch_generators, planned)
+
+    def update_plan(self, plan, added=(), removed=()):
+        """
+        Return (new plan, moved) with the devices in added appended and the
+        uniqueIds in removed left out, resolving only the added devices.
+
+        moved maps each kept device's old plan position to its new one, so a
+        scheduler can carry its due times over (see sampling.reschedule_plan).
+        """
+        removed = set(removed)
+        entries = []
+        planned = []
+        moved = {}
+        for position, (entry, device) in enumerate(zip(plan.entries, plan.devices)):
+            if entry[0] not in removed:
+                moved[position] = len(entries)
+                entries.append(entry)
+                planned.append(device)
+        skipped = [device for device in plan.skipped if device["uniqueId"] not in removed]
+        for device in added:
+            generator = self.resolve(device.get("deviceType", ""), device.get("model", ""))
+            if generator is None:
+                skipped.append(device)
+                continue
+            entries.append((device["uniqueId"], generator))
+            planned.append(device)
+        return TelemetryPlan(entries, skipped, self._batch_generators, planned), moved
+
+
+class TelemetryPlan:
+    """
+    Precomputed (uniqueId, generator) list walked once per telemetry tick.
+
+    entries[i] belongs to devices[i]; positions into entries are stable for
+    the lifetime of the plan, so schedulers can refer to devices by position.
+    """
+
+    __slots__ = ("entries", "skipped", "devices", "_batches", "_batch_for")
+
+    def __init__(self, entries, skipped=(), batch_generators=None, devices=()):
+        self.entries = tuple(entries)
+        self.skipped = tuple(skipped)
+        self.devices = tuple(devices)
+        batch_generators = batch_generators or {}
+        self._batch_for = tuple(batch_generators.get(generator) for _, generator in self.entries)
+        self._batches = self._group(range(len(self.entries)))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _group(self, positions):
+        """Group positions that share a batch generator: ((batch, positions), ...)"""
+        groups = {}
+        for position in positions:
+            batch = self._batch_for[position]
+            if batch is not None:
+                groups.setdefault(batch, []).append(position)
+        return tuple(groups.items())
+
+    def generate(self, timestamp, positions=None, timers=None):
+        """
+        Build child payloads for one tick, in device order.
+
+        positions limits the tick to those plan positions (e.g. the devices
+        a SamplingScheduler reports as due); by default every device is built.
+        timers, if given, holds one histogram per plan position that
+        observes each device's generation time (a batch's time is shared
+        evenly by its devices).
+        """
+        entries = self.entries
+        if positions is None:
+            batches = self._batches
+            positions = range(len(entries))
+        else:
+            positions = sorted(positions)
+            batches = self._group(positions) if self._batches else ()
+
+        if timers is not None:
+            return self._generate_timed(timestamp, positions, batches, timers)
+        if not batches:
+            return [
+                {"uniqueId": entries[i][0], "time": timestamp, "data": entries[i][1]()}
+                for i in positions
+            ]
+
+        data = {}
+        for batch, grouped in batches:
+            data.update(zip(grouped, batch(len(grouped))))
+        return [
+            {"uniqueId": entries[i][0], "time": timestamp, "data": data[i] if i in data else entries[i][1]()}
+            for i in positions
+        ]
+
+    def _generate_timed(self, timestamp, positions, batches, timers):
+        entries = self.entries
+        clock = time.perf_counter
+        data = {}
+        for batch, grouped in batches:
+            start = clock()
+            data.update(zip(grouped, batch(len(grouped))))
+            timers[grouped[0]].observe((clock() - start) / len(grouped), len(grouped))
+        payloads = []
+        for i in positions:
+            if i in data:
+                values = data[i]
+            else:
+                start = clock()
+                values = entries[i][1]()
+                timers[i].observe(clock() - start)
+            payloads.append({"uniqueId": entries[i][0], "time": timestamp, "data": values})
+        return payloads
+
+
+def default_registry(vectorized=False):
+    """
+    Registry pre-populated with every device model the gateway simulates.
+
+    With vectorized=True the NumPy batch generators are registered too, so
+    each model's devices are generated in one pass per tick.
+    """
+    batch = {}
+    if vectorized:
+        import batch_generators
+        batch = {
+            generate_pct504e_data: batch_generators.generate_pct504e_batch,
+            generate_tbh300_data: batch_generators.generate_tbh300_batch,
+            generate_temperature_zigbee_data: batch_generators.generate_temperature_zigbee_batch,
+            generate_gesysense_receiver_data: batch_generators.generate_gesysense_receiver_batch,
+            generate_gesysense_temperature_data: batch_generators.generate_gesysense_temperature_batch,
+            generate_energy_data: batch_generators.generate_energy_batch,
+            generate_refrigeration_data: batch_generators.generate_refrigeration_batch,
+            generate_lighting_data: batch_generators.generate_lighting_batch,
+        }
+
+    registry = DeviceRegistry()
+    for device_type, model, generator in (
+        ("thermostat", "PCT504-E", generate_pct504e_data),
+        ("thermostat", "TBH300", generate_tbh300_data),
+        ("temperature_zigbee", ANY_MODEL, generate_temperature_zigbee_data),
+        ("gesysense", "P.W01211", generate_gesysense_receiver_data),
+        ("gesysense", "P.W01101-2", generate_gesysense_temperature_data),
+        ("energy", ANY_MODEL, generate_energy_data),
+        ("refrigeration", ANY_MODEL, generate_refrigeration_data),
+        ("lighting", ANY_MODEL, generate_lighting_data),
+    ):
+        registry.register(device_type, model, generator, batch.get(generator))
+    return registry
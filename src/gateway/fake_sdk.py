@@ -0,0 +1,226 @@
+"""
+Local Stand-in IoTConnect SDK
+Same surface as iotconnect.IoTConnectSDK as used by the gateway apps, without
+a broker, certificates or network, for repeatable throughput tests offline.
+
+Publishes (SendData, acks, twin updates) are recorded and counted, each one
+blocking for a configurable broker latency. Cloud commands are injected
+with inject_command / inject_ota / inject_twin and delivered to the
+registered on*Command callbacks on a single dispatch thread, like the real
+SDK's MQTT network thread.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+from src.utils.serializer import dumps
+
+LOG = logging.getLogger("iotconnect_gateway.fake_sdk")
+
+# IoTConnect command types ("ct")
+CT_DEVICE_COMMAND = 0
+CT_OTA_COMMAND = 1
+CT_CONNECTION_STATUS = 116
+
+
+class Publish:
+    """One message the gateway published"""
+
+    __slots__ = ("kind", "payload", "size", "time")
+
+    def __init__(self, kind, payload, size, time):
+        self.kind = kind
+        self.payload = payload
+        self.size = size
+        self.time = time
+
+    def __repr__(self):
+        return f"Publish({self.kind}, {self.size} bytes)"
+
+
+class FakeIoTConnectSDK:
+    """
+    Drop-in for IoTConnectSDK(uniqueId, sdkOptions, initCallback).
+
+    Args:
+        uniqueId: Gateway unique ID
+        sdkOptions: Ignored; accepted for signature compatibility
+        initCallback: Called with a connection status message (ct 116) on
+            connect and disconnect
+        devices: Child devices returned by Getdevice(), as {"id", "tg"} dicts
+        latency: Seconds each publish blocks, simulating the broker round trip
+        jitter: Extra random latency, uniform in [0, jitter) seconds
+        max_records: Publishes kept in .published (oldest dropped first);
+            counters cover every publish
+        sink: Optional callable receiving every Publish, e.g. to write them out
+    """
+
+    def __init__(self, uniqueId, sdkOptions=None, initCallback=None, devices=None,
+                 latency=0.0, jitter=0.0, max_records=10000, sink=None):
+        self.uniqueId = uniqueId
+        self.sdkOptions = sdkOptions
+        self.devices = list(devices or [])
+        self.latency = latency
+        self.jitter = jitter
+        self.sink = sink
+        self.published = deque(maxlen=max_records)
+        self.messages = 0
+        self.bytes = 0
+        self.connected = False
+        self._init_callback = initCallback
+        self._callbacks = {}
+        self._failures = deque()
+        self._lock = threading.Lock()
+        self._commands = queue.Queue()
+        self._dispatcher = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.disconnect()
+        return False
+
+    def connect(self):
+        if self.connected:
+            return
+        self.connected = True
+        self._dispatcher = threading.Thread(target=self._dispatch, name="fake-sdk-dispatch", daemon=True)
+        self._dispatcher.start()
+        self._notify_connection(True)
+
+    def disconnect(self):
+        if not self.connected:
+            return
+        self.connected = False
+        self._commands.put(None)
+        self._dispatcher.join()
+        self._dispatcher = None
+        self._notify_connection(False)
+
+    # ------------------------------------------------------------------
+    # SDK surface
+    # ------------------------------------------------------------------
+
+    def SendData(self, data):
+        self._publish("data", data)
+
+    def sendAckCmd(self, ackGuid, status, msg, childId=None):
+        self._publish("ack", {"ack": ackGuid, "st": status, "msg": msg, "id": childId})
+
+    def sendOTAAckCmd(self, ackGuid, status, msg, childId=None):
+        self._publish("ota_ack", {"ack": ackGuid, "st": status, "msg": msg, "id": childId})
+
+    def UpdateTwin(self, key, value):
+        self._publish("twin", {key: value})
+
+    def UpdateTwins(self, properties):
+        """Report several twin properties in one message"""
+        self._publish("twin", dict(properties))
+
+    def Getdevice(self):
+        return [dict(device) for device in self.devices]
+
+    def onDeviceCommand(self, callback):
+        self._callbacks[CT_DEVICE_COMMAND] = callback
+
+    def onOTACommand(self, callback):
+        self._callbacks[CT_OTA_COMMAND] = callback
+
+    def onTwinChangeCommand(self, callback):
+        self._callbacks["twin"] = callback
+
+    # ------------------------------------------------------------------
+    # Test controls
+    # ------------------------------------------------------------------
+
+    def inject_command(self, cmd, ack=None, device_id=None, **fields):
+        """Deliver a device command (ct 0) to the onDeviceCommand callback"""
+        msg = dict(fields, ct=CT_DEVICE_COMMAND, cmd=cmd)
+        if ack is not None:
+            msg["ack"] = ack
+        if device_id is not None:
+            msg["id"] = device_id
+        self._commands.put((CT_DEVICE_COMMAND, msg))
+
+    def inject_ota(self, urls, ack, **fields):
+        """Deliver an OTA command (ct 1) to the onOTACommand callback"""
+        self._commands.put((CT_OTA_COMMAND, dict(fields, ct=CT_OTA_COMMAND, ack=ack, urls=urls)))
+
+    def inject_twin(self, desired, version=None):
+        """Deliver a desired-properties twin update to the onTwinChangeCommand callback"""
+        desired = dict(desired)
+        if version is not None:
+            desired["version"] = version
+        self._commands.put(("twin", {"desired": desired}))
+
+    def wait_idle(self, timeout=None):
+        """Block until every injected command has been handled; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._commands.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def fail_next(self, count=1, error="simulated broker error"):
+        """Make the next count publishes raise RuntimeError(error)"""
+        with self._lock:
+            self._failures.extend([error] * count)
+
+    def records(self, kind=None):
+        """Recorded publishes, optionally of one kind ("data", "ack", "ota_ack", "twin")"""
+        with self._lock:
+            return [record for record in self.published if kind is None or record.kind == kind]
+
+    def reset(self):
+        """Clear recorded publishes and counters"""
+        with self._lock:
+            self.published.clear()
+            self.messages = 0
+            self.bytes = 0
+
+    # ------------------------------------------------------------------
+
+    def _publish(self, kind, payload):
+        if not self.connected:
+            raise RuntimeError("SDK is not connected")
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            if self._failures:
+                raise RuntimeError(self._failures.popleft())
+        record = Publish(kind, payload, len(dumps(payload)), time.time())
+        with self._lock:
+            self.published.append(record)
+            self.messages += 1
+            self.bytes += record.size
+        if self.sink is not None:
+            self.sink(record)
+
+    def _notify_connection(self, connected):
+        if self._init_callback is not None:
+            self._init_callback({"ct": CT_CONNECTION_STATUS, "command": connected, "uniqueId": self.uniqueId})
+
+    def _dispatch(self):
+        while True:
+            item = self._commands.get()
+            try:
+                if item is None:
+                    return
+                kind, msg = item
+                callback = self._callbacks.get(kind)
+                if callback is None:
+                    continue
+                try:
+                    callback(msg)
+                except Exception as e:
+                    LOG.error("Fake SDK: callback for %s raised %r", msg, e)
+            finally:
+                self._commands.task_done()
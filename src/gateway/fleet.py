@@ -0,0 +1,176 @@
+"""
+Fleet Simulation for IoTConnect Gateway
+Runs many simulated gateways, each with its own copy of the CHILD_DEVICES
+schema, for load testing a backend.
+
+Gateways are sharded across worker processes; inside a worker every gateway
+is a coroutine on one asyncio event loop, sending on absolute deadlines with
+a random phase so the fleet does not fire in lockstep. Each worker returns a
+FleetStats, and the shards are merged into one report.
+"""
+
+import asyncio
+import random
+import time
+
+from data_generators import generate_gateway_data
+from src.gateway.device_registry import default_registry
+from src.gateway.sampling import schedule_plan
+from src.utils.clock import format_iso8601_ms
+from src.utils.serializer import dumps
+from src.utils.stats import percentile
+
+
+def gateway_ids(count, prefix="GW-SIM-"):
+    """Unique IDs for a simulated fleet"""
+    width = len(str(count - 1)) if count > 1 else 1
+    return [f"{prefix}{index:0{width}d}" for index in range(count)]
+
+
+def fleet_children(gateway_id, child_devices):
+    """Copy of child_devices for one gateway, with uniqueIds made unique to it"""
+    return [dict(device, uniqueId=f"{device['uniqueId']}@{gateway_id}") for device in child_devices]
+
+
+def shard(items, count):
+    """Split items round-robin into count non-empty shards"""
+    return [shard for shard in (items[index::count] for index in range(count)) if shard]
+
+
+class FleetStats:
+    """Totals for one worker, or the whole fleet after merge()"""
+
+    __slots__ = ("gateways", "ticks", "messages", "devices", "bytes", "errors", "lateness", "elapsed")
+
+    def __init__(self, gateways=0):
+        self.gateways = gateways
+        self.ticks = 0
+        self.messages = 0  # SendData calls
+        self.devices = 0  # device payloads inside those calls
+        self.bytes = 0
+        self.errors = 0
+        self.lateness = []  # seconds each tick started after its deadline
+        self.elapsed = 0.0
+
+    def merge(self, other):
+        self.gateways += other.gateways
+        self.ticks += other.ticks
+        self.messages += other.messages
+        self.devices += other.devices
+        self.bytes += other.bytes
+        self.errors += other.errors
+        self.lateness.extend(other.lateness)
+        self.elapsed = max(self.elapsed, other.elapsed)
+        return self
+
+    def report(self):
+        """Human-readable summary lines"""
+        elapsed = self.elapsed or 1.0
+        lateness = sorted(self.lateness)
+        return [
+            f"Gateways: {self.gateways}, ticks: {self.ticks}, errors: {self.errors}, elapsed: {self.elapsed:.1f}s",
+            f"Messages/s: {self.messages / elapsed:,.1f} ({self.devices / elapsed:,.1f} device payloads/s)",
+            f"Bytes/s: {self.bytes / elapsed:,.0f}",
+            "Tick lateness ms: " + ", ".join(
+                f"p{int(fraction * 100)}={percentile(lateness, fraction) * 1000:.1f}"
+                for fraction in (0.5, 0.9, 0.99)
+            ) + f", max={(lateness[-1] if lateness else 0.0) * 1000:.1f}",
+        ]
+
+
+class SimulatedGateway:
+    """
+    One gateway and its children, generating payloads like gateway_app.py.
+
+    Args:
+        unique_id: Gateway unique ID
+        child_devices: CHILD_DEVICES-style list for this gateway
+        frequencies: Sampling overrides by model or deviceType
+        interval: Default seconds between sends (template dataFrequency)
+    """
+
+    GATEWAY_KEY = "gateway"
+
+    def __init__(self, unique_id, child_devices, frequencies, interval, registry=None):
+        self.unique_id = unique_id
+        self.plan = (registry or default_registry()).build_plan(child_devices)
+        self.sampling = schedule_plan(self.plan, frequencies, interval, 0)
+        self.sampling.add(self.GATEWAY_KEY, interval, 0)
+        self.tick_interval = self.sampling.base_interval()
+
+    def build(self, elapsed, epoch):
+        """data_array for the devices due at elapsed seconds into the run"""
+        timestamp = format_iso8601_ms(epoch)
+        due = self.sampling.due(elapsed)
+        positions = [key for key in due if key != self.GATEWAY_KEY]
+        data_array = []
+        if len(positions) != len(due):
+            data_array.append({"uniqueId": self.unique_id, "time": timestamp, "data": generate_gateway_data(timestamp)})
+        if positions:
+            data_array.extend(self.plan.generate(timestamp, positions))
+        return data_array
+
+
+async def simulated_send(data_array, latency):
+    """Stand-in broker publish: serialize like the SDK and wait out the round trip"""
+    size = len(dumps(data_array))
+    if latency:
+        await asyncio.sleep(latency)
+    return size
+
+
+async def run_gateway(gateway, duration, stats, latency, stagger=True, send=simulated_send):
+    """Send one gateway's ticks on absolute deadlines for duration seconds"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    phase = random.uniform(0, gateway.tick_interval) if stagger else 0.0
+    index = 0
+    while True:
+        offset = phase + index * gateway.tick_interval
+        if offset >= duration:
+            return
+        deadline = start + offset
+        delay = deadline - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lateness = loop.time() - deadline
+        if lateness >= gateway.tick_interval:
+            # Behind by whole ticks: skip them, as TelemetryScheduler does
+            skipped = int(lateness // gateway.tick_interval)
+            index += skipped
+            lateness -= skipped * gateway.tick_interval
+        tick_offset = index * gateway.tick_interval
+        index += 1
+        stats.ticks += 1
+        stats.lateness.append(lateness)
+        data_array = gateway.build(tick_offset, time.time())
+        if not data_array:
+            continue
+        try:
+            stats.bytes += await send(data_array, latency)
+        except Exception:
+            stats.errors += 1
+            continue
+        stats.messages += 1
+        stats.devices += len(data_array)
+
+
+def run_shard(ids, child_devices, frequencies, interval, duration, latency=0.0, stagger=True):
+    """
+    Worker process entry point: run ids as gateways on one event loop; returns FleetStats.
+    With stagger, each gateway starts at a random phase within its tick interval.
+    """
+    registry = default_registry()
+    gateways = [
+        SimulatedGateway(gateway_id, fleet_children(gateway_id, child_devices), frequencies, interval, registry)
+        for gateway_id in ids
+    ]
+    stats = FleetStats(len(gateways))
+
+    async def run_all():
+        await asyncio.gather(*(run_gateway(gateway, duration, stats, latency, stagger) for gateway in gateways))
+
+    start = time.perf_counter()
+    asyncio.run(run_all())
+    stats.elapsed = time.perf_counter() - start
+    return stats
@@ -0,0 +1,159 @@
+"""
+Device Inventory for IoTConnect Gateway
+The device fleet as listed in the IoTConnect import files in data/
+(GatewayDeviceImport.json and friends), indexed by uniqueId, tag, model and
+deviceType so every lookup is one dict access instead of a scan.
+
+Records use __slots__, and the values most devices share (tag, model,
+deviceType, gateway id) are interned, so each repeated string is held once
+however many devices carry it. A 100k-device import loads in well under a
+second (see benchmarks/bench_inventory.py).
+
+The import files only carry name, uniqueId and tag; model and deviceType
+come from the gateway's device configuration when the device is there, and
+the tag stands in for the deviceType otherwise.
+"""
+
+import json
+import sys
+
+GATEWAY_TYPE = "gateway"
+
+
+class DeviceRecord:
+    """One device of the inventory"""
+
+    __slots__ = ("unique_id", "name", "tag", "model", "device_type", "gateway_id")
+
+    def __init__(self, unique_id, name="", tag="", model="", device_type="", gateway_id=None):
+        intern = sys.intern
+        self.unique_id = unique_id
+        self.name = name
+        self.tag = intern(tag)
+        self.model = intern(model)
+        self.device_type = intern(device_type)
+        self.gateway_id = intern(gateway_id) if gateway_id else None
+
+    def as_dict(self):
+        """The device in CHILD_DEVICES form"""
+        return {"uniqueId": self.unique_id, "name": self.name, "model": self.model, "deviceType": self.device_type}
+
+    def __repr__(self):
+        return f"DeviceRecord({self.unique_id!r}, tag={self.tag!r}, model={self.model!r}, type={self.device_type!r})"
+
+
+class DeviceInventory:
+    """
+    Devices by uniqueId, with secondary indexes by tag, model and deviceType.
+
+    Adding a uniqueId that is already present replaces its record. Index
+    groups are lists in insertion order: lookups and adds are O(1), a
+    removal is linear in the size of the device's groups.
+    """
+
+    def __init__(self, records=()):
+        self._by_id = {}
+        self._by_tag = {}
+        self._by_model = {}
+        self._by_type = {}
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def __contains__(self, unique_id):
+        return unique_id in self._by_id
+
+    def get(self, unique_id, default=None):
+        return self._by_id.get(unique_id, default)
+
+    def with_tag(self, tag):
+        """Devices with this tag (read-only list)"""
+        return self._by_tag.get(tag, ())
+
+    def with_model(self, model):
+        return self._by_model.get(model, ())
+
+    def of_type(self, device_type):
+        return self._by_type.get(device_type, ())
+
+    def tags(self):
+        return list(self._by_tag)
+
+    def add(self, record):
+        if record.unique_id in self._by_id:
+            self.remove(record.unique_id)
+        self._by_id[record.unique_id] = record
+        for index, key in ((self._by_tag, record.tag), (self._by_model, record.model),
+                           (self._by_type, record.device_type)):
+            if key:
+                group = index.get(key)
+                if group is None:
+                    index[key] = [record]
+                else:
+                    group.append(record)
+        return record
+
+    def remove(self, unique_id):
+        """Drop a device; returns its record, or None if it was not there"""
+        record = self._by_id.pop(unique_id, None)
+        if record is None:
+            return None
+        for index, key in ((self._by_tag, record.tag), (self._by_model, record.model),
+                           (self._by_type, record.device_type)):
+            if key:
+                group = index[key]
+                group.remove(record)
+                if not group:
+                    del index[key]
+        return record
+
+    def device_list(self, gateway_id=None):
+        """Child devices as sdk.Getdevice() lists them: [{"id", "tg"}, ...]"""
+        return [
+            {"id": record.unique_id, "tg": record.tag}
+            for record in self._by_id.values()
+            if record.gateway_id is not None and (gateway_id is None or record.gateway_id == gateway_id)
+        ]
+
+
+def load_import(path, inventory=None, devices=None):
+    """
+    Add the gateways and child devices of one device import file.
+
+    Args:
+        path: A *DeviceImport.json file ({"gateway": {"items": [...]}})
+        inventory: DeviceInventory to add to; a new one by default
+        devices: uniqueId -> configured device ({"model", "deviceType"}),
+            e.g. ConfigSnapshot.by_id, for the fields the import lacks
+    """
+    inventory = inventory if inventory is not None else DeviceInventory()
+    devices = devices or {}
+    with open(path, 'r') as file:
+        document = json.load(file)
+    add = inventory.add
+    for gateway in document.get("gateway", {}).get("items", ()):
+        gateway_id = gateway["uniqueId"]
+        add(DeviceRecord(gateway_id, gateway.get("name", ""), gateway.get("tag", ""), device_type=GATEWAY_TYPE))
+        for item in gateway.get("items", ()):
+            unique_id = item["uniqueId"]
+            tag = item.get("tag", "")
+            configured = devices.get(unique_id)
+            if configured is None:
+                add(DeviceRecord(unique_id, item.get("name", ""), tag, "", tag, gateway_id))
+            else:
+                add(DeviceRecord(unique_id, item.get("name", ""), tag, configured.get("model", ""),
+                                 configured.get("deviceType") or tag, gateway_id))
+    return inventory
+
+
+def load_inventory(paths, devices=None):
+    """One DeviceInventory from several import files; later files update earlier ones"""
+    inventory = DeviceInventory()
+    for path in paths:
+        load_import(path, inventory, devices)
+    return inventory
@@ -0,0 +1,346 @@
+"""
+OTA Firmware Updates for IoTConnect Gateway
+Fans an OTA command (ct 1) out to the devices it targets and downloads the
+firmware, off the SDK's network thread.
+
+Devices are indexed by tag ("tg") once, from sdk.Getdevice(), instead of
+scanning the device list for every URL. Each distinct URL is downloaded
+once, however many devices share it, on a small worker pool. Downloads
+stream to a .part file while hashing (SHA-256) and resume with an HTTP Range
+request after a dropped connection. Finished images are stored by hash, so
+identical firmware published under different URLs is kept once.
+
+Every targeted device gets progress acks through sendOTAAckCmd:
+OTA_DOWNLOADING (2) when the download starts and at each progress_step,
+then OTA_DOWNLOADED (3) with the image hash, or OTA_FAILED (4).
+"""
+
+import hashlib
+import http.client
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+LOG = logging.getLogger("iotconnect_gateway.ota")
+
+CT_OTA_COMMAND = 1
+
+# OTA acknowledgment status codes
+OTA_DOWNLOADING = 2
+OTA_DOWNLOADED = 3
+OTA_FAILED = 4
+
+
+class DownloadError(Exception):
+    """A firmware download failed after all retries"""
+
+
+def index_devices(device_list):
+    """{tag: [device id, ...]} for a Getdevice() list"""
+    index = {}
+    for device in device_list or ():
+        tag = device.get("tg")
+        if tag:
+            index.setdefault(tag, []).append(device["id"])
+    return index
+
+
+class Firmware:
+    """One downloaded image, stored by content hash"""
+
+    __slots__ = ("url", "path", "sha256", "size")
+
+    def __init__(self, url, path, sha256, size):
+        self.url = url
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+
+    def __repr__(self):
+        return f"Firmware({self.sha256[:12]}, {self.size} bytes)"
+
+
+class FirmwareDownloader:
+    """
+    Streaming, resumable HTTP(S) firmware download.
+
+    Args:
+        directory: Where images are stored (<sha256>.bin) and partial
+            downloads are kept (<url hash>.part)
+        chunk_size: Bytes read (and hashed) per step
+        timeout: Socket timeout in seconds
+        retries: Extra attempts after a failure, each resuming from the
+            bytes already on disk
+        retry_delay: Seconds between attempts
+        headers: Extra headers for every request (e.g. authorization)
+    """
+
+    def __init__(self, directory, chunk_size=64 * 1024, timeout=30, retries=3, retry_delay=1.0, headers=None):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.headers = dict(headers or {})
+        self.downloaded_bytes = 0
+        self.resumed = 0
+        self.duplicates = 0  # images already stored under another URL
+        os.makedirs(directory, exist_ok=True)
+
+    def download(self, url, progress=None):
+        """
+        Download url to the store; returns a Firmware, raises DownloadError.
+
+        Args:
+            url: Firmware URL
+            progress: Optional callable(received, total) after each chunk;
+                total is None when the server does not send a length
+        """
+        part = os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".part")
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay)
+            try:
+                digest, size = self._fetch(url, part, progress)
+                break
+            except (OSError, http.client.HTTPException, DownloadError) as e:
+                error = e
+        else:
+            raise DownloadError(f"{url}: {error}")
+        path = os.path.join(self.directory, digest + ".bin")
+        if os.path.exists(path):
+            self.duplicates += 1
+            os.remove(part)
+        else:
+            os.replace(part, path)
+        return Firmware(url, path, digest, size)
+
+    def _fetch(self, url, part, progress):
+        """Fetch into part, resuming from its current size; returns (sha256 hex, size)"""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise DownloadError(f"unsupported URL scheme {parts.scheme!r}")
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = dict(self.headers)
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        if parts.scheme == "https":
+            connection = http.client.HTTPSConnection(parts.netloc, timeout=self.timeout)
+        else:
+            connection = http.client.HTTPConnection(parts.netloc, timeout=self.timeout)
+        try:
+            connection.request("GET", target, headers=headers)
+            response = connection.getresponse()
+            if response.status == 416 and offset:
+                response.read()
+                return self._hash_file(part)  # already complete
+            if response.status == 206 and offset:
+                self.resumed += 1
+                total = self._content_range_total(response)
+            elif response.status == 200:
+                offset = 0  # no range support: start over
+                length = response.getheader("Content-Length")
+                total = int(length) if length is not None else None
+            else:
+                raise DownloadError(f"GET {target}: HTTP {response.status}")
+            digest = hashlib.sha256()
+            mode = "r+b" if offset else "wb"
+            with open(part, mode) as file:
+                # Hash what an earlier attempt left on disk, then append the rest
+                while file.tell() < offset:
+                    digest.update(file.read(min(self.chunk_size, offset - file.tell())))
+                file.truncate(offset)
+                received = offset
+                while True:
+                    chunk = response.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    file.write(chunk)
+                    digest.update(chunk)
+                    received += len(chunk)
+                    self.downloaded_bytes += len(chunk)
+                    if progress is not None:
+                        progress(received, total)
+            if total is not None and received != total:
+                raise DownloadError(f"GET {target}: connection closed at {received} of {total} bytes")
+            return digest.hexdigest(), received
+        finally:
+            connection.close()
+
+    def _hash_file(self, path):
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(self.chunk_size), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        return digest.hexdigest(), size
+
+    @staticmethod
+    def _content_range_total(response):
+        content_range = response.getheader("Content-Range", "")
+        total = content_range.rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+
+
+class OtaStats:
+    """OTA commands, downloads and acks"""
+
+    def __init__(self):
+        self.commands = 0
+        self.targets = 0
+        self.downloads = 0
+        self.shared = 0  # URL entries served by a download already planned or running
+        self.completed = 0
+        self.failed = 0
+        self.acks = 0
+
+    def __repr__(self):
+        return (
+            f"commands={self.commands} targets={self.targets} downloads={self.downloads} "
+            f"shared={self.shared} completed={self.completed} failed={self.failed} acks={self.acks}"
+        )
+
+
+class OtaManager:
+    """
+    Handle OTA commands: resolve targets by tag, download each distinct URL
+    once, and ack every targeted device as the download progresses.
+
+    A URL already downloading for an earlier command is not fetched again;
+    the new command's devices are acked from the running download.
+
+    Args:
+        send_ack: Callable(ack, status, message, device_id) sending an OTA
+            ack; device_id None means the gateway itself
+        downloader: FirmwareDownloader storing the images
+        devices: Getdevice() list to index; see update_devices()
+        max_workers: Downloads running at once
+        progress_step: Fraction of the image between OTA_DOWNLOADING acks;
+            None for only the first one
+        on_firmware: Optional callable(firmware, device_ids) once an image
+            is stored, e.g. to start flashing
+    """
+
+    def __init__(self, send_ack, downloader, devices=None, max_workers=4, progress_step=0.25,
+                 on_firmware=None):
+        self.send_ack = send_ack
+        self.downloader = downloader
+        self.progress_step = progress_step
+        self.on_firmware = on_firmware
+        self.stats = OtaStats()
+        self._by_tag = index_devices(devices)
+        self._lock = threading.RLock()  # _ack takes it too, also from submit() while held
+        self._jobs = {}  # url -> [(ack, device id), ...] while downloading
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ota")
+
+    def update_devices(self, device_list):
+        """Re-index after the child device list changes"""
+        self._by_tag = index_devices(device_list)
+
+    def targets(self, url_entry):
+        """Device ids an entry of "urls" is for: its tag's devices, or [None] (the gateway) without a tag"""
+        tag = url_entry.get("tg")
+        if not tag:
+            return [None]
+        return self._by_tag.get(tag, [])
+
+    def submit(self, msg):
+        """Queue the downloads for an OTA message; returns {url: [device id, ...]}"""
+        if not msg or msg.get("ct") != CT_OTA_COMMAND or not msg.get("urls"):
+            return {}
+        ack = msg.get("ack")
+        plan = {}
+        repeated = 0  # entries for a URL already in this command
+        for entry in msg["urls"]:
+            url = entry.get("url")
+            devices = self.targets(entry)
+            if not url or not devices:
+                continue
+            if url in plan:
+                repeated += 1
+            planned = plan.setdefault(url, [])
+            planned.extend(device for device in devices if device not in planned)
+        with self._lock:
+            stats = self.stats
+            stats.commands += 1
+            stats.targets += sum(len(devices) for devices in plan.values())
+            stats.shared += repeated
+            for url, devices in plan.items():
+                subscribers = [(ack, device) for device in devices]
+                job = self._jobs.get(url)
+                if job is not None:
+                    stats.shared += 1
+                    job.extend(subscribers)
+                    # Acked under the lock: the download cannot finish, and send
+                    # OTA_DOWNLOADED to these devices, before they hear it started
+                    self._ack(subscribers, OTA_DOWNLOADING, "downloading")
+                else:
+                    self._jobs[url] = subscribers
+                    self._executor.submit(self._download, url)
+        return plan
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _download(self, url):
+        with self._lock:
+            self.stats.downloads += 1
+            subscribers = list(self._jobs[url])
+        name = os.path.basename(urlsplit(url).path) or url
+        self._ack(subscribers, OTA_DOWNLOADING, f"downloading {name}")
+        step = self.progress_step
+        next_step = [step]
+
+        def progress(received, total):
+            if not step or not total or received >= total or received < next_step[0] * total:
+                return
+            done = received / total
+            while next_step[0] <= done:
+                next_step[0] += step
+            with self._lock:
+                current = list(self._jobs[url])
+            self._ack(current, OTA_DOWNLOADING, f"downloading {name} {done:.0%}")
+
+        try:
+            firmware = self.downloader.download(url, progress)
+        except Exception as e:
+            with self._lock:
+                self.stats.failed += 1
+                subscribers = self._jobs.pop(url)
+            LOG.error("OTA download of %s failed: %s", url, e)
+            self._ack(subscribers, OTA_FAILED, f"download failed: {e}")
+            return None
+        with self._lock:
+            self.stats.completed += 1
+            subscribers = self._jobs.pop(url)
+        self._ack(subscribers, OTA_DOWNLOADED, f"downloaded {name} sha256 {firmware.sha256}")
+        devices = [device for _, device in subscribers]
+        LOG.info("OTA: %s (%d bytes, sha256 %s) for %d device(s)",
+                 name, firmware.size, firmware.sha256[:12], len(devices))
+        if self.on_firmware is not None:
+            try:
+                self.on_firmware(firmware, devices)
+            except Exception as e:
+                LOG.error("OTA firmware handler failed for %s: %s", name, e)
+        return firmware
+
+    def _ack(self, subscribers, status, message):
+        sent = 0
+        for ack, device_id in subscribers:
+            if not ack:
+                continue
+            try:
+                self.send_ack(ack, status, message, device_id)
+                sent += 1
+            except Exception as e:
+                LOG.error("Failed to send OTA ack %s for %s: %s", status, device_id or "gateway", e)
+        with self._lock:
+            self.stats.acks += sent
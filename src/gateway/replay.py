@@ -0,0 +1,128 @@
+"""
+Backlog Replay for IoTConnect Gateway
+Drains the telemetry spool after an outage without starving live telemetry
+or tripping broker throttling.
+
+Replay is driven by the live ticks: after each tick is published, up to
+ratio replayed records per live record (at least min_per_tick) are taken
+from the spool, oldest first. A tick never takes more than rate records
+per second since the previous tick, and a token bucket of rate records per
+second enforces the rate across ticks. Records are removed from the spool
+only once their chunk was accepted, so a failed replay is retried on a
+later tick.
+"""
+
+import time
+
+from src.utils.token_bucket import TokenBucket
+
+
+class ReplayStats:
+    """Replay progress, exposed as metrics"""
+
+    __slots__ = ("replayed", "failed", "dropped", "remaining", "rate", "last_batch")
+
+    def __init__(self):
+        self.replayed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.remaining = 0
+        self.rate = 0.0  # smoothed replayed records/s
+        self.last_batch = 0
+
+    @property
+    def eta_seconds(self):
+        """Estimated time to drain the remaining backlog, or None if not draining"""
+        if not self.remaining:
+            return 0.0
+        return self.remaining / self.rate if self.rate > 0 else None
+
+    def metrics(self):
+        return {
+            "replay_records_total": self.replayed,
+            "replay_failed_total": self.failed,
+            "replay_dropped_total": self.dropped,
+            "replay_backlog_records": self.remaining,
+            "replay_rate_records_per_second": self.rate,
+            "replay_eta_seconds": self.eta_seconds,
+        }
+
+    def __repr__(self):
+        eta = self.eta_seconds
+        eta_text = "unknown" if eta is None else f"{eta:.0f}s"
+        return (
+            f"replayed={self.replayed} failed={self.failed} backlog={self.remaining} "
+            f"rate={self.rate:.1f}/s eta={eta_text}"
+        )
+
+
+class BacklogReplayer:
+    """
+    Oldest-first, rate-limited replay of a TelemetrySpool.
+
+    Args:
+        spool: TelemetrySpool holding the backlog
+        batcher: PayloadBatcher splitting replayed records into chunks
+        publisher: ChunkPublisher sending the chunks
+        rate: Sustained replayed records per second
+        burst: Records that may be replayed at once after an idle period
+        ratio: Replayed records allowed per live record in the same tick
+        min_per_tick: Replay allowance of a tick with little or no live data
+        smoothing: Weight of the newest sample in the smoothed rate
+    """
+
+    def __init__(self, spool, batcher, publisher, rate=100, burst=500, ratio=1.0, min_per_tick=25,
+                 smoothing=0.2, clock=time.monotonic):
+        self.spool = spool
+        self.batcher = batcher
+        self.publisher = publisher
+        self.ratio = ratio
+        self.min_per_tick = min_per_tick
+        self.smoothing = smoothing
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.stats = ReplayStats()
+        self._clock = clock
+        self._last_run = None
+
+    def replay(self, live_records=0):
+        """Replay one tick's share of the backlog; returns the number of records sent"""
+        now = self._clock()
+        elapsed = now - self._last_run if self._last_run is not None else 0.0
+        sent = self._replay(live_records, elapsed)
+        if elapsed > 0:
+            sample = sent / elapsed
+            self.stats.rate += self.smoothing * (sample - self.stats.rate)
+        self._last_run = now
+        self.stats.last_batch = sent
+        self.stats.remaining = len(self.spool)
+        return sent
+
+    def _replay(self, live_records, elapsed):
+        if not len(self.spool):
+            return 0
+        allowance = max(self.min_per_tick, int(self.ratio * live_records))
+        if elapsed > 0:
+            allowance = min(allowance, int(self.bucket.rate * elapsed))
+        granted = self.bucket.take(allowance)
+        if not granted:
+            return 0
+        records = self.spool.peek(granted)
+        if not records:
+            return 0
+        seq_by_item = {id(item): seq for seq, item in records}
+        chunks = self.batcher.split([item for _, item in records])
+        done = []
+        sent = 0
+        for chunk, result in zip(chunks, self.publisher.publish(chunks)):
+            if result.ok:
+                sent += len(chunk.items)
+            elif chunk.oversized:
+                # Can never be sent; drop it rather than block the backlog
+                self.stats.dropped += len(chunk.items)
+            else:
+                self.stats.failed += len(chunk.items)
+                continue
+            done.extend(seq_by_item[id(item)] for item in chunk.items)
+        self.spool.remove(done)
+        self.stats.replayed += sent
+        return sent
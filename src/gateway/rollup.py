@@ -0,0 +1,290 @@
+"""
+Telemetry File Rollup for IoTConnect Gateway
+Rolls device payloads into gzip-compressed newline-delimited JSON files and
+uploads them in bulk, for high-frequency devices and backfill (the template
+declares "fileSupport": true).
+
+RollupWriter compresses as it writes, so memory use does not grow with the
+file. A file is rotated when its compressed size reaches max_bytes or it is
+max_age seconds old; it is written as *.part and renamed to *.ndjson.gz
+only when complete, so a crash never leaves a truncated file for upload.
+A *.part file found at start-up is recovered: its complete lines become a
+ready file and the torn tail is dropped.
+
+ChunkedUploader sends completed files in chunks with a small resumable
+protocol: HEAD <url>/<name> returns the bytes already received in an
+Upload-Offset header (404 if none), and each PUT carries
+"Content-Range: bytes start-end/total". The server answers 308 with the new
+Upload-Offset while incomplete and 200/201 once the file is whole. An
+interrupted upload resumes from the server's offset on the next attempt.
+"""
+
+import gzip
+import http.client
+import logging
+import os
+import threading
+import time
+import zlib
+from urllib.parse import quote, urlsplit
+
+from src.utils.serializer import default_serializer
+
+LOG = logging.getLogger("iotconnect_gateway.rollup")
+
+READY_SUFFIX = ".ndjson.gz"
+PART_SUFFIX = ".part"
+
+
+class RollupWriter:
+    """
+    Append device payloads to rotating compressed NDJSON files.
+
+    Args:
+        directory: Where files are written; created if missing
+        max_bytes: Compressed size at which a file is rotated (approximate: the
+            compressor holds back up to a few tens of KB until its block fills)
+        max_age: Seconds after which a non-empty file is rotated
+        prefix: File name prefix
+        compresslevel: gzip level, 1 (fastest) to 9 (smallest)
+    """
+
+    def __init__(self, directory, max_bytes=8 * 1024 * 1024, max_age=300, prefix="telemetry",
+                 compresslevel=6, serializer=None, clock=time.time):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.prefix = prefix
+        self.compresslevel = compresslevel
+        self.serializer = serializer or default_serializer
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._file = None
+        self._gzip = None
+        self._path = None
+        self._opened = None
+        self._sequence = 0
+        self.records = 0
+        self.raw_bytes = 0
+        self.rotated = 0
+        self.recovered = 0
+        self._recover()
+
+    def write(self, data_array):
+        """Append one line per device payload, rotating first if the current file is full or old"""
+        lines = b"".join(self.serializer.dumps(item) + b"\n" for item in data_array)
+        with self._lock:
+            if self._file is not None and self._due():
+                self._rotate()
+            if self._file is None:
+                self._open()
+            self._gzip.write(lines)
+            self.records += len(data_array)
+            self.raw_bytes += len(lines)
+
+    def rotate_if_due(self):
+        """Rotate on age or size even without new writes; returns the completed path or None"""
+        with self._lock:
+            if self._file is not None and self._due():
+                return self._rotate()
+        return None
+
+    def rotate(self):
+        """Complete the current file now; returns its path, or None if nothing was open"""
+        with self._lock:
+            return self._rotate() if self._file is not None else None
+
+    def ready_files(self):
+        """Completed files awaiting upload, oldest first"""
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(READY_SUFFIX))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def close(self):
+        self.rotate()
+
+    def _recover(self):
+        """Turn *.part files left by a crash into ready files holding their complete lines"""
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(PART_SUFFIX):
+                continue
+            part = os.path.join(self.directory, name)
+            # Decompress what the crashed writer got to disk; a truncated gzip stream just ends early
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            blocks = []
+            with open(part, "rb") as file:
+                for block in iter(lambda: file.read(64 * 1024), b""):
+                    try:
+                        blocks.append(decompressor.decompress(block))
+                    except zlib.error:
+                        break
+            data = b"".join(blocks)
+            data = data[:data.rfind(b"\n") + 1]
+            if data:
+                base = part[:-len(PART_SUFFIX)]
+                with open(base + ".tmp", "wb") as file:
+                    file.write(gzip.compress(data, self.compresslevel))
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(base + ".tmp", base + READY_SUFFIX)
+                self.recovered += data.count(b"\n")
+                LOG.warning("Rollup: recovered %d records from %s", data.count(b"\n"), name)
+            else:
+                LOG.warning("Rollup: removed %s, which held no complete record", name)
+            os.remove(part)
+
+    def _due(self):
+        return self._file.tell() >= self.max_bytes or self._clock() - self._opened >= self.max_age
+
+    def _open(self):
+        self._opened = self._clock()
+        self._sequence += 1
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(self._opened))
+        self._path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{os.getpid()}-{self._sequence:04d}")
+        self._file = open(self._path + PART_SUFFIX, "wb")
+        self._gzip = gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=self.compresslevel)
+
+    def _rotate(self):
+        self._gzip.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        ready = self._path + READY_SUFFIX
+        os.replace(self._path + PART_SUFFIX, ready)
+        self._file = self._gzip = self._path = self._opened = None
+        self.rotated += 1
+        return ready
+
+
+class UploadError(Exception):
+    """The upload server rejected a request"""
+
+
+class ChunkedUploader:
+    """
+    Resumable chunked HTTP upload of completed rollup files.
+
+    Args:
+        url: Base URL; each file goes to <url>/<file name>
+        chunk_size: Bytes per PUT
+        timeout: Socket timeout per request in seconds
+        headers: Extra headers for every request (e.g. authorization)
+    """
+
+    def __init__(self, url, chunk_size=256 * 1024, timeout=30, headers=None):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported upload URL {url!r}")
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.base_path = parts.path.rstrip("/")
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.uploaded_files = 0
+        self.uploaded_bytes = 0
+        self.resumed = 0
+
+    def upload(self, path):
+        """Upload one file, resuming where the server left off; raises UploadError or OSError"""
+        name = os.path.basename(path)
+        target = f"{self.base_path}/{quote(name)}"
+        total = os.path.getsize(path)
+        connection = self._connect()
+        try:
+            offset = self._offset(connection, target)
+            if offset >= total:
+                return  # received in full by an earlier attempt
+            if offset:
+                self.resumed += 1
+            with open(path, "rb") as file:
+                file.seek(offset)
+                while offset < total:
+                    chunk = file.read(self.chunk_size)
+                    end = offset + len(chunk) - 1
+                    headers = dict(self.headers)
+                    headers["Content-Range"] = f"bytes {offset}-{end}/{total}"
+                    headers["Content-Type"] = "application/gzip"
+                    connection.request("PUT", target, body=chunk, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status in (200, 201):
+                        self.uploaded_bytes += len(chunk)
+                        break
+                    if response.status != 308:
+                        raise UploadError(f"PUT {name} bytes {offset}-{end}: HTTP {response.status}")
+                    self.uploaded_bytes += len(chunk)
+                    offset = int(response.getheader("Upload-Offset", end + 1))
+                    file.seek(offset)
+                else:
+                    raise UploadError(f"PUT {name}: server did not confirm completion")
+            self.uploaded_files += 1
+        finally:
+            connection.close()
+
+    def _connect(self):
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def _offset(self, connection, target):
+        connection.request("HEAD", target, headers=self.headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status == 404:
+            return 0
+        if response.status not in (200, 204):
+            raise UploadError(f"HEAD {target}: HTTP {response.status}")
+        return int(response.getheader("Upload-Offset", 0))
+
+
+class RollupShipper:
+    """
+    Background thread that rotates due files and uploads every completed file.
+    Uploaded files are deleted; a failed file is retried on the next pass.
+    """
+
+    def __init__(self, writer, uploader, interval=30):
+        self.writer = writer
+        self.uploader = uploader
+        self.interval = interval
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def ship(self):
+        """Rotate if due and upload ready files, oldest first; returns files uploaded"""
+        self.writer.rotate_if_due()
+        uploaded = 0
+        for path in self.writer.ready_files():
+            try:
+                self.uploader.upload(path)
+            except (UploadError, OSError, http.client.HTTPException, ValueError) as e:
+                self.failures += 1
+                LOG.warning("Rollup upload of %s failed: %s", os.path.basename(path), e)
+                break  # keep order; retry this file next pass
+            os.remove(path)
+            uploaded += 1
+        return uploaded
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="rollup-upload", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the thread, then complete the open file and make a final upload pass"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.writer.close()
+        self.ship()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.ship()
+            except Exception:
+                LOG.exception("Rollup pass failed; retrying in %ss", self.interval)
@@ -0,0 +1,146 @@
+"""
+Per-Device Sampling for IoTConnect Gateway
+Lets each device report at its own interval (energy meters every 5 s,
+thermostats every 60 s, ZigBee sensors every 300 s) instead of one global
+INTERVAL.
+
+Due times are kept in a min-heap, so each due device costs O(log n) to pop
+and reschedule and a wake-up with nothing due costs O(1). All devices due at
+one wake-up are returned together so the caller sends them in one batch.
+"""
+
+import heapq
+import json
+import math
+
+
+def load_template_frequency(template_path):
+    """Read properties.dataFrequency (seconds) from a device template in data/"""
+    with open(template_path, 'r') as file:
+        template = json.load(file)
+    return int(template["properties"]["dataFrequency"])
+
+
+def resolve_frequency(device, frequencies, default):
+    """
+    Sampling interval for one device, most specific first:
+    the device's own "dataFrequency", then its model, then its deviceType,
+    then the template default.
+    """
+    frequency = device.get("dataFrequency")
+    if frequency is None:
+        frequency = frequencies.get(device.get("model") or None)
+    if frequency is None:
+        frequency = frequencies.get(device.get("deviceType"), default)
+    return int(frequency)
+
+
+class SamplingScheduler:
+    """Min-heap of (next due time, key) for devices with individual intervals"""
+
+    def __init__(self):
+        self._heap = []
+        self._intervals = {}
+        self._live = {}  # key -> sequence number of its current heap entry
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __contains__(self, key):
+        return key in self._intervals
+
+    @property
+    def intervals(self):
+        return dict(self._intervals)
+
+    def add(self, key, interval, first_due):
+        """Schedule key every interval seconds, first at first_due; re-adding replaces it"""
+        if interval <= 0:
+            raise ValueError(f"Sampling interval for {key!r} must be positive")
+        self._intervals[key] = interval
+        self._push(key, first_due)
+
+    def remove(self, key):
+        """Stop scheduling key; its heap entry is discarded lazily when it surfaces"""
+        self._intervals.pop(key, None)
+        self._live.pop(key, None)
+
+    def next_due(self):
+        """Earliest due time, or None if nothing is scheduled"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def due(self, now):
+        """Pop every key due at or before now and reschedule it; returns the keys"""
+        heap = self._heap
+        ready = []
+        while heap and heap[0][0] <= now:
+            due, seq, key = heapq.heappop(heap)
+            if self._live.get(key) != seq:
+                continue  # removed or re-added since this entry was pushed
+            interval = self._intervals[key]
+            next_due = due + interval
+            if next_due <= now:
+                # Fell behind (e.g. a long stall): skip to the next slot on the same cadence
+                next_due += interval * math.floor((now - next_due) / interval + 1)
+            self._push(key, next_due)
+            ready.append(key)
+        return ready
+
+    def rekey(self, mapping):
+        """Rename keys per mapping (old -> new), keeping their intervals and due times"""
+        heap = []
+        live = {}
+        intervals = {}
+        for due, seq, key in self._heap:
+            if self._live.get(key) != seq:
+                continue
+            new_key = mapping.get(key, key)
+            heap.append((due, seq, new_key))
+            live[new_key] = seq
+            intervals[new_key] = self._intervals[key]
+        heapq.heapify(heap)
+        self._heap, self._live, self._intervals = heap, live, intervals
+
+    def base_interval(self):
+        """Greatest common divisor of all intervals: the wake-up period that hits every due time"""
+        result = 0
+        for interval in self._intervals.values():
+            result = math.gcd(result, int(interval))
+        return result or None
+
+    def _push(self, key, due):
+        self._seq += 1
+        self._live[key] = self._seq
+        heapq.heappush(self._heap, (due, self._seq, key))
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap and self._live.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+
+
+def schedule_plan(plan, frequencies, default, now, scheduler=None):
+    """Add every device of a TelemetryPlan to a SamplingScheduler, keyed by plan position"""
+    scheduler = scheduler or SamplingScheduler()
+    for position, device in enumerate(plan.devices):
+        scheduler.add(position, resolve_frequency(device, frequencies, default), now)
+    return scheduler
+
+
+def reschedule_plan(scheduler, plan, moved, frequencies, default, now):
+    """
+    Follow a plan updated by DeviceRegistry.update_plan: drop the removed
+    positions, move the kept ones (keeping their due times) and schedule
+    the added devices from now. Keys that are not positions are left alone.
+    """
+    for key in scheduler.intervals:
+        if isinstance(key, int) and key not in moved:
+            scheduler.remove(key)
+    scheduler.rekey(moved)
+    kept = set(moved.values())
+    for position, device in enumerate(plan.devices):
+        if position not in kept:
+            scheduler.add(position, resolve_frequency(device, frequencies, default), now)
+    return scheduler
@@ -0,0 +1,152 @@
+"""
+Telemetry Scheduler for IoTConnect Gateway
+Runs the telemetry tick on a fixed cadence with asyncio, using absolute
+deadlines (start + n * interval) so generation and publish time never push
+later ticks back.
+
+A tick is a pipeline of stages, e.g. [build_telemetry, publish_telemetry].
+Each stage runs on its own single-thread executor: stage order is kept
+within a tick and across ticks, while different stages of consecutive ticks
+overlap (tick N+1 can generate while tick N is still publishing). The event
+loop thread only keeps time, so SDK callbacks are never queued behind it.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+LOG = logging.getLogger("iotconnect_gateway.scheduler")
+
+
+class SchedulerStats:
+    """Counters describing how well the scheduler kept its cadence"""
+
+    __slots__ = ("started", "completed", "failed", "late", "missed", "last_lateness", "max_lateness")
+
+    def __init__(self):
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.late = 0
+        self.missed = 0
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+
+    def __repr__(self):
+        return (
+            f"ticks started={self.started} completed={self.completed} failed={self.failed} "
+            f"late={self.late} missed={self.missed} max_lateness={self.max_lateness:.3f}s"
+        )
+
+
+class TelemetryScheduler:
+    """
+    Drift-free periodic runner for the telemetry pipeline.
+
+    Args:
+        interval: Seconds between tick deadlines
+        stages: Callables run in order for each tick; the first takes no
+            arguments, each later stage receives the previous stage's result
+        max_in_flight: Ticks allowed in the pipeline at once; a deadline that
+            arrives while the pipeline is full is skipped and counted as missed
+        late_threshold: A tick starting more than this many seconds after its
+            deadline is counted as late
+        on_lateness: Optional callable receiving each started tick's
+            lateness in seconds (e.g. a histogram's observe)
+        profiler: Optional src.utils.tracing.TickProfiler; while it is
+            armed, each tick's stages run under it
+    """
+
+    def __init__(self, interval, stages, max_in_flight=2, late_threshold=0.1, on_lateness=None, profiler=None):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.stages = list(stages)
+        self.max_in_flight = max_in_flight
+        self.late_threshold = late_threshold
+        self.on_lateness = on_lateness
+        self.profiler = profiler
+        self.stats = SchedulerStats()
+
+    async def run(self, stop=None, max_ticks=None):
+        """
+        Run until stop (an asyncio.Event) is set or max_ticks ticks were started.
+        Ticks already in the pipeline are finished before returning.
+        """
+        loop = asyncio.get_running_loop()
+        executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"tick-stage-{i}")
+                     for i in range(len(self.stages))]
+        pending = set()
+        start = loop.time()
+        index = 0
+        try:
+            while max_ticks is None or self.stats.started < max_ticks:
+                deadline = start + index * self.interval
+                delay = deadline - loop.time()
+                if delay > 0 and await self._wait(stop, delay):
+                    break
+                if stop is not None and stop.is_set():
+                    break
+
+                lateness = loop.time() - deadline
+                if lateness >= self.interval:
+                    skipped = int(lateness // self.interval)
+                    self.stats.missed += skipped
+                    index += skipped
+                    lateness -= skipped * self.interval
+                    LOG.warning("Scheduler: missed %d tick(s), resuming on cadence", skipped)
+                index += 1
+
+                if len(pending) >= self.max_in_flight:
+                    self.stats.missed += 1
+                    LOG.warning("Scheduler: previous ticks still running, tick skipped")
+                    continue
+
+                self.stats.last_lateness = lateness
+                self.stats.max_lateness = max(self.stats.max_lateness, lateness)
+                if self.on_lateness is not None:
+                    self.on_lateness(lateness)
+                if lateness > self.late_threshold:
+                    self.stats.late += 1
+                    LOG.warning("Scheduler: tick %d started %.3fs late", self.stats.started, lateness)
+
+                self.stats.started += 1
+                task = loop.create_task(self._tick(loop, executors))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            for executor in executors:
+                executor.shutdown(wait=False)
+
+    async def _wait(self, stop, delay):
+        """Sleep for delay seconds; returns True if stop was set meanwhile"""
+        if stop is None:
+            await asyncio.sleep(delay)
+            return False
+        try:
+            await asyncio.wait_for(stop.wait(), delay)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _tick(self, loop, executors):
+        stages = self.stages
+        profiler = self.profiler
+        if profiler is not None and profiler.armed:
+            stages = [functools.partial(profiler.run, stage) for stage in stages]
+        else:
+            profiler = None
+        try:
+            result = await loop.run_in_executor(executors[0], stages[0])
+            for stage, executor in zip(stages[1:], executors[1:]):
+                result = await loop.run_in_executor(executor, stage, result)
+        except Exception as e:
+            self.stats.failed += 1
+            LOG.error("Error sending telemetry: %s", e)
+        else:
+            self.stats.completed += 1
+        if profiler is not None:
+            await loop.run_in_executor(None, profiler.tick_done)
@@ -0,0 +1,208 @@
+"""
+Telemetry Spool for IoTConnect Gateway
+Durable on-disk buffer for device payloads that could not be published,
+replacing the SDK's 0.01 MB offlineStorage.
+
+Records are appended to a SQLite database in WAL mode, one row per device
+payload in arrival order. Appends are buffered in memory and written in one
+transaction per group commit (every commit_interval seconds or
+commit_records records), so the cost of an fsync is shared by the whole
+group; a crash loses at most the last uncommitted group and never corrupts
+committed records. When the spool grows past max_bytes the oldest records
+are evicted first.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+
+from src.utils.serializer import default_serializer
+
+LOG = logging.getLogger("iotconnect_gateway.spool")
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    unique_id TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL
+)
+"""
+
+
+class SpoolStats:
+    """Counters for one spool since it was opened"""
+
+    __slots__ = ("appended", "committed", "commits", "evicted", "evicted_bytes", "removed")
+
+    def __init__(self):
+        self.appended = 0
+        self.committed = 0
+        self.commits = 0
+        self.evicted = 0
+        self.evicted_bytes = 0
+        self.removed = 0
+
+    def __repr__(self):
+        return (
+            f"appended={self.appended} committed={self.committed} commits={self.commits} "
+            f"evicted={self.evicted} ({self.evicted_bytes} bytes) removed={self.removed}"
+        )
+
+
+class TelemetrySpool:
+    """
+    Append-only, size-capped, crash-safe queue of device payloads.
+
+    Args:
+        path: SQLite database file; its directory is created if missing
+        max_bytes: Cap on stored payload bytes; oldest records are evicted past it
+        commit_interval: Longest time an appended record waits for its group commit
+        commit_records: Pending records that trigger a group commit immediately
+        synchronous: SQLite synchronous level; "FULL" fsyncs every commit
+        serializer: Serializer from src.utils.serializer for stored payloads
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, commit_interval=0.5, commit_records=5000,
+                 synchronous="FULL", serializer=None):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.commit_interval = commit_interval
+        self.commit_records = commit_records
+        self.serializer = serializer or default_serializer
+        self.stats = SpoolStats()
+        self._lock = threading.Lock()
+        self._pending = []
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={synchronous}")
+        self._db.execute(_SCHEMA)
+        count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM records").fetchone()
+        self._count = count
+        self._bytes = size
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._run, name="spool-commit", daemon=True)
+        self._flusher.start()
+
+    def __len__(self):
+        """Records in the spool, committed or pending"""
+        with self._lock:
+            return self._count + len(self._pending)
+
+    @property
+    def size_bytes(self):
+        """Payload bytes in the spool, committed or pending"""
+        with self._lock:
+            return self._bytes + sum(record[2] for record in self._pending)
+
+    def append(self, data_array):
+        """Queue device payloads ({"uniqueId", "time", "data"}) for the next group commit"""
+        dumps = self.serializer.dumps
+        records = []
+        for item in data_array:
+            payload = dumps(item)
+            records.append((item.get("uniqueId", ""), payload, len(payload)))
+        with self._lock:
+            self._pending.extend(records)
+            self.stats.appended += len(records)
+            if len(self._pending) >= self.commit_records:
+                self._commit()
+
+    def flush(self):
+        """Commit pending records now"""
+        with self._lock:
+            self._commit()
+
+    def peek(self, limit):
+        """Oldest committed records as [(seq, item)], at most limit of them"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, payload FROM records ORDER BY seq LIMIT ?", (limit,)
+            ).fetchall()
+        loads = self.serializer.loads
+        return [(seq, loads(payload)) for seq, payload in rows]
+
+    def remove(self, seqs):
+        """Delete records (e.g. after they were published); unknown seqs are ignored"""
+        seqs = list(seqs)
+        if not seqs:
+            return
+        with self._lock:
+            freed = 0
+            removed = 0
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for seq in seqs:
+                    row = self._db.execute("SELECT size FROM records WHERE seq = ?", (seq,)).fetchone()
+                    if row is None:
+                        continue
+                    self._db.execute("DELETE FROM records WHERE seq = ?", (seq,))
+                    freed += row[0]
+                    removed += 1
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._count -= removed
+            self._bytes -= freed
+            self.stats.removed += removed
+
+    def close(self):
+        """Commit pending records and close the database"""
+        self._stop.set()
+        self._flusher.join()
+        with self._lock:
+            self._commit()
+            self._db.close()
+
+    def _run(self):
+        while not self._stop.wait(self.commit_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                LOG.error("Spool commit failed, records stay in memory until the next commit: %s", e)
+
+    def _commit(self):
+        """Write pending records in one transaction and evict past max_bytes (lock held)"""
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = []
+        added = sum(record[2] for record in pending)
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany("INSERT INTO records (unique_id, payload, size) VALUES (?, ?, ?)", pending)
+            evicted, evicted_bytes = self._evict(self._bytes + added - self.max_bytes)
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            self._pending = pending + self._pending
+            raise
+        self._count += len(pending) - evicted
+        self._bytes += added - evicted_bytes
+        self.stats.committed += len(pending)
+        self.stats.commits += 1
+        self.stats.evicted += evicted
+        self.stats.evicted_bytes += evicted_bytes
+
+    def _evict(self, excess):
+        """Delete the oldest records until excess bytes are freed; returns (records, bytes)"""
+        if excess <= 0:
+            return 0, 0
+        freed = 0
+        count = 0
+        last_seq = None
+        for seq, size in self._db.execute("SELECT seq, size FROM records ORDER BY seq"):
+            freed += size
+            count += 1
+            last_seq = seq
+            if freed >= excess:
+                break
+        if last_seq is not None:
+            self._db.execute("DELETE FROM records WHERE seq <= ?", (last_seq,))
+        return count, freed
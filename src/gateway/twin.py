@@ -0,0 +1,162 @@
+"""
+Twin Cache for IoTConnect Gateway
+Local copy of the device twin, so a twin update reports only what changed,
+in one batch, and other gateway components read twin properties without a
+cloud round trip.
+
+Desired updates carry a "version" (in the desired section); an update whose
+version is not newer than the last one applied is stale (redelivered or
+out of order) and is dropped. Each accepted update is diffed against the
+reported properties and only the changed ones are returned for reporting.
+
+Reads (get, desired, reported) never take a lock: every update swaps in new
+dicts, so a reader always sees one complete version.
+"""
+
+import logging
+import threading
+
+LOG = logging.getLogger("iotconnect_gateway.twin")
+
+# Twin keys managed by the platform, never reported back
+SYSTEM_KEYS = frozenset(("version", "uniqueId"))
+
+_MISSING = object()
+
+
+class TwinStats:
+    """Twin updates seen, dropped and reported"""
+
+    def __init__(self):
+        self.updates = 0
+        self.stale = 0
+        self.unchanged = 0  # desired keys already reported with the same value
+        self.reported = 0  # properties reported
+        self.batches = 0
+
+    def __repr__(self):
+        return (
+            f"updates={self.updates} stale={self.stale} unchanged={self.unchanged} "
+            f"reported={self.reported} batches={self.batches}"
+        )
+
+
+class TwinCache:
+    """
+    Versioned desired/reported twin properties.
+
+    Args:
+        reported: Properties already reported, e.g. restored at startup
+    """
+
+    def __init__(self, reported=None):
+        self.version = None
+        self.stats = TwinStats()
+        self._desired = {}
+        self._reported = dict(reported or {})
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Current value of a property: reported if set, else desired"""
+        value = self._reported.get(key, _MISSING)
+        if value is _MISSING:
+            return self._desired.get(key, default)
+        return value
+
+    @property
+    def desired(self):
+        """Read-only view of the desired properties (do not modify)"""
+        return self._desired
+
+    @property
+    def reported(self):
+        """Read-only view of the reported properties (do not modify)"""
+        return self._reported
+
+    def subscribe(self, listener):
+        """Call listener(changes) with every non-empty set of changed properties"""
+        self._listeners.append(listener)
+
+    def invalidate(self, keys):
+        """Forget reported values (e.g. after a failed report) so the next update sends them again"""
+        with self._lock:
+            reported = dict(self._reported)
+            for key in keys:
+                reported.pop(key, None)
+            self._reported = reported
+
+    def report(self, sdk, properties):
+        """
+        Report changed properties through sdk in one UpdateTwins message, or
+        one UpdateTwin call per key on an SDK without it. On failure the
+        properties are invalidated, so the next update reports them again.
+
+        Returns:
+            bool: True if every property was handed to the SDK
+        """
+        try:
+            update_twins = getattr(sdk, "UpdateTwins", None)
+            if update_twins is not None:
+                update_twins(properties)
+            else:
+                for key, value in properties.items():
+                    sdk.UpdateTwin(key, value)
+        except Exception as e:
+            self.invalidate(properties)
+            LOG.error("Failed to report twin properties %s: %s", sorted(properties), e)
+            return False
+        return True
+
+    def apply(self, msg):
+        """
+        Apply a twin message from onTwinChangeCommand.
+
+        A full twin (desired and reported) also refreshes the reported
+        properties before diffing.
+
+        Args:
+            msg (dict): Twin message with "desired" and optionally "reported"
+
+        Returns:
+            dict: Properties to report (empty when stale or nothing changed)
+        """
+        if not msg or "desired" not in msg:
+            return {}
+        incoming = msg["desired"] or {}
+        version = incoming.get("version")
+        with self._lock:
+            stats = self.stats
+            stats.updates += 1
+            if version is not None and self.version is not None and version <= self.version:
+                stats.stale += 1
+                return {}
+            reported = self._reported
+            if "reported" in msg:
+                reported = {key: value for key, value in (msg["reported"] or {}).items() if key not in SYSTEM_KEYS}
+            changes = {}
+            for key, value in incoming.items():
+                if key in SYSTEM_KEYS:
+                    continue
+                if key in reported and reported[key] == value:
+                    stats.unchanged += 1
+                else:
+                    changes[key] = value
+            desired = dict(self._desired)
+            desired.update((key, value) for key, value in incoming.items() if key not in SYSTEM_KEYS)
+            if changes:
+                reported = dict(reported)
+                reported.update(changes)
+                stats.reported += len(changes)
+                stats.batches += 1
+            self._desired = desired
+            self._reported = reported
+            if version is not None:
+                self.version = version
+        if changes:
+            for listener in self._listeners:
+                try:
+                    listener(changes)
+                except Exception as e:
+                    LOG.error("Twin listener failed: %s", e)
+        return changes
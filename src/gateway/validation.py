@@ -0,0 +1,155 @@
+"""
+Template Validation for IoTConnect Gateway
+Checks outgoing device payloads against the attribute definitions of the
+device template (data/GatewayTemplateAllDeviceTypes.json): every attribute
+must be defined for the device's tag, have the template type (string,
+decimal, integer, boolean) and, for "object" attributes, hold a dict whose
+"childs" are valid in turn. Attributes the template defines but a payload
+leaves out are allowed (report-by-exception sends only what changed).
+
+Each tag's definitions are compiled once, at startup, into a checker: a
+closure over a flat {attribute: expected types} table, with one nested
+checker per object attribute. Checking a payload is then one loop over its
+keys with a dict lookup and a type test per value, with no schema walking;
+see benchmarks/bench_validation.py for the cost per payload and how it
+compares with generic jsonschema validation.
+
+TemplateValidator can check every payload or, for production, 1 in N.
+"""
+
+import json
+
+from src.utils.frozen import FrozenDict
+
+# Python types accepted for each template attribute type (bool is not a number here)
+TYPE_CHECKS = {
+    "string": (str,),
+    "decimal": (float, int),
+    "integer": (int,),
+    "boolean": (bool,),
+    "object": (dict, FrozenDict),  # payload skeletons share static sub-dicts as FrozenDicts
+}
+TYPE_NAMES = {"decimal": "number", "object": "dict"}
+
+
+def compile_attributes(attributes, path=""):
+    """
+    Build a checker for one level of template attributes.
+
+    The checker is called as check(data, problems) and appends a
+    "path: problem" string to problems for each invalid attribute (path
+    prefixes are fixed at compile time, like the nesting).
+    """
+    expected = {}
+    kinds = {}
+    nested = {}
+    for attribute in attributes:
+        name = attribute["name"]
+        kind = attribute.get("type", "string")
+        if attribute.get("childs") or kind == "object":
+            kind = "object"
+            nested[name] = compile_attributes(attribute.get("childs", ()), f"{path}{name}.")
+        expected[name] = TYPE_CHECKS.get(kind, (object,))
+        kinds[name] = TYPE_NAMES.get(kind) or expected[name][0].__name__
+
+    def check(data, problems):
+        for key, value in data.items():
+            types = expected.get(key)
+            if types is None:
+                problems.append(f"{path}{key}: not in the template")
+                continue
+            value_type = type(value)
+            if value_type not in types:
+                problems.append(f"{path}{key}: expected {kinds[key]}, got {value_type.__name__}")
+            elif value_type is float:
+                if value - value != 0.0:  # inf or nan
+                    problems.append(f"{path}{key}: {value} is not a JSON number")
+            elif key in nested:
+                nested[key](value, problems)
+
+    return check
+
+
+def compile_template(template_path):
+    """
+    Compile a device template into {tag: checker}, one checker per tag for
+    the top-level attributes carrying that tag (untagged ones belong to the
+    template's own tag).
+    """
+    with open(template_path, 'r') as file:
+        template = json.load(file)
+    by_tag = {}
+    for attribute in template["attributes"]:
+        by_tag.setdefault(attribute.get("tag", template.get("tag")), []).append(attribute)
+    return {tag: compile_attributes(attributes) for tag, attributes in by_tag.items()}
+
+
+class ValidationStats:
+    """Payloads checked, skipped by sampling and found invalid"""
+
+    def __init__(self):
+        self.checked = 0
+        self.skipped = 0
+        self.invalid = 0
+        self.problems = 0
+        self.untagged = 0  # payloads of devices whose tag has no template attributes
+
+    def __repr__(self):
+        return (
+            f"checked={self.checked} skipped={self.skipped} invalid={self.invalid} "
+            f"problems={self.problems} untagged={self.untagged}"
+        )
+
+
+class TemplateValidator:
+    """
+    Validate data_array items ({"uniqueId", "time", "data"}) against a template.
+
+    Args:
+        checkers: {tag: checker} from compile_template()
+        device_tags: uniqueId -> tag (the device's deviceType); may be updated in place
+        sample_every: Check 1 in N payloads (1 checks every payload)
+    """
+
+    def __init__(self, checkers, device_tags, sample_every=1):
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.checkers = checkers
+        self.device_tags = device_tags
+        self.sample_every = sample_every
+        self.stats = ValidationStats()
+        self._offset = 0
+
+    def validate(self, item):
+        """Problems with one payload; an empty list if it is valid"""
+        problems = []
+        check = self.checkers.get(self.device_tags.get(item["uniqueId"]))
+        if check is None:
+            self.stats.untagged += 1
+            return problems
+        data = item.get("data")
+        if type(data) not in TYPE_CHECKS["object"]:
+            problems.append(f"data: expected dict, got {type(data).__name__}")
+        else:
+            check(data, problems)
+        return problems
+
+    def check(self, data_array):
+        """
+        Validate the sampled payloads of one tick (every sample_every-th
+        across ticks); returns [(uniqueId, problems), ...] for invalid ones.
+        """
+        every = self.sample_every
+        sampled = data_array if every == 1 else data_array[self._offset::every]
+        self._offset = (self._offset - len(data_array)) % every
+        stats = self.stats
+        stats.checked += len(sampled)
+        stats.skipped += len(data_array) - len(sampled)
+        invalid = []
+        for item in sampled:
+            problems = self.validate(item)
+            if problems:
+                stats.invalid += 1
+                stats.problems += len(problems)
+                invalid.append((item["uniqueId"], problems))
+        return invalid
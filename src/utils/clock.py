@@ -0,0 +1,112 @@
+"""
+Tick Clock for IoTConnect Gateway
+Captures the time once per telemetry tick and formats it once, so every
+generator and log line in that tick shares the same timestamp strings.
+
+Optionally corrects the local clock with an NTP offset. The offset is
+measured on a background thread and cached; tick() only reads it and never
+touches the network.
+"""
+
+import logging
+import threading
+import time
+
+LOG = logging.getLogger("iotconnect_gateway.clock")
+
+
+def format_iso8601_ms(epoch):
+    """Format epoch seconds as ISO 8601 UTC with milliseconds: YYYY-MM-DDTHH:MM:SS.mmmZ"""
+    seconds = int(epoch)
+    millis = int((epoch - seconds) * 1000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{millis:03d}Z"
+
+
+def format_local(epoch):
+    """Format epoch seconds as local time for log lines: YYYY-MM-DD HH:MM:SS"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch))
+
+
+class Tick:
+    """One captured instant with its pre-formatted representations"""
+
+    __slots__ = ("epoch", "iso", "local")
+
+    def __init__(self, epoch):
+        self.epoch = epoch
+        self.iso = format_iso8601_ms(epoch)
+        self.local = format_local(epoch)
+
+
+class TickClock:
+    """
+    Shared clock for the telemetry loop.
+
+    Args:
+        ntp_server: NTP host to correct against, or None to use the local clock
+        sync_interval: Seconds between background NTP measurements
+        timeout: Timeout for a single NTP request in seconds
+        ntp_client: Object with an ntplib.NTPClient-style request(); defaults
+            to ntplib.NTPClient()
+    """
+
+    def __init__(self, ntp_server=None, sync_interval=3600, timeout=2.0, ntp_client=None):
+        self.ntp_server = ntp_server
+        self.sync_interval = sync_interval
+        self.timeout = timeout
+        self.offset = 0.0
+        self.last_sync = None
+        self._ntp_client = ntp_client
+        self._stop = threading.Event()
+        self._thread = None
+        self.current = Tick(time.time())
+
+    def now(self):
+        """Corrected epoch seconds"""
+        return time.time() + self.offset
+
+    def tick(self):
+        """Capture and format the time for a new tick; also available as .current"""
+        self.current = Tick(time.time() + self.offset)
+        return self.current
+
+    def sync(self):
+        """
+        Measure the NTP offset once and cache it.
+
+        Returns the new offset, or None if the request failed, in which case
+        the previous offset is kept.
+        """
+        if not self.ntp_server:
+            return None
+        try:
+            client = self._ntp_client
+            if client is None:
+                import ntplib
+                client = self._ntp_client = ntplib.NTPClient()
+            response = client.request(self.ntp_server, version=3, timeout=self.timeout)
+        except Exception as e:
+            LOG.warning("NTP sync with %s failed: %s", self.ntp_server, e)
+            return None
+        self.offset = response.offset
+        self.last_sync = time.time()
+        return self.offset
+
+    def start(self):
+        """Start background NTP syncing (no-op without ntp_server)"""
+        if not self.ntp_server or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ntp-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+
+    def _run(self):
+        self.sync()
+        while not self._stop.wait(self.sync_interval):
+            self.sync()
@@ -0,0 +1,21 @@
+"""
+Read-only Dictionaries
+FrozenDict is a dict whose mutating methods raise TypeError. Being a real
+dict subclass, it is serialized as JSON, pickled and compared like any
+dict, which a types.MappingProxyType is not.
+"""
+
+
+class FrozenDict(dict):
+    """dict that cannot be changed after construction"""
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
@@ -1,6 +1,7 @@
+from src.utils.clock import format_iso8601_ms
+
 def format_timestamp(timestamp):
-    from datetime import datetime
-    return datetime.utcfromtimestamp(timestamp).isoformat() + 'Z'
+    return format_iso8601_ms(timestamp)
 
 def validate_device_id(device_id):
     if not isinstance(device_id, str) or len(device_id) == 0:
@@ -1,27 +1,188 @@
+"""
+Gateway Logging
+Non-blocking logging: a logger from setup_logger() only puts records on a
+bounded queue, and one background listener thread writes them to a
+size-rotated log file (rotated files are gzip-compressed) and the console,
+so slow storage never stalls the telemetry loop or the SDK's MQTT thread.
+When the queue is full, records are dropped and counted instead of waiting.
+
+Noisy message types are limited per logger name (use child loggers such as
+"iotconnect_gateway.tick" as message types): a token bucket of records per
+second, and/or sampling 1 in N. Warnings and errors are never dropped. The
+first record let through after drops says how many were suppressed.
+
+Log payloads with LazyJson so they are formatted only when the record is
+enabled and passes the limits:
+    logger.debug("Twin update: %s", LazyJson(msg))
+"""
+
+import atexit
+import gzip
+import json
 import logging
+import os
+import queue
+import shutil
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-def setup_logger(name):
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+from src.utils.token_bucket import TokenBucket
+
+LOG_FILE = 'iotconnect_gateway.log'
+LOG_MAX_BYTES = 10 * 1024 * 1024  # rotate the log file at this size
+LOG_BACKUPS = 5  # rotated .gz files kept
+QUEUE_SIZE = 10000  # records waiting for the listener before new ones are dropped
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener = None
+_queue = None
+_lock = threading.Lock()
+
+
+class LazyJson:
+    """Log argument rendered with json.dumps only when the message is formatted"""
+
+    __slots__ = ("value", "indent")
+
+    def __init__(self, value, indent=2):
+        self.value = value
+        self.indent = indent
+
+    def __str__(self):
+        return json.dumps(self.value, indent=self.indent, default=str)
+
+
+def gzip_rotator(source, dest):
+    """RotatingFileHandler rotator writing the rotated file gzip-compressed"""
+    with open(source, 'rb') as file_in, gzip.open(dest, 'wb') as file_out:
+        shutil.copyfileobj(file_in, file_out)
+    os.remove(source)
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler whose backups are <file>.1.gz, <file>.2.gz, ..."""
 
-    # Create file handler which logs even debug messages
-    fh = logging.FileHandler('iotconnect_gateway.log')
-    fh.setLevel(logging.DEBUG)
+    def __init__(self, filename, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding='utf-8', delay=True)
+        self.namer = lambda name: name + '.gz'
+        self.rotator = gzip_rotator
 
-    # Create console handler with a higher log level
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
 
-    # Create formatter and add it to the handlers
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    fh.setFormatter(formatter)
-    ch.setFormatter(formatter)
+class RateLimitFilter(logging.Filter):
+    """
+    Per-logger-name rate limiting and sampling for records below WARNING.
 
-    # Add the handlers to the logger
-    logger.addHandler(fh)
-    logger.addHandler(ch)
+    Args:
+        limits: {logger name: (records per second, burst)}
+        samples: {logger name: N} to keep the first of every N records
+    """
 
+    def __init__(self, limits=None, samples=None):
+        super().__init__()
+        self.samples = dict(samples or {})
+        self.dropped = {}  # logger name -> records dropped in total
+        self._buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in (limits or {}).items()}
+        self._counts = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        name = record.name
+        every = self.samples.get(name)
+        bucket = self._buckets.get(name)
+        if every is None and bucket is None:
+            return True
+        with self._lock:
+            if every is not None:
+                count = self._counts.get(name, 0)
+                self._counts[name] = count + 1
+                keep = count % every == 0
+            else:
+                keep = True
+            if keep and bucket is not None:
+                keep = bucket.try_take()
+            if not keep:
+                self._suppressed[name] = self._suppressed.get(name, 0) + 1
+                self.dropped[name] = self.dropped.get(name, 0) + 1
+                return False
+            suppressed = self._suppressed.pop(name, 0)
+        if suppressed:
+            record.msg = f"{record.msg} [{suppressed} similar suppressed]"
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full"""
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _start_listener(path, console_level):
+    """Start the process-wide listener thread once; returns its queue"""
+    global _listener, _queue
+    if _listener is None:
+        formatter = logging.Formatter(FORMAT)
+
+        # File handler logs even debug messages
+        fh = CompressedRotatingFileHandler(path)
+        fh.setLevel(logging.DEBUG)
+        fh.setFormatter(formatter)
+
+        # Console handler with a higher log level
+        ch = logging.StreamHandler()
+        ch.setLevel(console_level)
+        ch.setFormatter(formatter)
+
+        _queue = queue.Queue(QUEUE_SIZE)
+        _listener = QueueListener(_queue, fh, ch, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+    return _queue
+
+
+def setup_logger(name='iotconnect_gateway', path=LOG_FILE, level=logging.DEBUG, console_level=logging.INFO,
+                 limits=None, samples=None):
+    """
+    Logger writing through the background listener; safe to call repeatedly.
+
+    Args:
+        name: Logger name; child loggers (name.tick, ...) share its handler
+        path: Log file (the first call's path is used for the process)
+        level: Logger level; disabled levels cost one comparison
+        console_level: Lowest level also shown on the console
+        limits: {logger name: (records per second, burst)}, see RateLimitFilter
+        samples: {logger name: N}, see RateLimitFilter
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    with _lock:
+        for handler in logger.handlers:
+            if isinstance(handler, NonBlockingQueueHandler):
+                return logger  # already set up: never add a second handler
+        handler = NonBlockingQueueHandler(_start_listener(path, console_level))
+        if limits or samples:
+            handler.addFilter(RateLimitFilter(limits, samples))
+        logger.addHandler(handler)
+        logger.propagate = False
     return logger
 
-# Create a logger for the application
-app_logger = setup_logger('iotconnect_gateway')
\ No newline at end of file
+
+def stop_logging():
+    """Write out queued records and stop the listener thread (at exit)"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
@@ -0,0 +1,284 @@
+"""
+Gateway Metrics
+In-process counters, gauges and histograms, exposed in the Prometheus text
+format on a local HTTP port (GET /metrics).
+
+Recording is cheap enough for the telemetry hot path (well under 1 us per
+observation, see benchmarks/bench_metrics.py): an uncontended lock and a few
+integer adds, with histogram buckets found by bisect. All formatting happens
+when /metrics is scraped. An unlabelled metric is returned as its series
+(Counter, Gauge or Histogram); a labelled one as a Metric whose labels()
+returns the series per label value. Look series up once and keep them on
+hot paths.
+
+A gauge can also be given a function, read at scrape time, for values that
+already live elsewhere (e.g. the spool backlog).
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+# Seconds, from 100 us to 10 s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bytes, from 1 KB to 1 MB
+BYTE_BUCKETS = (1024, 4096, 16384, 32768, 65536, 131072, 262144, 524288, 1048576)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if value != value:
+        return "NaN"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, label_names, label_values):
+        yield f"{name}_total{_label_text(label_names, label_values)} {_format_value(self.value)}"
+
+
+class Gauge:
+    """Value that goes up and down, or a function read at scrape time"""
+
+    __slots__ = ("value", "function", "_lock")
+
+    def __init__(self, function=None):
+        self.value = 0
+        self.function = function
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def samples(self, name, label_names, label_values):
+        value = self.value
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception:
+                value = float("nan")
+        yield f"{name}{_label_text(label_names, label_values)} {_format_value(value)}"
+
+
+class Histogram:
+    """Observations counted into fixed buckets, with their sum"""
+
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, value, count=1):
+        """Record value (count times, e.g. a per-device average for a batch)"""
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += count
+            self.sum += value * count
+
+    def samples(self, name, label_names, label_values):
+        with self._lock:
+            counts = list(self.counts)
+            total = self.sum
+        count = sum(counts)
+        cumulative = 0
+        for bound, bucket in zip(self.bounds + (float("inf"),), counts):
+            cumulative += bucket
+            labels = _label_text(label_names, label_values, (("le", _format_value(float(bound))),))
+            yield f"{name}_bucket{labels} {cumulative}"
+        labels = _label_text(label_names, label_values)
+        yield f"{name}_sum{labels} {_format_value(total)}"
+        yield f"{name}_count{labels} {count}"
+
+
+class Metric:
+    """One named metric: a single series, or one child per label value"""
+
+    def __init__(self, kind, name, help, label_names, factory):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._factory = factory
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            self._children[()] = factory()
+
+    def labels(self, *values):
+        """Child series for these label values, created on first use"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}")
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.samples(self.name, self.label_names, values))
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named metrics; asking for an existing name returns the same metric.
+
+    counter(), gauge() and histogram() return the series itself when there
+    are no labels, else a Metric to call labels(...) on.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help, labels=()):
+        return self._get("counter", name, help, labels, Counter)
+
+    def gauge(self, name, help, labels=(), function=None):
+        return self._get("gauge", name, help, labels, lambda: Gauge(function))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get("histogram", name, help, labels, lambda: Histogram(buckets))
+
+    def _get(self, kind, name, help, labels, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Metric(kind, name, help, labels, factory)
+            elif metric.kind != kind or metric.label_names != tuple(labels):
+                raise ValueError(f"{name} is already registered as a {metric.kind} with labels {metric.label_names}")
+        return metric if metric.label_names else metric.labels()
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registry shared by the gateway components
+REGISTRY = MetricsRegistry()
+
+
+def timed(histogram):
+    """Decorator observing the duration of every call, in seconds, on histogram"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path in ("/metrics", "/"):
+            render = self.server.registry.render
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path in self.server.routes:
+            route = self.server.routes[path]
+            render = lambda: route(dict(parse_qsl(query)))
+            content_type = "text/plain; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        try:
+            body = render().encode("utf-8")
+        except Exception as e:
+            self.send_error(500, str(e))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer:
+    """
+    Serve a registry at http://host:port/metrics from a daemon thread.
+
+    Args:
+        registry: MetricsRegistry to expose
+        host: Interface to bind; keep it local unless the port is firewalled
+        port: TCP port (0 picks a free one, see .port)
+        routes: Extra GET paths, {"/path": callable(query dict) -> text}
+    """
+
+    def __init__(self, registry=REGISTRY, host="127.0.0.1", port=9108, routes=None):
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.registry = registry
+        self._server.routes = dict(routes or {})
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
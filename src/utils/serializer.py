@@ -0,0 +1,65 @@
+"""
+JSON Serializer for IoTConnect Gateway
+One place to choose how the gateway turns payloads into bytes.
+
+Uses orjson when it is installed (it writes UTF-8 bytes directly, with no
+intermediate str), otherwise the stdlib json module with a reused compact
+encoder. Both produce compact JSON that round-trips through either loads().
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class StdlibSerializer:
+    """Compact JSON via the standard library"""
+
+    name = "json"
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def dumps(self, obj):
+        return self._encoder.encode(obj).encode()
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """Compact JSON via orjson, serialized straight to bytes"""
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+
+SERIALIZERS = {
+    StdlibSerializer.name: StdlibSerializer,
+    OrjsonSerializer.name: OrjsonSerializer,
+}
+
+
+def get_serializer(name="auto"):
+    """
+    Serializer by name: "json", "orjson", or "auto" for the fastest one
+    installed.
+    """
+    if name == "auto":
+        name = OrjsonSerializer.name if orjson is not None else StdlibSerializer.name
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer {name!r}; expected one of {sorted(SERIALIZERS)} or 'auto'")
+    return SERIALIZERS[name]()
+
+
+default_serializer = get_serializer()
+dumps = default_serializer.dumps
+loads = default_serializer.loads
@@ -0,0 +1,53 @@
+"""
+Latency Statistics
+Bounded sample windows and nearest-rank percentiles for latency reporting.
+"""
+
+import math
+import threading
+from collections import deque
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list, fraction in [0, 1]"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LatencySamples:
+    """Count, total and max of every observation, plus the last `window` samples for percentiles"""
+
+    __slots__ = ("count", "total", "max", "_samples", "_lock")
+
+    def __init__(self, window=1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            self._samples.append(seconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self, fractions=(0.5, 0.9, 0.99)):
+        """{fraction: seconds} over the sample window"""
+        with self._lock:
+            samples = sorted(self._samples)
+        return {fraction: percentile(samples, fraction) for fraction in fractions}
+
+    def __repr__(self):
+        parts = ", ".join(
+            f"p{int(fraction * 100)}={value * 1000:.1f}ms" for fraction, value in self.percentiles().items()
+        )
+        return f"n={self.count} mean={self.mean * 1000:.1f}ms {parts} max={self.max * 1000:.1f}ms"
@@ -0,0 +1,56 @@
+"""
+Token Bucket Rate Limiter
+Allows bursts of up to `burst` units and a sustained `rate` units per second.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Args:
+        rate: Tokens added per second
+        burst: Bucket capacity; the bucket starts full
+        clock: Monotonic time source in seconds
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def take(self, count):
+        """Take up to count whole tokens; returns how many were granted (possibly 0)"""
+        with self._lock:
+            self._refill()
+            granted = min(int(count), int(self._tokens))
+            self._tokens -= granted
+            return granted
+
+    def try_take(self, count=1):
+        """Take exactly count tokens if available; returns True on success"""
+        with self._lock:
+            self._refill()
+            if self._tokens < count:
+                return False
+            self._tokens -= count
+            return True
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -0,0 +1,238 @@
+"""
+Tick Tracing and Profiling
+Tracer records where a telemetry tick (or an SDK callback) spent its time as
+a trace of named spans, keeping the last N traces per name in a ring buffer.
+A trace can cross threads: begin() it on the stage that starts the tick,
+hand it to the next stage and activate() it there, then finish() it.
+
+TickProfiler runs cProfile over the next K ticks on request (a signal or
+the /profile endpoint) and dumps the combined pstats to disk. cProfile only
+sees the thread it is enabled on, so every stage call gets its own profile
+and they are merged at the end.
+
+Both are free when off: span() returns a shared no-op object and the
+profiler's armed check is one attribute read.
+"""
+
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import threading
+import time
+from collections import deque
+
+LOG = logging.getLogger("iotconnect_gateway.profiler")
+
+
+class _NullSpan:
+    """Span used while tracing is off or no trace is active"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """One tick or callback: its spans as (name, offset, duration, thread) in seconds"""
+
+    __slots__ = ("name", "started_at", "start", "duration", "spans")
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.spans = []
+
+    def format(self):
+        """One line: total, then each span in milliseconds"""
+        stamp = time.strftime("%H:%M:%S", time.localtime(self.started_at))
+        millis = int(self.started_at * 1000) % 1000
+        total = "running" if self.duration is None else f"{self.duration * 1000:.2f}ms"
+        parts = [f"{self.name} {stamp}.{millis:03d} total {total}"]
+        parts.extend(f"{name} {duration * 1000:.2f}ms" for name, _, duration, _ in self.spans)
+        return " | ".join(parts)
+
+    def __repr__(self):
+        return self.format()
+
+
+class _Span:
+
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        self.trace.spans.append((self.name, self.start - self.trace.start, end - self.start,
+                                 threading.current_thread().name))
+        return False
+
+
+class Tracer:
+    """
+    Span recorder with a ring buffer of recent traces per trace name.
+
+    Args:
+        capacity: Traces kept per name (e.g. the last 100 ticks)
+        enabled: Start recording straight away
+    """
+
+    def __init__(self, capacity=100, enabled=False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._buffers = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def begin(self, name):
+        """Start a trace and make it current on this thread; None when disabled"""
+        if not self.enabled:
+            return None
+        trace = Trace(name)
+        self._local.trace = trace
+        return trace
+
+    def activate(self, trace):
+        """Make trace (possibly None) current on this thread, e.g. in a later stage"""
+        if trace is not None or self.enabled:
+            self._local.trace = trace
+
+    def finish(self, trace):
+        """Close trace and keep it in the ring buffer"""
+        if trace is None:
+            return
+        trace.duration = time.perf_counter() - trace.start
+        if getattr(self._local, "trace", None) is trace:
+            self._local.trace = None
+        with self._lock:
+            buffer = self._buffers.get(trace.name)
+            if buffer is None:
+                buffer = self._buffers[trace.name] = deque(maxlen=self.capacity)
+            buffer.append(trace)
+
+    def span(self, name):
+        """Context manager timing a span of the current trace"""
+        if not self.enabled:
+            return NULL_SPAN
+        trace = getattr(self._local, "trace", None)
+        if trace is None:
+            return NULL_SPAN
+        return _Span(trace, name)
+
+    def traced(self, name):
+        """Decorator recording every call as a trace of its own (for SDK callbacks)"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                previous = getattr(self._local, "trace", None)
+                trace = self.begin(name)
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.finish(trace)
+                    self._local.trace = previous
+            return wrapper
+        return decorator
+
+    def recent(self, name=None):
+        """Kept traces, oldest first, of one name or all names"""
+        with self._lock:
+            if name is not None:
+                return list(self._buffers.get(name, ()))
+            traces = [trace for buffer in self._buffers.values() for trace in buffer]
+        return sorted(traces, key=lambda trace: trace.start)
+
+    def slowest(self, name, count=5):
+        return sorted(self.recent(name), key=lambda trace: trace.duration or 0, reverse=True)[:count]
+
+    def format(self, name=None):
+        return "\n".join(trace.format() for trace in self.recent(name)) + "\n"
+
+
+class TickProfiler:
+    """
+    cProfile the next K ticks on request and write the stats to a file.
+
+    Args:
+        directory: Where tick-<time>.pstats files are written
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.armed = False
+        self.last_path = None
+        self._path = None
+        self._remaining = 0
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def request(self, ticks):
+        """
+        Profile the next ticks ticks; returns the path the stats will be
+        written to, or None if a session is already running.
+        """
+        if ticks <= 0:
+            raise ValueError("ticks must be positive")
+        now = time.time()
+        name = time.strftime("tick-%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}.pstats"
+        with self._lock:
+            if self.armed:
+                return None
+            self._remaining = ticks
+            self._profiles = []
+            self._path = os.path.join(self.directory, name)
+            self.armed = True
+        LOG.info("Profiler: profiling the next %d tick(s) into %s", ticks, self._path)
+        return self._path
+
+    def run(self, function, *args):
+        """Call function under a profile of its own while armed"""
+        if not self.armed:
+            return function(*args)
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        return profile.runcall(function, *args)
+
+    def tick_done(self):
+        """Count a finished tick; writes the stats after the last requested one"""
+        if not self.armed:
+            return None
+        with self._lock:
+            self._remaining -= 1
+            if self._remaining > 0:
+                return None
+            profiles, self._profiles = self._profiles, []
+            self.armed = False
+        return self._dump(profiles, self._path)
+
+    def _dump(self, profiles, path):
+        if not profiles:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        self.last_path = path
+        LOG.info("Profiler: wrote %s (python -m pstats %s)", path, path)
+        return path
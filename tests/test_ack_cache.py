@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from src.gateway.ack_cache import AckCache
+from src.gateway.commands import ACK_SUCCESS, OrderedCommandRouter
+
+class TestAckCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "acks.jsonl")
+        self.now = [1000.0]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def cache(self, **kwargs):
+        return AckCache(self.path, clock=lambda: self.now[0], **kwargs)
+
+    def test_lru_and_ttl(self):
+        cache = AckCache(capacity=2, ttl=60, clock=lambda: self.now[0])
+        cache.put("a", "T1", 7, "ok")
+        cache.put("b", "T1", 7, "ok")
+        self.assertEqual(cache.get("a", "T1"), (7, "ok"))  # "a" is now most recent
+        cache.put("c", "T1", 4, "failed")
+        self.assertIsNone(cache.get("b", "T1"))
+        self.assertEqual(cache.get("a", "T1"), (7, "ok"))
+        self.assertIsNone(cache.get("a", "T2"))  # keyed by device too
+        self.now[0] += 60
+        self.assertIsNone(cache.get("c", "T1"))
+        self.assertEqual(len(cache), 1)
+
+    def test_survives_restart_and_torn_line(self):
+        cache = self.cache()
+        cache.put("a", None, 7, "ok")
+        cache.put("b", "T1", 4, "failed")
+        cache.close()
+        with open(self.path, "ab") as file:
+            file.write(b'["c", "T1", 7')
+        cache = self.cache()
+        self.assertEqual(cache.get("a"), (7, "ok"))
+        self.assertEqual(cache.get("b", "T1"), (4, "failed"))
+        self.assertEqual(len(cache), 2)
+        cache.close()
+        self.now[0] += 24 * 3600
+        self.assertEqual(len(self.cache()), 0)
+
+    def test_compaction(self):
+        cache = self.cache(capacity=10)
+        for index in range(25):
+            cache.put(str(index), None, 7, "ok")
+        cache.close()
+        with open(self.path, "rb") as file:
+            self.assertLess(len(file.readlines()), 20)
+        cache = self.cache(capacity=10)
+        self.assertEqual(len(cache), 10)
+        self.assertEqual(cache.get("24"), (7, "ok"))
+        self.assertIsNone(cache.get("14"))
+
+    def test_router_runs_retried_command_once(self):
+        acks = []
+        runs = []
+        release = threading.Event()
+        router = OrderedCommandRouter(lambda ack, status, message, device_id: acks.append((ack, status, message)),
+                                      ack_cache=self.cache())
+
+        @router.handler("set")
+        def apply(command):
+            runs.append(command.ack)
+            release.wait(2)
+            return "applied"
+
+        msg = {"ct": 0, "cmd": "set 1", "ack": "a1", "id": "T1"}
+        router.submit(msg)
+        router.submit(msg)  # retried while still running: ignored
+        release.set()
+        deadline = time.monotonic() + 2
+        while not acks and time.monotonic() < deadline:
+            time.sleep(0.005)
+        router.submit(msg)  # retried after the ack: cached result resent
+        router.close()
+        self.assertEqual(runs, ["a1"])
+        self.assertEqual(acks, [("a1", ACK_SUCCESS, "applied")] * 2)
+        self.assertEqual(router.stats.duplicates, 2)
+        router.ack_cache.close()
+
+        # After a restart the retry is still recognised
+        router = OrderedCommandRouter(lambda ack, status, message, device_id: acks.append((ack, status, message)),
+                                      ack_cache=self.cache())
+        router.register("set", lambda command: runs.append(command.ack))
+        router.submit(msg)
+        router.close()
+        self.assertEqual(runs, ["a1"])
+        self.assertEqual(len(acks), 3)
+        router.ack_cache.close()
+
+    def test_retry_racing_completion_runs_once(self):
+        acked = threading.Event()
+        runs = []
+        release = threading.Event()
+        cache = self.cache()
+        lookup = cache.get
+
+        def racing_get(ack, device_id=None):
+            # Miss, then let the running command finish before the in-flight check
+            result = lookup(ack, device_id)
+            release.set()
+            acked.wait(0.3)
+            return result
+
+        router = OrderedCommandRouter(lambda ack, status, message, device_id: acked.set(), ack_cache=cache)
+
+        @router.handler("set")
+        def apply(command):
+            runs.append(command.ack)
+            release.wait(2)
+
+        msg = {"ct": 0, "cmd": "set 1", "ack": "a1", "id": "T1"}
+        router.submit(msg)
+        cache.get = racing_get
+        router.submit(msg)
+        router.close()
+        self.assertEqual(runs, ["a1"])
+        self.assertEqual(router.stats.duplicates, 1)
+        cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+try:
+    import numpy as np
+    import batch_generators
+except ImportError:
+    np = None
+
+import data_generators
+from src.gateway.device_registry import default_registry
+
+def shape_of(value):
+    """Nested keys and Python value types of a payload"""
+    if isinstance(value, dict):
+        return {key: shape_of(item) for key, item in value.items()}
+    return type(value)
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBatchGenerators(unittest.TestCase):
+
+    PAIRS = [
+        ("generate_pct504e_data", "generate_pct504e_batch"),
+        ("generate_tbh300_data", "generate_tbh300_batch"),
+        ("generate_gesysense_receiver_data", "generate_gesysense_receiver_batch"),
+        ("generate_gesysense_temperature_data", "generate_gesysense_temperature_batch"),
+        ("generate_energy_data", "generate_energy_batch"),
+        ("generate_lighting_data", "generate_lighting_batch"),
+        ("generate_refrigeration_data", "generate_refrigeration_batch"),
+        ("generate_temperature_zigbee_data", "generate_temperature_zigbee_batch"),
+    ]
+
+    def test_batch_matches_scalar_shape(self):
+        rng = np.random.default_rng(1)
+        for scalar_name, batch_name in self.PAIRS:
+            with self.subTest(batch_name):
+                expected = shape_of(getattr(data_generators, scalar_name)())
+                payloads = getattr(batch_generators, batch_name)(5, rng)
+                self.assertEqual(len(payloads), 5)
+                for payload in payloads:
+                    self.assertEqual(shape_of(payload), expected)
+
+    def test_batch_payloads_share_only_static_parts(self):
+        payloads = batch_generators.generate_pct504e_batch(2)
+        self.assertIs(payloads[0]["genBasic"], payloads[1]["genBasic"])
+        self.assertIsNot(payloads[0]["hvacThermostat"], payloads[1]["hvacThermostat"])
+
+    def test_batch_values_in_range(self):
+        payloads = batch_generators.generate_temperature_zigbee_batch(200, np.random.default_rng(2))
+        for payload in payloads:
+            self.assertTrue(85 <= payload["link_quality"] <= 100)
+            self.assertTrue(68.0 <= payload["measure_temperature_value"] <= 80.0)
+
+    def test_vectorized_plan_keeps_device_order(self):
+        devices = [
+            {"uniqueId": "T1", "model": "PCT504-E", "deviceType": "thermostat"},
+            {"uniqueId": "Z1", "model": "", "deviceType": "temperature_zigbee"},
+            {"uniqueId": "T2", "model": "PCT504-E", "deviceType": "thermostat"},
+        ]
+        payloads = default_registry(vectorized=True).build_plan(devices).generate("t")
+        self.assertEqual([p["uniqueId"] for p in payloads], ["T1", "Z1", "T2"])
+        self.assertIn("genBasic", payloads[2]["data"])
+        self.assertIn("link_quality", payloads[1]["data"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+import unittest
+from data_generators import generate_pct504e_data, generate_tbh300_data
+from src.gateway.batcher import ChunkPublisher, PayloadBatcher
+
+def device(unique_id, size):
+    return {"uniqueId": unique_id, "time": "t", "data": {"blob": "x" * size}}
+
+class TestPayloadBatcher(unittest.TestCase):
+
+    def test_chunks_respect_limit(self):
+        batcher = PayloadBatcher(max_bytes=4096, envelope_bytes=256)
+        items = [device(f"D{i}", 300) for i in range(50)]
+        chunks = batcher.split(items)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([item for chunk in chunks for item in chunk.items], items)
+        for chunk in chunks:
+            self.assertLessEqual(len(json.dumps(chunk.items)) + 256, 4096)
+
+    def test_single_chunk_when_small(self):
+        chunks = PayloadBatcher().split([device("A", 10), device("B", 10)])
+        self.assertEqual(len(chunks), 1)
+
+    def test_oversized_device_isolated_in_order(self):
+        batcher = PayloadBatcher(max_bytes=2048, envelope_bytes=128)
+        chunks = batcher.split([device("A", 10), device("BIG", 5000), device("C", 10)])
+        self.assertEqual([chunk.oversized for chunk in chunks], [False, True, False])
+        self.assertEqual([[item["uniqueId"] for item in chunk.items] for chunk in chunks], [["A"], ["BIG"], ["C"]])
+        self.assertEqual([chunk.index for chunk in chunks], [0, 1, 2])
+
+    def test_full_chunks_fit_as_the_sdk_encodes_them(self):
+        batcher = PayloadBatcher()
+        items = [
+            {"uniqueId": f"D{i}", "time": "2024-01-01T00:00:00.000Z",
+             "data": generate_pct504e_data() if i % 2 else generate_tbh300_data()}
+            for i in range(600)
+        ]
+        chunks = batcher.split(items)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(json.dumps(chunk.items)) + batcher.envelope_bytes, batcher.max_bytes)
+            self.assertEqual(len(json.dumps(chunk.items)) + batcher.envelope_bytes, chunk.size)
+
+class TestChunkPublisher(unittest.TestCase):
+
+    def test_per_chunk_results(self):
+        def send(items):
+            if items[0]["uniqueId"] == "B":
+                raise ConnectionError("broker rejected")
+
+        batcher = PayloadBatcher(max_bytes=1024, envelope_bytes=128)
+        chunks = batcher.split([device("A", 600), device("B", 600), device("BIG", 5000), device("C", 600)])
+        publisher = ChunkPublisher(send, max_in_flight=2)
+        results = publisher.publish(chunks)
+        publisher.close()
+        self.assertEqual([result.ok for result in results], [True, False, False, True])
+        self.assertIsInstance(results[1].error, ConnectionError)
+        self.assertIn("BIG", results[2].error)
+
+    def test_window_limits_concurrency(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def send(items):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+        batcher = PayloadBatcher(max_bytes=1024, envelope_bytes=128)
+        publisher = ChunkPublisher(send, max_in_flight=3)
+        results = publisher.publish(batcher.split([device(str(i), 600) for i in range(9)]))
+        publisher.close()
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(max(peak), 3)
+
+if __name__ == '__main__':
+    unittest.main()
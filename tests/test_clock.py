@@ -0,0 +1,61 @@
+import unittest
+from src.utils.clock import TickClock, format_iso8601_ms
+from src.utils.helpers import format_timestamp
+
+class FakeNTPResponse:
+    def __init__(self, offset):
+        self.offset = offset
+
+class FakeNTPClient:
+    def __init__(self, offset=None):
+        self.offset = offset
+        self.requests = 0
+
+    def request(self, host, version=3, timeout=None):
+        self.requests += 1
+        if self.offset is None:
+            raise OSError("no response")
+        return FakeNTPResponse(self.offset)
+
+class TestTickClock(unittest.TestCase):
+
+    def test_format_iso8601_ms(self):
+        self.assertEqual(format_iso8601_ms(1700000000.1234), "2023-11-14T22:13:20.123Z")
+        self.assertEqual(format_timestamp(0), "1970-01-01T00:00:00.000Z")
+
+    def test_tick_is_shared_until_next_tick(self):
+        clock = TickClock()
+        tick = clock.tick()
+        self.assertIs(clock.current, tick)
+        self.assertRegex(tick.iso, r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z$")
+
+    def test_ntp_offset_applied(self):
+        clock = TickClock(ntp_server="ntp.test", ntp_client=FakeNTPClient(offset=3600.0))
+        before = clock.tick().epoch
+        self.assertEqual(clock.sync(), 3600.0)
+        self.assertGreaterEqual(clock.tick().epoch - before, 3600.0)
+
+    def test_failed_sync_keeps_previous_offset(self):
+        client = FakeNTPClient(offset=1.5)
+        clock = TickClock(ntp_server="ntp.test", ntp_client=client)
+        clock.sync()
+        client.offset = None
+        self.assertIsNone(clock.sync())
+        self.assertEqual(clock.offset, 1.5)
+
+    def test_background_sync(self):
+        client = FakeNTPClient(offset=0.25)
+        clock = TickClock(ntp_server="ntp.test", sync_interval=60, ntp_client=client)
+        clock.start()
+        clock.stop()
+        self.assertEqual(client.requests, 1)
+        self.assertEqual(clock.offset, 0.25)
+
+    def test_no_server_never_syncs(self):
+        clock = TickClock()
+        clock.start()
+        self.assertIsNone(clock.sync())
+        self.assertEqual(clock.offset, 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import threading
+import time
+import unittest
+from src.gateway.commands import ACK_FAILED, ACK_SUCCESS, CommandRouter, OrderedCommandRouter, parse_command
+
+class TestCommandRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.acks = []
+        self.acked = threading.Event()
+        self.router = CommandRouter(self.send_ack, max_workers=2)
+
+    def tearDown(self):
+        self.router.close()
+
+    def send_ack(self, ack, status, message, device_id):
+        self.acks.append((ack, status, message, device_id))
+        self.acked.set()
+
+    def wait_acks(self, count, timeout=2):
+        deadline = time.monotonic() + timeout
+        while len(self.acks) < count and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return self.acks
+
+    def test_parse_once(self):
+        command = parse_command({"ct": 0, "cmd": "setpoint 72 cool", "ack": "a1", "id": "T1"})
+        self.assertEqual((command.name, command.params, command.device_id, command.ack),
+                         ("setpoint", ["72", "cool"], "T1", "a1"))
+        self.assertIsNone(parse_command({"ct": 1, "urls": []}))
+        self.assertEqual(parse_command({"ct": 0, "cmd": "", "ack": "a"}).name, "")
+
+    def test_handlers_and_acks(self):
+        self.router.register("ok", lambda command: None)
+        self.router.register("no", lambda command: False)
+        self.router.register("say", lambda command: " ".join(command.params))
+
+        @self.router.handler("boom")
+        def boom(command):
+            raise ValueError("bad value")
+
+        for cmd, ack in [("ok", "1"), ("no", "2"), ("say hello there", "3"), ("boom", "4"), ("nope", "5"), ("", "6")]:
+            self.router.submit({"ct": 0, "cmd": cmd, "ack": ack, "id": "T1"})
+        acks = {ack: (status, message) for ack, status, message, _ in self.wait_acks(6)}
+        self.assertEqual(acks["1"], (ACK_SUCCESS, "command executed successfully"))
+        self.assertEqual(acks["2"][0], ACK_FAILED)
+        self.assertEqual(acks["3"], (ACK_SUCCESS, "hello there"))
+        self.assertEqual(acks["4"], (ACK_FAILED, "command execution failed: bad value"))
+        self.assertEqual(acks["5"][0], ACK_FAILED)
+        self.assertEqual(acks["6"], (ACK_FAILED, "no command provided"))
+
+    def test_submit_does_not_block_on_slow_handler(self):
+        release = threading.Event()
+        self.router.register("slow", lambda command: release.wait(2))
+        start = time.monotonic()
+        self.router.submit({"ct": 0, "cmd": "slow", "ack": "s"})
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(self.acks, [])
+        release.set()
+        self.assertEqual(self.wait_acks(1)[0][:2], ("s", ACK_SUCCESS))
+        self.assertIsNone(self.acks[0][3])  # gateway command: no device id
+
+    def test_refuses_when_full_and_measures(self):
+        release = threading.Event()
+        router = CommandRouter(self.send_ack, max_workers=1, max_pending=2)
+        router.register("wait", lambda command: release.wait(2))
+        for index in range(3):
+            router.submit({"ct": 0, "cmd": "wait", "ack": str(index)})
+        self.assertEqual(self.wait_acks(1)[0][:2], ("2", ACK_FAILED))
+        self.assertEqual(router.stats.max_pending, 2)
+        release.set()
+        self.wait_acks(3)
+        router.close()
+        self.assertEqual(router.stats.rejected, 1)
+        self.assertEqual(router.stats.completed, 2)
+        self.assertEqual(router.stats.pending, 0)
+        self.assertEqual(router.stats.latency["wait"].count, 2)
+
+class TestOrderedCommandRouter(unittest.TestCase):
+
+    def test_same_device_in_order_other_devices_in_parallel(self):
+        log = []
+        lock = threading.Lock()
+        acked = []
+        router = OrderedCommandRouter(lambda ack, status, message, device_id: acked.append(ack),
+                                      max_workers=4)
+
+        def handler(command):
+            delay = 0.05 if command.device_id == "ZigBee-1" else 0.001
+            with lock:
+                log.append(("start", command.device_id, command.params[0]))
+            time.sleep(delay)
+            with lock:
+                log.append(("end", command.device_id, command.params[0]))
+
+        router.register("set", handler)
+        for index in range(5):
+            router.submit({"ct": 0, "cmd": f"set {index}", "ack": f"z{index}", "id": "ZigBee-1"})
+            router.submit({"ct": 0, "cmd": f"set {index}", "ack": f"w{index}", "id": "WattNode"})
+        router.close()
+
+        for device in ("ZigBee-1", "WattNode"):
+            events = [(kind, value) for kind, device_id, value in log if device_id == device]
+            # Strictly sequential: every start is followed by its own end
+            self.assertEqual(events, [(kind, str(index)) for index in range(5) for kind in ("start", "end")])
+        # The slow ZigBee sensor did not hold up the WattNode
+        self.assertLess(acked.index("w4"), acked.index("z2"))
+        self.assertEqual(router.stats.ack_latency.count, 10)
+        self.assertEqual(router._mailboxes, {})
+
+    def test_close_acks_commands_left_in_mailboxes(self):
+        acked = []
+        release = threading.Event()
+        router = OrderedCommandRouter(lambda ack, status, message, device_id: acked.append((ack, status, message)),
+                                      max_workers=1)
+        router.register("wait", lambda command: release.wait(2))
+        for index in range(3):
+            router.submit({"ct": 0, "cmd": "wait", "ack": str(index), "id": "ZigBee-1"})
+        threading.Timer(0.2, release.set).start()
+        router.close(timeout=0.05)  # gives up waiting while the first command is still running
+        self.assertEqual(acked, [("0", ACK_SUCCESS, "command executed successfully"),
+                                 ("1", ACK_FAILED, "gateway shutting down"),
+                                 ("2", ACK_FAILED, "gateway shutting down")])
+        self.assertEqual(router.stats.pending, 0)
+        self.assertEqual(router.stats.failed, 2)
+
+if __name__ == '__main__':
+    unittest.main()
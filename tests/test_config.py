@@ -0,0 +1,148 @@
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from src.gateway.config import ConfigError, ConfigService, ConfigSnapshot, diff_devices, parse_devices
+from src.gateway.device_registry import default_registry
+from src.gateway.sampling import SamplingScheduler, reschedule_plan, schedule_plan
+
+DEVICES = {"devices": [
+    {"type": "gateway", "name": "Gateway-v3", "uniqueId": "GW-1", "attributes": {"hb": {}}},
+    {"type": "thermostat", "model": "PCT504-E", "devices": [
+        {"name": "Stat-1", "uniqueId": "T-1", "attributes": {"genBasic": {}}},
+        {"name": "Stat-2", "uniqueId": "T-2", "dataFrequency": 30},
+    ]},
+    {"type": "energy", "model": "WNC-3Y-208-MB", "name": "WattNode", "uniqueId": "E-1"},
+]}
+
+class TestConfig(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.device_path = os.path.join(self.directory, "device_config.json")
+        self.iotconnect_path = os.path.join(self.directory, "iotconnect_config.json")
+        self.write(self.device_path, DEVICES)
+        self.write(self.iotconnect_path, {"CPID": "cpid-1", "Environment": "poc", "Platform": "aws"})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, path, document):
+        with open(path, "w") as file:
+            json.dump(document, file)
+        stamp = os.stat(path).st_mtime_ns + 1_000_000_000  # a new mtime even on coarse filesystems
+        os.utime(path, ns=(stamp, stamp))
+
+    def test_parse_and_index(self):
+        gateway, devices = parse_devices(DEVICES)
+        self.assertEqual(gateway["uniqueId"], "GW-1")
+        snapshot = ConfigSnapshot(gateway, devices)
+        self.assertEqual([device["uniqueId"] for device in snapshot.devices], ["T-1", "T-2", "E-1"])
+        self.assertEqual(dict(snapshot.device("T-1")),
+                         {"uniqueId": "T-1", "name": "Stat-1", "model": "PCT504-E", "deviceType": "thermostat"})
+        self.assertEqual(snapshot.device("T-2")["dataFrequency"], 30)
+        self.assertEqual(len(snapshot.by_type["thermostat"]), 2)
+        self.assertIn("E-1", snapshot)
+        with self.assertRaises(TypeError):
+            snapshot.device("T-1")["model"] = "other"
+        with self.assertRaises(ConfigError):
+            parse_devices({"devices": [{"type": "energy", "name": "no id"}]})
+        with self.assertRaises(ConfigError):
+            parse_devices({"devices": [{"type": "energy", "uniqueId": "E"}, {"type": "lighting", "uniqueId": "E"}]})
+
+    def test_reload_publishes_changes(self):
+        service = ConfigService(self.device_path, self.iotconnect_path, poll_interval=0.01)
+        self.assertEqual(service.snapshot.sdk_options({"cpid": "", "sId": ""}), {"cpid": "cpid-1", "sId": "", "env": "poc", "pf": "aws"})
+        seen = []
+        service.subscribe(lambda snapshot, changes: seen.append((snapshot.version, changes)))
+        self.assertIsNone(service.check())
+
+        edited = json.loads(json.dumps(DEVICES))
+        edited["devices"][1]["devices"].pop(0)  # T-1 removed
+        edited["devices"][2]["model"] = "WNC-3D"  # E-1 changed
+        edited["devices"].append({"type": "lighting", "model": "CONMOD1.0-ZG", "uniqueId": "L-1"})
+        self.write(self.device_path, edited)
+        changes = service.check()
+        self.assertEqual([device["uniqueId"] for device in changes.added], ["L-1"])
+        self.assertEqual([device["uniqueId"] for device in changes.removed], ["T-1"])
+        self.assertEqual([device["model"] for device in changes.changed], ["WNC-3D"])
+        self.assertEqual(seen, [(2, changes)])
+
+        with open(self.device_path, "w") as file:
+            file.write('{"devices": [')  # half-written file
+        self.assertIsNone(service.check())
+        self.assertEqual(service.snapshot.version, 2)
+        self.assertEqual(service.stats.errors, 1)
+
+        self.write(self.device_path, DEVICES)
+        service.start()
+        try:
+            for _ in range(200):
+                if service.snapshot.version == 3:
+                    break
+                service._stop.wait(0.01)
+        finally:
+            service.stop()
+        self.assertIn("T-1", service.snapshot)
+        self.assertEqual(service.stats.reloads, 2)
+
+    def test_device_edit_survives_broken_iotconnect_file(self):
+        service = ConfigService(self.device_path, self.iotconnect_path)
+        edited = json.loads(json.dumps(DEVICES))
+        edited["devices"].append({"type": "lighting", "model": "CONMOD1.0-ZG", "uniqueId": "L-1"})
+        self.write(self.device_path, edited)
+        with open(self.iotconnect_path, "w") as file:
+            file.write('{"CPID": ')
+        self.assertIsNone(service.check())
+        self.assertIsNone(service.check())  # the same broken files are not re-read
+        self.assertEqual(service.stats.errors, 1)
+        self.assertNotIn("L-1", service.snapshot)
+        self.write(self.iotconnect_path, {"CPID": "cpid-2"})
+        changes = service.check()
+        self.assertEqual([device["uniqueId"] for device in changes.added], ["L-1"])
+        self.assertEqual(service.snapshot.iotconnect["CPID"], "cpid-2")
+
+    def test_records_pickle_and_stay_read_only(self):
+        from gateway_app import CHILD_DEVICES
+        restored = pickle.loads(pickle.dumps(CHILD_DEVICES))
+        self.assertEqual(restored, CHILD_DEVICES)
+        self.assertEqual(json.loads(json.dumps(restored[0])), dict(CHILD_DEVICES[0]))
+        with self.assertRaises(TypeError):
+            restored[0]["model"] = "other"
+        with self.assertRaises(TypeError):
+            restored[0].update(model="other")
+
+    def test_plan_and_schedule_updated_incrementally(self):
+        old = ConfigSnapshot(*parse_devices(DEVICES))
+        edited = json.loads(json.dumps(DEVICES))
+        del edited["devices"][1]["devices"][0]
+        edited["devices"].append({"type": "lighting", "model": "CONMOD1.0-ZG", "uniqueId": "L-1"})
+        changes = diff_devices(old, ConfigSnapshot(*parse_devices(edited)))
+
+        registry = default_registry()
+        plan = registry.build_plan(old.devices)
+        scheduler = schedule_plan(plan, {"energy": 5}, 60, 0)
+        scheduler.add("gateway", 60, 0)
+        scheduler.due(0)
+        plan, moved = registry.update_plan(plan, changes.added, [device["uniqueId"] for device in changes.removed])
+        self.assertEqual(moved, {1: 0, 2: 1})
+        self.assertEqual([unique_id for unique_id, _ in plan.entries], ["T-2", "E-1", "L-1"])
+        reschedule_plan(scheduler, plan, moved, {"energy": 5}, 60, 3)
+        self.assertEqual(scheduler.intervals, {0: 30, 1: 5, "gateway": 60, 2: 60})
+        self.assertEqual(scheduler.due(3), [2])  # only the new device is due now
+        self.assertEqual(scheduler.due(5), [1])  # the energy meter keeps its cadence
+        self.assertEqual(sorted(scheduler.due(30)), [0, 1])
+
+    def test_rekey_keeps_due_times(self):
+        scheduler = SamplingScheduler()
+        scheduler.add("a", 5, 3)
+        scheduler.add("b", 10, 1)
+        scheduler.rekey({"a": "c"})
+        self.assertEqual(scheduler.due(1), ["b"])
+        self.assertEqual(scheduler.due(3), ["c"])
+        self.assertEqual(scheduler.intervals, {"c": 5, "b": 10})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import unittest
+from src.gateway.delta import DeltaEncoder, load_deadbands
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+TEMPLATE_PATH = os.path.join(DATA_DIR, "GatewayTemplateAllDeviceTypes.json")
+
+def item(unique_id, data, timestamp="2024-01-01T00:00:00.000Z"):
+    return {"uniqueId": unique_id, "time": timestamp, "data": data}
+
+class TestDelta(unittest.TestCase):
+
+    def test_deadbands_from_template_units(self):
+        deadbands = load_deadbands(TEMPLATE_PATH)
+        self.assertEqual(deadbands["thermostat"]["hvacThermostat"]["localTemperature"], 0.5)
+        self.assertEqual(deadbands["energy"]["voltage_a"], 1.0)
+        self.assertEqual(deadbands["temperature_zigbee"]["measured_value"], 0.5)
+        # Strings, booleans and unitless numbers are sent on any change
+        self.assertNotIn("systemMode", deadbands["thermostat"]["hvacThermostat"])
+
+    def test_overrides(self):
+        deadbands = load_deadbands(TEMPLATE_PATH, overrides={"thermostat": {"hvacThermostat.localTemperature": 0.2}})
+        self.assertEqual(deadbands["thermostat"]["hvacThermostat"]["localTemperature"], 0.2)
+        self.assertEqual(deadbands["thermostat"]["hvacThermostat"]["occupiedCoolingSetpoint"], 0.5)
+
+    def test_sends_only_changes_beyond_deadband(self):
+        encoder = DeltaEncoder({"thermostat": {"hvac": {"temp": 0.5}}}, {"T1": "thermostat"})
+        first, stats = encoder.apply([item("T1", {"hvac": {"temp": 70.0, "mode": "cool"}, "rssi": -60})], 0)
+        self.assertEqual(first[0]["data"], {"hvac": {"temp": 70.0, "mode": "cool"}, "rssi": -60})
+        self.assertEqual(stats.keyframes, 1)
+        self.assertEqual(stats.saved_bytes, 0)
+
+        unchanged, stats = encoder.apply([item("T1", {"hvac": {"temp": 70.3, "mode": "cool"}, "rssi": -60})], 1)
+        self.assertEqual(unchanged, [])
+        self.assertGreater(stats.saved_bytes, 0)
+
+        changed, _ = encoder.apply([item("T1", {"hvac": {"temp": 70.4, "mode": "heat"}, "rssi": -61})], 2)
+        self.assertEqual(changed[0]["data"], {"hvac": {"mode": "heat"}, "rssi": -61})
+
+        # The deadband is measured against the last sent value, so slow drift is still reported
+        drifted, _ = encoder.apply([item("T1", {"hvac": {"temp": 70.6, "mode": "heat"}, "rssi": -61})], 3)
+        self.assertEqual(drifted[0]["data"], {"hvac": {"temp": 70.6}})
+
+    def test_keyframe_resends_full_snapshot(self):
+        encoder = DeltaEncoder({}, {"E1": "energy"}, keyframe_interval=10)
+        payload = item("E1", {"power": 100, "status": "ok"})
+        encoder.apply([payload], 0)
+        self.assertEqual(encoder.apply([payload], 5)[0], [])
+        sent, stats = encoder.apply([payload], 10)
+        self.assertIs(sent[0], payload)
+        self.assertEqual(stats.keyframes, 1)
+        encoder.reset("E1")
+        self.assertEqual(encoder.apply([payload], 11)[0], [payload])
+
+    def test_input_payloads_not_modified(self):
+        encoder = DeltaEncoder({}, {})
+        data = {"nested": {"a": 1, "b": 2}}
+        encoder.apply([item("D", data)], 0)
+        encoder.apply([item("D", {"nested": {"a": 1, "b": 3}})], 1)
+        self.assertEqual(data, {"nested": {"a": 1, "b": 2}})
+
+    def test_undelivered_devices_get_keyframe(self):
+        encoder = DeltaEncoder({}, {})
+        encoder.apply([item("A", {"power": 1, "status": "ok"}), item("B", {"power": 1, "status": "ok"})], 0)
+        changed, _ = encoder.apply([item("A", {"power": 2, "status": "ok"}), item("B", {"power": 2, "status": "ok"})], 1)
+        encoder.undelivered([payload for payload in changed if payload["uniqueId"] == "B"])
+        # B's change never reached the cloud, so B is sent in full even though nothing changed
+        resent, stats = encoder.apply([item("A", {"power": 2, "status": "ok"}), item("B", {"power": 2, "status": "ok"})], 2)
+        self.assertEqual(resent, [item("B", {"power": 2, "status": "ok"})])
+        self.assertEqual(stats.keyframes, 1)
+
+if __name__ == '__main__':
+    unittest.main()
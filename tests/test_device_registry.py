@@ -0,0 +1,37 @@
+import unittest
+from data_generators import generate_pct504e_data, generate_temperature_zigbee_data
+from src.gateway.device_registry import ANY_MODEL, DeviceRegistry, default_registry
+
+class TestDeviceRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = default_registry()
+
+    def test_resolve_exact_model(self):
+        self.assertIs(self.registry.resolve("thermostat", "PCT504-E"), generate_pct504e_data)
+
+    def test_resolve_any_model_fallback(self):
+        self.assertIs(self.registry.resolve("temperature_zigbee", ""), generate_temperature_zigbee_data)
+
+    def test_resolve_unknown(self):
+        self.assertIsNone(self.registry.resolve("thermostat", "UNKNOWN"))
+        self.assertIsNone(self.registry.resolve("sprinkler", ""))
+
+    def test_build_plan_skips_unknown_devices(self):
+        devices = [
+            {"uniqueId": "A", "model": "PCT504-E", "deviceType": "thermostat"},
+            {"uniqueId": "B", "model": "X", "deviceType": "sprinkler"},
+        ]
+        plan = self.registry.build_plan(devices)
+        self.assertEqual(len(plan), 1)
+        self.assertEqual([d["uniqueId"] for d in plan.skipped], ["B"])
+
+    def test_plan_generate(self):
+        registry = DeviceRegistry()
+        registry.register("energy", ANY_MODEL, lambda: {"power_sum": 1.0})
+        plan = registry.build_plan([{"uniqueId": "E", "model": "WN", "deviceType": "energy"}])
+        payload = plan.generate("2024-01-01T00:00:00.000Z")
+        self.assertEqual(payload, [{"uniqueId": "E", "time": "2024-01-01T00:00:00.000Z", "data": {"power_sum": 1.0}}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import time
+import unittest
+from src.gateway.batcher import ChunkPublisher, PayloadBatcher
+from src.gateway.fake_sdk import FakeIoTConnectSDK
+
+class TestFakeSDK(unittest.TestCase):
+
+    def setUp(self):
+        self.status = []
+        self.sdk = FakeIoTConnectSDK("GW-1", {}, self.status.append,
+                                     devices=[{"id": "T1", "tg": "thermostat"}])
+
+    def tearDown(self):
+        self.sdk.disconnect()
+
+    def test_connection_callbacks(self):
+        with self.sdk:
+            self.assertTrue(self.sdk.connected)
+        self.assertEqual([msg["command"] for msg in self.status], [True, False])
+        self.assertEqual(self.status[0]["ct"], 116)
+
+    def test_records_publishes(self):
+        with self.sdk as sdk:
+            sdk.SendData([{"uniqueId": "T1", "time": "t", "data": {"a": 1}}])
+            sdk.sendAckCmd("ack-1", 7, "ok", "T1")
+            sdk.sendOTAAckCmd("ack-2", 0, "ok")
+            sdk.UpdateTwin("setpoint", 72)
+            self.assertEqual([record.kind for record in sdk.records()], ["data", "ack", "ota_ack", "twin"])
+            self.assertEqual(sdk.records("ack")[0].payload, {"ack": "ack-1", "st": 7, "msg": "ok", "id": "T1"})
+            self.assertEqual(sdk.messages, 4)
+            self.assertEqual(sdk.bytes, sum(record.size for record in sdk.records()))
+            self.assertEqual(sdk.Getdevice(), [{"id": "T1", "tg": "thermostat"}])
+
+    def test_publish_requires_connection(self):
+        with self.assertRaises(RuntimeError):
+            self.sdk.SendData([])
+
+    def test_injected_commands_reach_callbacks(self):
+        with self.sdk as sdk:
+            def on_command(msg):
+                sdk.sendAckCmd(msg["ack"], 7, "done", msg.get("id"))
+            twins = []
+            sdk.onDeviceCommand(on_command)
+            sdk.onTwinChangeCommand(twins.append)
+            sdk.inject_command("setpoint 72", ack="a1", device_id="T1")
+            sdk.inject_twin({"mode": "cool"})
+            self.assertTrue(sdk.wait_idle(timeout=2))
+            self.assertEqual(sdk.records("ack")[0].payload["ack"], "a1")
+            self.assertEqual(twins, [{"desired": {"mode": "cool"}}])
+
+    def test_latency_and_failures(self):
+        sdk = FakeIoTConnectSDK("GW-1", latency=0.05)
+        with sdk:
+            start = time.perf_counter()
+            sdk.SendData([])
+            self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+            sdk.fail_next()
+            with self.assertRaises(RuntimeError):
+                sdk.SendData([])
+            sdk.SendData([])
+            self.assertEqual(sdk.messages, 2)
+
+    def test_drives_chunk_publisher(self):
+        sdk = FakeIoTConnectSDK("GW-1", latency=0.05)
+        publisher = ChunkPublisher(sdk.SendData, max_in_flight=4)
+        items = [{"uniqueId": f"D{i}", "time": "t", "data": {"v": "x" * 400}} for i in range(40)]
+        chunks = PayloadBatcher(max_bytes=3000, envelope_bytes=100).split(items)
+        with sdk:
+            start = time.perf_counter()
+            results = publisher.publish(chunks)
+            elapsed = time.perf_counter() - start
+        publisher.close()
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(sum(len(record.payload) for record in sdk.records("data")), 40)
+        # Chunks overlap their simulated broker latency
+        self.assertLess(elapsed, 0.05 * len(chunks))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from src.gateway.fleet import FleetStats, SimulatedGateway, fleet_children, gateway_ids, percentile, run_shard, shard
+
+CHILD_DEVICES = [
+    {"uniqueId": "Thermostat-1", "name": "Stat-1", "model": "PCT504-E", "deviceType": "thermostat"},
+    {"uniqueId": "ZigBee-1", "name": "ZigBee-1", "model": "", "deviceType": "temperature_zigbee"},
+    {"uniqueId": "WattNode", "name": "WattNode", "model": "WNC-3Y-208-MB", "deviceType": "energy"},
+]
+FREQUENCIES = {"energy": 5, "thermostat": 60, "temperature_zigbee": 300}
+
+class TestFleet(unittest.TestCase):
+
+    def test_ids_and_sharding(self):
+        ids = gateway_ids(10)
+        self.assertEqual(len(set(ids)), 10)
+        shards = shard(ids, 3)
+        self.assertEqual(sorted(sum(shards, [])), ids)
+        self.assertEqual(len(shard(ids[:2], 4)), 2)
+
+    def test_children_unique_per_gateway(self):
+        first = fleet_children("GW-1", CHILD_DEVICES)
+        second = fleet_children("GW-2", CHILD_DEVICES)
+        self.assertFalse({d["uniqueId"] for d in first} & {d["uniqueId"] for d in second})
+        self.assertEqual(first[0]["model"], "PCT504-E")
+        self.assertEqual(CHILD_DEVICES[0]["uniqueId"], "Thermostat-1")
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile(values, 1.0), 100)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_gateway_follows_sampling_intervals(self):
+        gateway = SimulatedGateway("GW-1", fleet_children("GW-1", CHILD_DEVICES), FREQUENCIES, 60)
+        self.assertEqual(gateway.tick_interval, 5)
+        self.assertEqual(len(gateway.build(0, 0.0)), 4)
+        sent = [gateway.build(offset, 0.0) for offset in range(5, 60, 5)]
+        self.assertTrue(all(len(data_array) == 1 for data_array in sent))
+        self.assertEqual(sent[0][0]["uniqueId"], "WattNode@GW-1")
+
+    def test_run_shard_and_merge(self):
+        stats = run_shard(gateway_ids(20), CHILD_DEVICES, FREQUENCIES, 60, duration=0.2, stagger=False)
+        self.assertEqual(stats.gateways, 20)
+        self.assertEqual(stats.messages, 20)
+        self.assertEqual(stats.devices, 4 * stats.messages)
+        self.assertGreater(stats.bytes, 0)
+        total = FleetStats().merge(stats).merge(stats)
+        self.assertEqual(total.messages, 2 * stats.messages)
+        self.assertEqual(len(total.report()), 4)
+
+if __name__ == '__main__':
+    unittest.main()
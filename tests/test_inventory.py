@@ -0,0 +1,58 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from src.gateway.config import DEVICE_CONFIG_PATH, ConfigService
+from src.gateway.inventory import DeviceInventory, DeviceRecord, load_import, load_inventory
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+IMPORT_PATHS = [os.path.join(DATA_DIR, "GatewayDeviceImport.json"),
+                os.path.join(DATA_DIR, "Gateway-ThermostatDeviceImport.json")]
+
+class TestInventory(unittest.TestCase):
+
+    def test_load_import_files(self):
+        config = ConfigService(DEVICE_CONFIG_PATH, None).snapshot
+        inventory = load_inventory(IMPORT_PATHS, config.by_id)
+        self.assertEqual(len(inventory), 28)  # the gateway and 27 children
+        self.assertEqual(inventory.get("GW-20001448").device_type, "gateway")
+        self.assertEqual(len(inventory.with_tag("thermostat")), 11)
+        self.assertEqual(len(inventory.with_model("PCT504-E")), 10)
+        self.assertEqual([record.unique_id for record in inventory.with_model("TBH300")], ["ENG-300-707-003"])
+        self.assertEqual(len(inventory.of_type("temperature_gesysense")), 2)  # not configured: tag as type
+        for device in config.devices:
+            self.assertEqual(inventory.get(device["uniqueId"]).as_dict()["deviceType"], device["deviceType"])
+        device_list = inventory.device_list("GW-20001448")
+        self.assertEqual(len(device_list), 27)
+        self.assertIn({"id": "8000020280", "tg": "gesysense"}, device_list)
+
+    def test_add_replace_remove(self):
+        inventory = DeviceInventory([DeviceRecord("A", tag="energy", model="WN", device_type="energy", gateway_id="GW"),
+                                     DeviceRecord("B", tag="energy", device_type="energy", gateway_id="GW")])
+        inventory.add(DeviceRecord("A", tag="lighting", model="CONMOD", device_type="lighting", gateway_id="GW"))
+        self.assertEqual([record.unique_id for record in inventory.with_tag("energy")], ["B"])
+        self.assertEqual(inventory.with_model("WN"), ())
+        self.assertEqual(inventory.remove("B").unique_id, "B")
+        self.assertIsNone(inventory.remove("B"))
+        self.assertEqual(sorted(inventory.tags()), ["lighting"])
+        self.assertNotIn("B", inventory)
+
+    def test_large_import_shares_strings(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "GatewayDeviceImport.json")
+            items = [{"name": f"D{index}", "uniqueId": f"ID-{index}", "tag": "temperature_zigbee"} for index in range(20000)]
+            with open(path, "w") as file:
+                json.dump({"gateway": {"items": [{"name": "GW", "uniqueId": "GW-1", "items": items}]}}, file)
+            inventory = load_import(path)
+        finally:
+            shutil.rmtree(directory)
+        records = inventory.of_type("temperature_zigbee")
+        self.assertEqual(len(records), 20000)
+        self.assertTrue(all(record.tag is sys.intern("temperature_zigbee") for record in records))
+        self.assertFalse(hasattr(records[0], "__dict__"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import gzip
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import unittest
+from src.utils.logger import (CompressedRotatingFileHandler, LazyJson, NonBlockingQueueHandler, RateLimitFilter,
+                              setup_logger, stop_logging)
+
+def record(name, level=logging.INFO, msg="tick %d", args=(1,)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+class TestLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_setup_is_idempotent_and_writes_in_background(self):
+        stop_logging()
+        path = os.path.join(self.directory, "gateway.log")
+        log = setup_logger("test_gateway_logger", path, console_level=logging.CRITICAL)
+        self.assertIs(setup_logger("test_gateway_logger", path), log)
+        self.assertEqual(len(log.handlers), 1)
+        logging.getLogger("test_gateway_logger.tick").info("sent %d devices", 26)
+        stop_logging()
+        log.handlers.clear()
+        with open(path) as file:
+            self.assertIn("test_gateway_logger.tick - INFO - sent 26 devices", file.read())
+
+    def test_lazy_json_only_formatted_when_enabled(self):
+        formatted = []
+
+        class Payload(dict):
+            def __iter__(self):
+                formatted.append(1)
+                return super().__iter__()
+
+        log = logging.getLogger("test_gateway_logger.lazy")
+        log.setLevel(logging.INFO)
+        log.debug("payload %s", LazyJson(Payload(a=1)))
+        self.assertEqual(formatted, [])
+        self.assertEqual(str(LazyJson({"a": 1}, indent=None)), '{"a": 1}')
+
+    def test_rate_limit_and_sampling(self):
+        limiter = RateLimitFilter(limits={"gw.tick": (0.001, 3)}, samples={"gw.payload": 10})
+        kept = [limiter.filter(record("gw.tick")) for _ in range(10)]
+        self.assertEqual(kept, [True] * 3 + [False] * 7)
+        self.assertTrue(limiter.filter(record("gw.tick", logging.ERROR)))  # problems always pass
+        self.assertEqual(sum(limiter.filter(record("gw.payload")) for _ in range(100)), 10)
+        self.assertTrue(all(limiter.filter(record("gw.other")) for _ in range(100)))
+        self.assertEqual(limiter.dropped, {"gw.tick": 7, "gw.payload": 90})
+
+        sampled = RateLimitFilter(samples={"gw.payload": 3})
+        records = [record("gw.payload") for _ in range(4)]
+        kept = [item for item in records if sampled.filter(item)]
+        self.assertEqual(kept[1].getMessage(), "tick 1 [2 similar suppressed]")
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = NonBlockingQueueHandler(queue.Queue(2))
+        for _ in range(5):
+            handler.emit(record("gw.tick"))
+        self.assertEqual(handler.dropped, 3)
+
+    def test_rotated_files_are_compressed(self):
+        path = os.path.join(self.directory, "gateway.log")
+        handler = CompressedRotatingFileHandler(path, maxBytes=1000, backupCount=2)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for index in range(500):
+            handler.emit(record("gw.tick", args=(index,)))
+        handler.close()
+        self.assertEqual(sorted(os.listdir(self.directory)), ["gateway.log", "gateway.log.1.gz", "gateway.log.2.gz"])
+        with gzip.open(path + ".1.gz", "rt") as file:
+            self.assertTrue(file.read().startswith("tick"))
+
+if __name__ == '__main__':
+    unittest.main()
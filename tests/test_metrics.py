@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import unittest
+import urllib.request
+from gateway_app import CHILD_DEVICES
+from src.gateway.device_registry import default_registry
+from src.gateway.scheduler import TelemetryScheduler
+from src.utils.metrics import Histogram, MetricsRegistry, MetricsServer, timed
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_prometheus_text(self):
+        sent = self.registry.counter("gateway_sent_bytes", "Bytes sent")
+        sent.inc(100)
+        sent.inc(28)
+        self.registry.gauge("gateway_backlog_records", "Spooled records", function=lambda: 42)
+        latency = self.registry.histogram("gateway_send_seconds", "SendData latency", buckets=(0.01, 0.1))
+        for value in (0.005, 0.05, 0.05, 3.0):
+            latency.observe(value)
+        per_type = self.registry.histogram("gateway_generate_seconds", "Generation", ["device_type"], buckets=(1,))
+        per_type.labels('ther"mo').observe(0.5)
+        text = self.registry.render()
+        self.assertIn("# TYPE gateway_sent_bytes counter\ngateway_sent_bytes_total 128\n", text)
+        self.assertIn("gateway_backlog_records 42\n", text)
+        self.assertIn('gateway_send_seconds_bucket{le="0.01"} 1\n', text)
+        self.assertIn('gateway_send_seconds_bucket{le="0.1"} 3\n', text)
+        self.assertIn('gateway_send_seconds_bucket{le="+Inf"} 4\n', text)
+        self.assertIn("gateway_send_seconds_count 4\n", text)
+        self.assertIn('gateway_generate_seconds_bucket{device_type="ther\\"mo",le="1"} 1\n', text)
+
+    def test_registry_returns_same_series(self):
+        self.assertIs(self.registry.counter("a", "a"), self.registry.counter("a", "a"))
+        family = self.registry.histogram("b", "b", ["device_type"])
+        self.assertIs(family.labels("thermostat"), family.labels("thermostat"))
+        with self.assertRaises(ValueError):
+            self.registry.gauge("a", "a")
+        with self.assertRaises(ValueError):
+            family.labels()
+
+    def test_thread_safe_observations(self):
+        histogram = Histogram()
+
+        def work():
+            for _ in range(10000):
+                histogram.observe(0.002)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(histogram.count, 40000)
+
+    def test_timed_and_endpoint(self):
+        callbacks = self.registry.histogram("gateway_callback_seconds", "Callbacks", ["callback"])
+
+        @timed(callbacks.labels("twin"))
+        def callback(msg):
+            return msg
+
+        self.assertEqual(callback(1), 1)
+        server = MetricsServer(self.registry, port=0).start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+                body = response.read().decode()
+        finally:
+            server.stop()
+        self.assertIn('gateway_callback_seconds_count{callback="twin"} 1', body)
+
+    def test_instrumented_plan_and_scheduler(self):
+        plan = default_registry().build_plan(CHILD_DEVICES)
+        family = self.registry.histogram("gateway_generate_seconds", "Generation", ["device_type"])
+        timers = [family.labels(device["deviceType"]) for device in plan.devices]
+        self.assertEqual(len(plan.generate("t", None, timers)), len(plan))
+        self.assertEqual(family.labels("temperature_zigbee").count, 10)
+
+        lateness = self.registry.histogram("gateway_tick_lateness_seconds", "Lateness")
+        scheduler = TelemetryScheduler(0.01, [lambda: None], on_lateness=lateness.observe)
+        asyncio.run(scheduler.run(max_ticks=3))
+        self.assertEqual(lateness.count, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.gateway.ota import (OTA_DOWNLOADED, OTA_DOWNLOADING, OTA_FAILED, FirmwareDownloader, OtaManager,
+                             index_devices)
+
+class FirmwareServer(ThreadingHTTPServer):
+    """Local firmware host with Range support and throttled bandwidth"""
+
+    def __init__(self, files, rate=2 * 1024 * 1024):
+        super().__init__(("127.0.0.1", 0), FirmwareHandler)
+        self.files = files
+        self.rate = rate  # bytes per second per connection
+        self.drop_at = {}  # path -> close the connection after this many bytes, once
+        self.requests = []
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.server_address[1]}/{name}"
+
+class FirmwareHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        data = self.server.files.get(self.path)
+        self.server.requests.append((self.path, self.headers.get("Range")))
+        if data is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        stop = len(data)
+        drop_at = self.server.drop_at.pop(self.path, None)
+        if drop_at is not None:
+            stop = drop_at
+        step = 4096
+        for offset in range(start, stop, step):
+            self.wfile.write(data[offset:min(offset + step, stop)])
+            time.sleep(step / self.server.rate)
+        if drop_at is not None:
+            self.close_connection = True
+
+class TestOta(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.thermostat = os.urandom(100 * 1024)
+        self.gateway = os.urandom(30 * 1024)
+        self.server = FirmwareServer({
+            "/thermostat-2.1.bin": self.thermostat,
+            "/thermostat-2.1-mirror.bin": self.thermostat,
+            "/gateway-1.4.bin": self.gateway,
+        })
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.acks = []
+        self.devices = [{"id": f"T{i}", "tg": "thermostat"} for i in range(3)] + [{"id": "W1", "tg": "meter"}]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def send_ack(self, ack, status, message, device_id):
+        self.acks.append((ack, status, message, device_id))
+
+    def manager(self, **kwargs):
+        downloader = FirmwareDownloader(self.directory, chunk_size=8192, retry_delay=0)
+        return OtaManager(self.send_ack, downloader, self.devices, **kwargs)
+
+    def test_index_devices(self):
+        self.assertEqual(index_devices(self.devices), {"thermostat": ["T0", "T1", "T2"], "meter": ["W1"]})
+
+    def test_fan_out_with_progress_acks(self):
+        manager = self.manager()
+        plan = manager.submit({"ct": 1, "ack": "o1", "urls": [
+            {"url": self.server.url("thermostat-2.1.bin"), "tg": "thermostat"},
+            {"url": self.server.url("gateway-1.4.bin")},
+        ]})
+        manager.close()
+        self.assertEqual(plan[self.server.url("gateway-1.4.bin")], [None])
+        final = {device: (status, message) for _, status, message, device in self.acks if status != OTA_DOWNLOADING}
+        self.assertEqual(set(final), {"T0", "T1", "T2", None})
+        self.assertTrue(final["T1"][1].endswith(hashlib.sha256(self.thermostat).hexdigest()))
+        self.assertEqual(final[None][0], OTA_DOWNLOADED)
+        progress = [message for _, status, message, device in self.acks if status == OTA_DOWNLOADING and device == "T0"]
+        self.assertEqual(len(progress), 4)  # start, 25%, 50%, 75%
+        self.assertEqual(manager.stats.downloads, 2)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_same_url_and_identical_images_downloaded_once(self):
+        manager = self.manager()
+        url = self.server.url("thermostat-2.1.bin")
+        manager.submit({"ct": 1, "ack": "o1", "urls": [{"url": url, "tg": "thermostat"}, {"url": url, "tg": "meter"}]})
+        manager.submit({"ct": 1, "ack": "o2", "urls": [{"url": url, "tg": "thermostat"}]})  # still downloading
+        manager.close()
+        self.assertEqual(len(self.server.requests), 1)
+        done = sorted((ack, device) for ack, status, _, device in self.acks if status == OTA_DOWNLOADED)
+        self.assertEqual(done, [("o1", "T0"), ("o1", "T1"), ("o1", "T2"), ("o1", "W1"),
+                                ("o2", "T0"), ("o2", "T1"), ("o2", "T2")])
+        self.assertEqual(manager.stats.shared, 2)
+        # A device never hears "downloading" after "downloaded"
+        for key in {(ack, device) for ack, _, _, device in self.acks}:
+            statuses = [status for ack, status, _, device in self.acks if (ack, device) == key]
+            self.assertEqual(statuses[-1], OTA_DOWNLOADED, key)
+            self.assertNotIn(OTA_DOWNLOADED, statuses[:-1], key)
+
+        # The same bytes under another URL are stored once
+        downloader = manager.downloader
+        firmware = downloader.download(self.server.url("thermostat-2.1-mirror.bin"))
+        self.assertEqual(downloader.duplicates, 1)
+        self.assertEqual([name for name in os.listdir(self.directory)], [os.path.basename(firmware.path)])
+
+    def test_shared_counts_only_repeated_urls(self):
+        manager = self.manager()
+        url = self.server.url("gateway-1.4.bin")
+        plan = manager.submit({"ct": 1, "ack": "o1", "urls": [
+            {"url": url},
+            {"url": url},  # repeated
+            {"tg": "thermostat"},  # no url
+            {"url": self.server.url("thermostat-2.1.bin"), "tg": "sprinkler"},  # no such devices
+        ]})
+        manager.close()
+        self.assertEqual(list(plan), [url])
+        self.assertEqual(manager.stats.shared, 1)
+
+    def test_resumes_dropped_download(self):
+        self.server.drop_at["/thermostat-2.1.bin"] = 40 * 1024
+        downloader = FirmwareDownloader(self.directory, chunk_size=8192, retry_delay=0)
+        firmware = downloader.download(self.server.url("thermostat-2.1.bin"))
+        with open(firmware.path, "rb") as file:
+            self.assertEqual(file.read(), self.thermostat)
+        self.assertEqual(firmware.sha256, hashlib.sha256(self.thermostat).hexdigest())
+        self.assertEqual(downloader.resumed, 1)
+        self.assertEqual(self.server.requests[1], ("/thermostat-2.1.bin", f"bytes={40 * 1024}-"))
+        self.assertEqual(downloader.downloaded_bytes, len(self.thermostat))
+
+    def test_failed_download_acks_failure(self):
+        manager = self.manager()
+        manager.downloader.retries = 0
+        manager.submit({"ct": 1, "ack": "o1", "urls": [{"url": self.server.url("missing.bin"), "tg": "meter"}]})
+        manager.close()
+        self.assertEqual([status for _, status, _, _ in self.acks], [OTA_DOWNLOADING, OTA_FAILED])
+        self.assertEqual(manager.stats.failed, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import unittest
+import data_generators
+from payload_skeletons import PayloadSkeleton, VOLATILE
+
+class TestPayloadSkeleton(unittest.TestCase):
+
+    def setUp(self):
+        self.skeleton = PayloadSkeleton({
+            "static": {"name": "OWON", "version": 4},
+            "nested": {"fixed": 1.5, "value": VOLATILE},
+            "flag": VOLATILE,
+            "label": "x",
+        })
+
+    def test_fill_patches_volatile_fields(self):
+        payload = self.skeleton.fill((21.5, True))
+        self.assertEqual(payload, {
+            "static": {"name": "OWON", "version": 4},
+            "nested": {"fixed": 1.5, "value": 21.5},
+            "flag": True,
+            "label": "x",
+        })
+        self.assertEqual(list(payload), ["static", "nested", "flag", "label"])
+
+    def test_fill_shares_static_subtrees(self):
+        first = self.skeleton.fill((1, False))
+        second = self.skeleton.fill((2, False))
+        self.assertIs(first["static"], second["static"])
+        self.assertIsNot(first["nested"], second["nested"])
+
+    def test_shared_static_subtrees_are_read_only(self):
+        payload = self.skeleton.fill((1, False))
+        with self.assertRaises(TypeError):
+            payload["static"]["version"] = 5
+        with self.assertRaises(TypeError):
+            payload["static"].update(version=5)
+        self.assertEqual(self.skeleton.fill((2, False))["static"], {"name": "OWON", "version": 4})
+        # Dicts holding volatile fields are fresh per payload and stay writable
+        payload["nested"]["value"] = 0
+        self.assertEqual(json.loads(json.dumps(payload))["static"], {"name": "OWON", "version": 4})
+
+    def test_encode_matches_json(self):
+        values = (72.3, False)
+        expected = json.dumps(self.skeleton.fill(values), separators=(",", ":")).encode()
+        self.assertEqual(self.skeleton.encode(values), expected)
+
+    def test_encode_escapes_strings(self):
+        skeleton = PayloadSkeleton({"name": VOLATILE})
+        self.assertEqual(json.loads(skeleton.encode(('say "hi"',))), {"name": 'say "hi"'})
+
+    def test_wrong_value_count(self):
+        with self.assertRaises(ValueError):
+            self.skeleton.fill((1,))
+
+    def test_generators_leave_no_volatile_markers(self):
+        for generator, (skeleton, values) in data_generators.PAYLOAD_SKELETONS.items():
+            with self.subTest(generator.__name__):
+                payload = generator()
+                self.assertNotIn("VOLATILE", repr(payload))
+                self.assertEqual(set(json.loads(data_generators.encode_device_data(generator))), set(payload))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.gateway.batcher import ChunkPublisher, PayloadBatcher
+from src.gateway.fake_sdk import FakeIoTConnectSDK
+from src.gateway.replay import BacklogReplayer
+from src.gateway.spool import TelemetrySpool
+from src.utils.token_bucket import TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def items(count):
+    return [{"uniqueId": f"D{i}", "time": "t", "data": {"v": i}} for i in range(count)]
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=20, clock=clock)
+        self.assertEqual(bucket.take(50), 20)
+        self.assertEqual(bucket.take(1), 0)
+        clock.now = 0.5
+        self.assertEqual(bucket.take(50), 5)
+        clock.now = 100
+        self.assertFalse(bucket.try_take(21))
+        self.assertTrue(bucket.try_take(20))
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.spool = TelemetrySpool(os.path.join(self.directory, "spool.db"), commit_interval=60)
+        self.sdk = FakeIoTConnectSDK("GW-1")
+        self.sdk.connect()
+        self.publisher = ChunkPublisher(self.sdk.SendData)
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.publisher.close()
+        self.sdk.disconnect()
+        self.spool.close()
+        shutil.rmtree(self.directory)
+
+    def replayer(self, **options):
+        return BacklogReplayer(self.spool, PayloadBatcher(), self.publisher, clock=self.clock, **options)
+
+    def sent_ids(self):
+        return [item["uniqueId"] for record in self.sdk.records("data") for item in record.payload]
+
+    def test_drains_oldest_first_within_rate(self):
+        self.spool.append(items(100))
+        self.spool.flush()
+        replayer = self.replayer(rate=10, burst=30, ratio=1.0, min_per_tick=5)
+        self.assertEqual(replayer.replay(live_records=40), 30)  # burst
+        self.clock.now = 1.0
+        self.assertEqual(replayer.replay(live_records=40), 10)  # rate
+        self.assertEqual(self.sent_ids(), [f"D{i}" for i in range(40)])
+        self.assertEqual(replayer.stats.remaining, 60)
+        self.assertEqual(len(self.spool), 60)
+        self.assertAlmostEqual(replayer.stats.eta_seconds, 60 / replayer.stats.rate)
+
+    def test_ratio_limits_share_per_tick(self):
+        self.spool.append(items(100))
+        self.spool.flush()
+        replayer = self.replayer(rate=1000, burst=1000, ratio=0.5, min_per_tick=5)
+        self.assertEqual(replayer.replay(live_records=20), 10)
+        self.clock.now = 1.0
+        self.assertEqual(replayer.replay(live_records=40), 20)  # the rate would allow 1000
+        self.clock.now = 2.0
+        self.assertEqual(replayer.replay(live_records=0), 5)
+
+    def test_rate_caps_allowance_per_tick(self):
+        self.spool.append(items(3000))
+        self.spool.flush()
+        replayer = self.replayer(rate=100, burst=1000, ratio=1.0, min_per_tick=25)
+        self.assertEqual(replayer.replay(live_records=2000), 1000)  # burst
+        self.clock.now = 5.0
+        self.assertEqual(replayer.replay(live_records=2000), 500)  # 100/s over a 5 s tick
+        self.clock.now = 15.0
+        self.assertEqual(replayer.replay(live_records=300), 300)  # ratio, though 1000 tokens are back
+
+    def test_failed_replay_stays_in_spool(self):
+        self.spool.append(items(10))
+        self.spool.flush()
+        replayer = self.replayer(rate=1000, burst=1000, min_per_tick=10)
+        self.sdk.fail_next()
+        self.assertEqual(replayer.replay(), 0)
+        self.assertEqual(replayer.stats.failed, 10)
+        self.assertEqual(len(self.spool), 10)
+        self.assertEqual(replayer.replay(), 10)
+        self.assertEqual(len(self.spool), 0)
+        self.assertEqual(replayer.stats.metrics()["replay_backlog_records"], 0)
+        self.assertEqual(replayer.stats.eta_seconds, 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import gzip
+import http.client
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.gateway.rollup import ChunkedUploader, RollupShipper, RollupWriter, UploadError
+
+class UploadServer(ThreadingHTTPServer):
+    """Local stand-in for the upload endpoint, speaking the resumable protocol"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), UploadHandler)
+        self.files = {}
+        self.complete = set()
+        self.fail_at = None  # fail the PUT that would go past this many bytes
+        self.puts = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/upload"
+
+class UploadHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        data = self.server.files.get(self.path)
+        if data is None:
+            self.send_response(404)
+        else:
+            self.send_response(200)
+            self.send_header("Upload-Offset", str(len(data)))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_PUT(self):
+        self.server.puts += 1
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        start_end, total = self.headers["Content-Range"].split(" ")[1].split("/")
+        start = int(start_end.split("-")[0])
+        data = self.server.files.setdefault(self.path, bytearray())
+        if start != len(data):
+            self.send_response(409)
+        elif self.server.fail_at is not None and len(data) + len(body) > self.server.fail_at:
+            data.extend(body[: self.server.fail_at - len(data)])  # connection dropped mid-chunk
+            self.server.fail_at = None
+            self.send_response(500)
+        else:
+            data.extend(body)
+            if len(data) == int(total):
+                self.server.complete.add(self.path)
+                self.send_response(201)
+            else:
+                self.send_response(308)
+                self.send_header("Upload-Offset", str(len(data)))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+def items(start, count):
+    return [{"uniqueId": f"D{i}", "time": "t", "data": {"v": os.urandom(64).hex()}} for i in range(start, start + count)]
+
+class TestRollup(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.server = UploadServer()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def read_lines(self, data):
+        return [json.loads(line) for line in gzip.decompress(bytes(data)).splitlines()]
+
+    def test_rotation_by_size_and_age(self):
+        now = [0.0]
+        writer = RollupWriter(self.directory, max_bytes=4096, max_age=60, clock=lambda: now[0])
+        for tick in range(200):
+            writer.write(items(tick * 5, 5))
+        self.assertGreater(writer.rotated, 0)
+        self.assertEqual(len(writer.ready_files()), writer.rotated)
+        self.assertTrue(any(name.endswith(".part") for name in os.listdir(self.directory)))
+        now[0] = 61
+        self.assertIsNotNone(writer.rotate_if_due())
+        self.assertFalse(any(name.endswith(".part") for name in os.listdir(self.directory)))
+        records = []
+        for path in writer.ready_files():
+            with gzip.open(path) as file:
+                records.extend(json.loads(line) for line in file)
+        self.assertEqual([record["uniqueId"] for record in records], [f"D{i}" for i in range(1000)])
+
+    def test_chunked_upload(self):
+        writer = RollupWriter(self.directory)
+        writer.write(items(0, 50))
+        path = writer.rotate()
+        uploader = ChunkedUploader(self.server.url, chunk_size=1024)
+        uploader.upload(path)
+        stored = self.server.files["/upload/" + os.path.basename(path)]
+        self.assertEqual(len(self.read_lines(stored)), 50)
+        self.assertGreater(self.server.puts, 1)
+        self.assertEqual(uploader.uploaded_files, 1)
+
+    def test_resume_after_interruption(self):
+        writer = RollupWriter(self.directory)
+        writer.write(items(0, 50))
+        path = writer.rotate()
+        self.server.fail_at = 2500
+        uploader = ChunkedUploader(self.server.url, chunk_size=1024)
+        with self.assertRaises(UploadError):
+            uploader.upload(path)
+        puts = self.server.puts
+        uploader.upload(path)
+        self.assertEqual(uploader.resumed, 1)
+        stored = self.server.files["/upload/" + os.path.basename(path)]
+        with open(path, "rb") as file:
+            self.assertEqual(bytes(stored), file.read())
+        # Only the rest of the file was sent again
+        self.assertLessEqual(self.server.puts - puts, (os.path.getsize(path) - 2500) // 1024 + 1)
+
+    def test_shipper_uploads_and_removes(self):
+        writer = RollupWriter(self.directory)
+        shipper = RollupShipper(writer, ChunkedUploader(self.server.url))
+        writer.write(items(0, 10))
+        shipper.stop()
+        self.assertEqual(writer.ready_files(), [])
+        self.assertEqual(len(self.server.complete), 1)
+
+    def test_recovers_part_files_after_crash(self):
+        writer = RollupWriter(self.directory)
+        writer.write(items(0, 20))
+        writer._gzip.flush()  # on disk when the process dies...
+        writer._file.flush()
+        writer.write(items(20, 5))  # ...these are still in the compressor
+        with open(os.path.join(self.directory, "empty.part"), "wb") as file:
+            file.write(b"\x1f\x8b")
+        recovered = RollupWriter(self.directory)
+        self.assertEqual(recovered.recovered, 20)
+        self.assertFalse(any(name.endswith(".part") for name in os.listdir(self.directory)))
+        paths = recovered.ready_files()
+        self.assertEqual(len(paths), 1)
+        with gzip.open(paths[0]) as file:
+            self.assertEqual([json.loads(line)["uniqueId"] for line in file], [f"D{i}" for i in range(20)])
+
+    def test_shipper_survives_unexpected_upload_errors(self):
+        errors = [http.client.IncompleteRead(b""), ValueError("bad Upload-Offset"), RuntimeError("bug")]
+        uploader = ChunkedUploader(self.server.url)
+        upload = uploader.upload
+
+        def flaky_upload(path):
+            if errors:
+                raise errors.pop(0)
+            upload(path)
+
+        uploader.upload = flaky_upload
+        writer = RollupWriter(self.directory)
+        writer.write(items(0, 10))
+        writer.rotate()
+        shipper = RollupShipper(writer, uploader, interval=0.01)
+        self.assertEqual(shipper.ship(), 0)
+        self.assertEqual(shipper.ship(), 0)
+        self.assertEqual(shipper.failures, 2)
+        shipper.start()  # the RuntimeError must not end the thread
+        deadline = time.monotonic() + 2
+        while writer.ready_files() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        shipper.stop()
+        self.assertEqual(writer.ready_files(), [])
+        self.assertEqual(len(self.server.complete), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import unittest
+from src.gateway.device_registry import default_registry
+from src.gateway.sampling import SamplingScheduler, load_template_frequency, resolve_frequency, schedule_plan
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+class TestSampling(unittest.TestCase):
+
+    def test_load_template_frequency(self):
+        self.assertEqual(load_template_frequency(os.path.join(DATA_DIR, "GatewayTemplateAllDeviceTypes.json")), 60)
+
+    def test_resolve_frequency_precedence(self):
+        frequencies = {"WNC-3Y-208-MB": 5, "energy": 10, "temperature_zigbee": 300}
+        self.assertEqual(resolve_frequency({"model": "WNC-3Y-208-MB", "deviceType": "energy"}, frequencies, 60), 5)
+        self.assertEqual(resolve_frequency({"model": "other", "deviceType": "energy"}, frequencies, 60), 10)
+        self.assertEqual(resolve_frequency({"model": "", "deviceType": "temperature_zigbee"}, frequencies, 60), 300)
+        self.assertEqual(resolve_frequency({"model": "PCT504-E", "deviceType": "thermostat"}, frequencies, 60), 60)
+        self.assertEqual(resolve_frequency({"deviceType": "energy", "dataFrequency": "2"}, frequencies, 60), 2)
+
+    def test_due_devices_coalesced_per_wakeup(self):
+        scheduler = SamplingScheduler()
+        scheduler.add("energy", 5, 0)
+        scheduler.add("stat", 60, 0)
+        scheduler.add("zigbee", 300, 0)
+        self.assertEqual(sorted(scheduler.due(0)), ["energy", "stat", "zigbee"])
+        sent = {"energy": 0, "stat": 0, "zigbee": 0}
+        for now in range(5, 301, 5):
+            for key in scheduler.due(now):
+                sent[key] += 1
+        self.assertEqual(sent, {"energy": 60, "stat": 5, "zigbee": 1})
+        self.assertEqual(scheduler.base_interval(), 5)
+
+    def test_stall_skips_to_next_slot_on_cadence(self):
+        scheduler = SamplingScheduler()
+        scheduler.add("energy", 5, 0)
+        scheduler.due(0)
+        self.assertEqual(scheduler.due(23), ["energy"])
+        self.assertEqual(scheduler.next_due(), 25)
+
+    def test_remove_and_readd(self):
+        scheduler = SamplingScheduler()
+        scheduler.add("a", 5, 0)
+        scheduler.add("b", 5, 0)
+        scheduler.remove("a")
+        scheduler.add("b", 10, 0)
+        self.assertEqual(scheduler.due(0), ["b"])
+        self.assertEqual(scheduler.next_due(), 10)
+        self.assertEqual(len(scheduler), 1)
+
+    def test_schedule_plan_uses_positions(self):
+        devices = [
+            {"uniqueId": "E", "model": "WN", "deviceType": "energy"},
+            {"uniqueId": "Z", "model": "", "deviceType": "temperature_zigbee"},
+        ]
+        plan = default_registry().build_plan(devices)
+        scheduler = schedule_plan(plan, {"energy": 5, "temperature_zigbee": 300}, 60, 0)
+        self.assertEqual(scheduler.intervals, {0: 5, 1: 300})
+        scheduler.due(0)
+        payloads = plan.generate("t", scheduler.due(5))
+        self.assertEqual([p["uniqueId"] for p in payloads], ["E"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import itertools
+import time
+import unittest
+from src.gateway.scheduler import TelemetryScheduler
+
+class TestTelemetryScheduler(unittest.TestCase):
+
+    def test_ticks_follow_absolute_deadlines(self):
+        starts = []
+
+        def build():
+            starts.append(time.monotonic())
+            time.sleep(0.02)  # generation time must not shift later ticks
+            return len(starts)
+
+        scheduler = TelemetryScheduler(0.05, [build, lambda result: result])
+        asyncio.run(scheduler.run(max_ticks=6))
+        self.assertEqual(scheduler.stats.completed, 6)
+        self.assertAlmostEqual(starts[-1] - starts[0], 0.25, delta=0.04)
+
+    def test_stages_pipeline_in_order(self):
+        ticks = itertools.count(1)
+        published = []
+
+        def publish(tick):
+            time.sleep(0.015)  # slower than the interval, so ticks overlap
+            published.append(tick)
+
+        scheduler = TelemetryScheduler(0.01, [lambda: next(ticks), publish], max_in_flight=5)
+        asyncio.run(scheduler.run(max_ticks=5))
+        self.assertEqual(published, [1, 2, 3, 4, 5])
+
+    def test_overrun_counts_missed_ticks(self):
+        scheduler = TelemetryScheduler(0.02, [lambda: time.sleep(0.07)], max_in_flight=1)
+
+        async def run():
+            stop = asyncio.Event()
+            asyncio.get_running_loop().call_later(0.2, stop.set)
+            await scheduler.run(stop)
+
+        asyncio.run(run())
+        self.assertGreater(scheduler.stats.missed, 0)
+        self.assertLess(scheduler.stats.started, 10)
+
+    def test_stage_error_does_not_stop_schedule(self):
+        def build():
+            raise RuntimeError("publish failed")
+
+        scheduler = TelemetryScheduler(0.01, [build])
+        asyncio.run(scheduler.run(max_ticks=3))
+        self.assertEqual(scheduler.stats.failed, 3)
+        self.assertEqual(scheduler.stats.started, 3)
+
+if __name__ == '__main__':
+    unittest.main()
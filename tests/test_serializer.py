@@ -0,0 +1,36 @@
+import json
+import unittest
+from src.utils import serializer
+from src.utils.serializer import StdlibSerializer, get_serializer
+
+PAYLOAD = [{"uniqueId": "T1", "time": "2024-01-01T00:00:00.000Z",
+            "data": {"temp": 71.5, "on": True, "mode": "cool", "name": "Stat-°", "none": None, "n": [1, 2]}}]
+
+class TestSerializer(unittest.TestCase):
+
+    def test_stdlib_compact_bytes(self):
+        encoded = StdlibSerializer().dumps(PAYLOAD)
+        self.assertIsInstance(encoded, bytes)
+        self.assertNotIn(b", ", encoded)
+        self.assertEqual(json.loads(encoded), PAYLOAD)
+
+    def test_auto_prefers_installed_fast_encoder(self):
+        expected = "orjson" if serializer.orjson is not None else "json"
+        self.assertEqual(get_serializer().name, expected)
+        self.assertEqual(get_serializer("json").name, "json")
+        with self.assertRaises(ValueError):
+            get_serializer("pickle")
+
+    def test_serializers_agree(self):
+        encoded = {}
+        for name in serializer.SERIALIZERS:
+            try:
+                current = get_serializer(name)
+            except ImportError:
+                continue
+            encoded[name] = current.dumps(PAYLOAD)
+            self.assertEqual(current.loads(encoded[name]), PAYLOAD)
+        self.assertEqual(len(set(encoded.values())), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from src.gateway.spool import TelemetrySpool
+
+def items(start, count, size=100):
+    return [{"uniqueId": f"D{i}", "time": "t", "data": {"v": "x" * size}} for i in range(start, start + count)]
+
+class TestSpool(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "spool", "telemetry.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_append_peek_remove_in_order(self):
+        spool = TelemetrySpool(self.path, commit_interval=60)
+        spool.append(items(0, 5))
+        self.assertEqual(len(spool), 5)
+        self.assertEqual(spool.peek(10), [])  # not committed yet
+        spool.flush()
+        records = spool.peek(3)
+        self.assertEqual([item["uniqueId"] for _, item in records], ["D0", "D1", "D2"])
+        spool.remove(seq for seq, _ in records)
+        self.assertEqual([item["uniqueId"] for _, item in spool.peek(10)], ["D3", "D4"])
+        self.assertEqual(len(spool), 2)
+        spool.close()
+
+    def test_group_commit(self):
+        spool = TelemetrySpool(self.path, commit_interval=60, commit_records=10)
+        spool.append(items(0, 4))
+        spool.append(items(4, 4))
+        self.assertEqual(spool.stats.commits, 0)
+        spool.append(items(8, 4))
+        self.assertEqual(spool.stats.commits, 1)
+        self.assertEqual(spool.stats.committed, 12)
+        spool.close()
+
+    def test_background_commit(self):
+        spool = TelemetrySpool(self.path, commit_interval=0.05)
+        spool.append(items(0, 3))
+        deadline = time.monotonic() + 2
+        while spool.stats.commits == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(spool.peek(10)), 3)
+        spool.close()
+
+    def test_size_cap_evicts_oldest(self):
+        spool = TelemetrySpool(self.path, max_bytes=5000, commit_interval=60)
+        spool.append(items(0, 100))
+        spool.flush()
+        self.assertLessEqual(spool.size_bytes, 5000)
+        self.assertGreater(spool.stats.evicted, 0)
+        remaining = [item["uniqueId"] for _, item in spool.peek(1000)]
+        self.assertEqual(remaining[-1], "D99")
+        self.assertEqual(len(remaining) + spool.stats.evicted, 100)
+        spool.close()
+
+    def test_survives_reopen(self):
+        spool = TelemetrySpool(self.path, commit_interval=60)
+        spool.append(items(0, 7))
+        spool.close()
+        reopened = TelemetrySpool(self.path, commit_interval=60)
+        self.assertEqual(len(reopened), 7)
+        self.assertEqual(reopened.peek(1)[0][1]["uniqueId"], "D0")
+        reopened.append(items(7, 1))
+        reopened.flush()
+        self.assertEqual(reopened.peek(10)[-1][1]["uniqueId"], "D7")
+        reopened.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import unittest
+from src.gateway.scheduler import TelemetryScheduler
+from src.utils.tracing import NULL_SPAN, TickProfiler, Tracer
+
+class TestTracer(unittest.TestCase):
+
+    def test_disabled_records_nothing(self):
+        tracer = Tracer()
+        self.assertIsNone(tracer.begin("tick"))
+        self.assertIs(tracer.span("generate"), NULL_SPAN)
+        traced = tracer.traced("callback.twin")(lambda msg: msg)
+        self.assertEqual(traced(1), 1)
+        self.assertEqual(tracer.recent(), [])
+
+    def test_trace_across_stages_and_ring_buffer(self):
+        tracer = Tracer(capacity=3, enabled=True)
+        for index in range(5):
+            trace = tracer.begin("tick")
+            with tracer.span("generate"):
+                pass
+            tracer.activate(None)
+
+            def publish():
+                tracer.activate(trace)
+                with tracer.span("publish"):
+                    pass
+                tracer.finish(trace)
+
+            thread = threading.Thread(target=publish, name="tick-stage-1")
+            thread.start()
+            thread.join()
+        traces = tracer.recent("tick")
+        self.assertEqual(len(traces), 3)
+        spans = traces[-1].spans
+        self.assertEqual([name for name, _, _, _ in spans], ["generate", "publish"])
+        self.assertEqual(spans[1][3], "tick-stage-1")
+        self.assertGreaterEqual(traces[-1].duration, spans[1][1] + spans[1][2])
+        self.assertIn("| generate ", tracer.format("tick"))
+        self.assertIs(tracer.span("orphan"), NULL_SPAN)  # no trace active here
+
+    def test_traced_callback(self):
+        tracer = Tracer(enabled=True)
+
+        @tracer.traced("callback.twin")
+        def callback(msg):
+            with tracer.span("apply"):
+                return msg
+
+        callback({})
+        trace, = tracer.recent("callback.twin")
+        self.assertEqual(trace.spans[0][0], "apply")
+        self.assertEqual(tracer.slowest("callback.twin"), [trace])
+
+class TestTickProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_profiles_next_ticks(self):
+        profiler = TickProfiler(self.directory)
+
+        def build():
+            return sum(range(1000))
+
+        def publish(total):
+            return total
+
+        scheduler = TelemetryScheduler(0.01, [build, publish], profiler=profiler)
+        path = profiler.request(2)
+        self.assertIsNone(profiler.request(2))
+        asyncio.run(scheduler.run(max_ticks=4))
+        self.assertFalse(profiler.armed)
+        self.assertEqual(profiler.last_path, path)
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(profiler.last_path)])
+        stats = pstats.Stats(profiler.last_path)
+        calls = {function[2]: counts[1] for function, counts in stats.stats.items()}
+        self.assertEqual(calls["build"], 2)
+        self.assertEqual(calls["publish"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
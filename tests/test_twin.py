@@ -0,0 +1,105 @@
+import unittest
+from src.gateway.fake_sdk import FakeIoTConnectSDK
+from src.gateway.twin import TwinCache
+
+class SingleKeySDK:
+    """SDK with UpdateTwin only, like the released IoTConnect SDK"""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = []
+
+    def UpdateTwin(self, key, value):
+        if key == self.fail_on:
+            raise ConnectionError("not connected")
+        self.calls.append((key, value))
+
+class BatchSDK:
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def UpdateTwins(self, properties):
+        if self.fail:
+            raise ConnectionError("not connected")
+        self.batches.append(dict(properties))
+
+class TestTwinCache(unittest.TestCase):
+
+    def test_diff_and_batch(self):
+        twin = TwinCache()
+        desired = {f"p{index}": index for index in range(40)}
+        changes = twin.apply({"desired": dict(desired, version=1, uniqueId="GW")})
+        self.assertEqual(changes, desired)
+        changes = twin.apply({"desired": dict(desired, p3="changed", version=2)})
+        self.assertEqual(changes, {"p3": "changed"})
+        self.assertEqual(twin.stats.unchanged, 39)
+        self.assertEqual(twin.stats.batches, 2)
+        self.assertEqual(twin.get("p3"), "changed")
+        self.assertEqual(twin.get("missing", 0), 0)
+        self.assertNotIn("version", twin.reported)
+
+    def test_stale_versions_dropped(self):
+        twin = TwinCache()
+        twin.apply({"desired": {"mode": "cool", "version": 5}})
+        self.assertEqual(twin.apply({"desired": {"mode": "heat", "version": 4}}), {})
+        self.assertEqual(twin.apply({"desired": {"mode": "heat", "version": 5}}), {})
+        self.assertEqual(twin.get("mode"), "cool")
+        self.assertEqual(twin.stats.stale, 2)
+        self.assertEqual(twin.apply({"desired": {"mode": "heat", "version": 6}}), {"mode": "heat"})
+        self.assertEqual(twin.version, 6)
+
+    def test_full_twin_seeds_reported(self):
+        twin = TwinCache()
+        changes = twin.apply({"desired": {"a": 1, "b": 2, "version": 3}, "reported": {"a": 1, "b": 1, "version": 2}})
+        self.assertEqual(changes, {"b": 2})
+        twin.invalidate(["b"])
+        self.assertEqual(twin.apply({"desired": {"a": 1, "b": 2, "version": 4}}), {"b": 2})
+
+    def test_listeners_and_snapshot_reads(self):
+        twin = TwinCache()
+        seen = []
+        twin.subscribe(seen.append)
+        twin.apply({"desired": {"a": 1}})
+        snapshot = twin.reported
+        twin.apply({"desired": {"a": 2}})
+        self.assertEqual(snapshot, {"a": 1})  # readers keep the version they looked at
+        self.assertEqual(seen, [{"a": 1}, {"a": 2}])
+
+    def test_one_publish_per_update(self):
+        twin = TwinCache()
+        with FakeIoTConnectSDK("GW") as sdk:
+            def on_twin(msg):
+                changes = twin.apply(msg)
+                if changes:
+                    twin.report(sdk, changes)
+
+            sdk.onTwinChangeCommand(on_twin)
+            sdk.inject_twin({f"p{index}": index for index in range(40)}, version=1)
+            self.assertTrue(sdk.wait_idle(2))
+            records = sdk.records("twin")
+        self.assertEqual(len(records), 1)
+        self.assertEqual(len(records[0].payload), 40)
+
+    def test_one_call_per_key_without_update_twins(self):
+        twin = TwinCache()
+        sdk = SingleKeySDK()
+        self.assertTrue(twin.report(sdk, twin.apply({"desired": {"a": 1, "b": 2}})))
+        self.assertEqual(sdk.calls, [("a", 1), ("b", 2)])
+
+    def test_failed_report_is_retried(self):
+        for sdk in (SingleKeySDK(fail_on="b"), BatchSDK(fail=True)):
+            with self.subTest(type(sdk).__name__):
+                twin = TwinCache()
+                with self.assertLogs("iotconnect_gateway.twin", "ERROR"):
+                    self.assertFalse(twin.report(sdk, twin.apply({"desired": {"a": 1, "b": 2, "version": 1}})))
+                sdk.fail = sdk.fail_on = None
+                # Nothing changed in the cloud, but the failed properties are reported again
+                changes = twin.apply({"desired": {"a": 1, "b": 2, "version": 2}})
+                self.assertEqual(changes, {"a": 1, "b": 2})
+                self.assertTrue(twin.report(sdk, changes))
+                self.assertEqual(twin.apply({"desired": {"a": 1, "b": 2, "version": 3}}), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import unittest
+from data_generators import generate_energy_data, generate_pct504e_data
+from src.gateway.validation import TemplateValidator, compile_attributes, compile_template
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data",
+                             "GatewayTemplateAllDeviceTypes.json")
+
+class TestValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.checkers = compile_template(TEMPLATE_PATH)
+        self.validator = TemplateValidator(self.checkers, {"E": "energy", "T": "thermostat", "X": "unknown"})
+
+    def test_template_compiled_per_tag(self):
+        self.assertIn("gateway", self.checkers)
+        self.assertIn("refrigeration", self.checkers)
+        self.assertEqual(self.validator.validate({"uniqueId": "E", "data": generate_energy_data()}), [])
+        self.assertEqual(self.validator.validate({"uniqueId": "X", "data": {"a": 1}}), [])
+        self.assertEqual(self.validator.stats.untagged, 1)
+
+    def test_problems_reported_with_paths(self):
+        data = generate_pct504e_data()
+        data["hvacThermostat"] = dict(data["hvacThermostat"], localTemperature="73.8", occupancy=1,
+                                      minSetpointDeadBand=float("nan"))
+        data["genBasic"] = "PCT504-E"
+        data["bogus"] = 1
+        data.pop("hvacFanCtrl")  # missing attributes are fine
+        problems = self.validator.validate({"uniqueId": "T", "data": data})
+        for problem in ("hvacThermostat.localTemperature: expected number, got str",
+                        "hvacThermostat.occupancy: expected bool, got int",
+                        "hvacThermostat.minSetpointDeadBand: nan is not a JSON number",
+                        "genBasic: expected dict, got str",
+                        "bogus: not in the template"):
+            self.assertIn(problem, problems)
+
+    def test_types(self):
+        check = compile_attributes([
+            {"name": "count", "type": "integer"}, {"name": "level", "type": "decimal"},
+            {"name": "on", "type": "boolean"}, {"name": "label", "type": "string"},
+        ])
+        problems = []
+        check({"count": 3, "level": 2, "on": False, "label": "x"}, problems)
+        check({"level": True, "count": 1.5}, problems)
+        self.assertEqual(problems, ["level: expected number, got bool", "count: expected int, got float"])
+
+    def test_sampling_one_in_n_across_ticks(self):
+        validator = TemplateValidator(self.checkers, {"E": "energy"}, sample_every=10)
+        tick = [{"uniqueId": "E", "data": {"bogus": index}} for index in range(26)]
+        invalid = [validator.check(tick) for _ in range(10)]
+        self.assertEqual(validator.stats.checked, 26)
+        self.assertEqual(validator.stats.skipped, 234)
+        self.assertEqual([len(found) for found in invalid[:3]], [3, 3, 2])  # payloads 0, 10, ... 60 of the stream
+        self.assertEqual(invalid[0][1], ("E", ["bogus: not in the template"]))
+        with self.assertRaises(ValueError):
+            TemplateValidator(self.checkers, {}, sample_every=0)
+
+if __name__ == '__main__':
+    unittest.main()